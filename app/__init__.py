@@ -1,27 +1,72 @@
+import os
+
 from flask import Flask
 import flask_jwt_extended
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
-from config import Config
-
-# create flask app
-app = Flask(__name__)
-app.config.from_object(Config)
-
-# initialize extensions
-db = SQLAlchemy(app)
-bcrypt = Bcrypt(app)
-jwt = flask_jwt_extended.JWTManager(app)
-
-# 블루프린트 등록
-from app.routes import page_routes, chatbot_routes
-from app.routes import auth_routes, check_user_first_routes, user_modify_routes, user_info_routes, user_log_routes
-from app.routes import exercise_routes
-app.register_blueprint(page_routes)
-app.register_blueprint(auth_routes)
-app.register_blueprint(check_user_first_routes)
-app.register_blueprint(user_modify_routes)
-app.register_blueprint(user_info_routes)
-app.register_blueprint(user_log_routes)
-app.register_blueprint(chatbot_routes)
-app.register_blueprint(exercise_routes)
\ No newline at end of file
+
+# 확장 기능은 앱 없이 만들어 두고, create_app에서 앱마다 연결함
+db = SQLAlchemy()
+bcrypt = Bcrypt()
+jwt = flask_jwt_extended.JWTManager()
+
+def create_app(config=None) -> Flask:
+    """Flask 앱 생성 함수
+    호출할 때마다 독립된 앱을 만들므로, 벤치마크/테스트에서 워커마다 별도의 앱과 DB를 사용할 수 있음
+
+    Params:
+        config `object | dict`:
+            앱 설정 (설정 클래스 또는 dict, 없으면 config.Config 사용)
+            SQLITE `str`을 지정하면 SQLALCHEMY_DATABASE_URI 대신 SQLite DB를 사용함
+            (":memory:"면 메모리 DB, 그 외에는 DB 파일 경로. 밀린 스키마 변경을 바로 적용함)
+            SCHEMA_CHECK `bool`이 True(기본값)면 시작할 때 DB 스키마에 없는 테이블/인덱스 등을 경고함
+
+    Returns:
+        app `Flask`:
+            블루프린트와 확장 기능이 등록된 앱
+    """
+    app = Flask(__name__)
+    if config is None:
+        from config import Config as config
+    if isinstance(config, dict):
+        app.config.from_mapping(config)
+    else:
+        app.config.from_object(config)
+
+    sqlite = app.config.get("SQLITE")
+    if sqlite:
+        # 메모리 DB는 Flask-SQLAlchemy가 모든 스레드에서 같은 연결을 쓰도록 설정함
+        path = "" if sqlite == ":memory:" else "/" + os.path.abspath(sqlite)
+        app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite://{path}"
+
+    # initialize extensions
+    db.init_app(app)
+    bcrypt.init_app(app)
+    jwt.init_app(app)
+
+    _register_blueprints(app)
+
+    # DB 스키마 버전 관리 (app/migrations)
+    from app import migrations
+    app.cli.add_command(migrations.upgrade_command)
+    app.cli.add_command(migrations.check_command)
+    if sqlite:
+        with app.app_context():
+            migrations.upgrade()
+    if app.config.get("SCHEMA_CHECK", True):
+        migrations.warn_if_outdated(app)
+    return app
+
+def _register_blueprints(app: Flask):
+    # 블루프린트 등록 (라우트 모듈은 앱을 만들 때 불러옴)
+    from app.routes import page_routes, chatbot_routes
+    from app.routes import auth_routes, check_user_first_routes, user_modify_routes, user_info_routes, user_log_routes
+    from app.routes import exercise_routes
+    app.register_blueprint(page_routes)
+    app.register_blueprint(auth_routes)
+    app.register_blueprint(check_user_first_routes)
+    app.register_blueprint(user_modify_routes)
+    app.register_blueprint(user_info_routes)
+    app.register_blueprint(user_log_routes)
+    app.register_blueprint(chatbot_routes)
+    app.register_blueprint(exercise_routes)
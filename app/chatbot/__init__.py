@@ -0,0 +1,22 @@
+from flask import current_app
+
+def app_local(name: str, factory):
+    """현재 앱(current_app)에 속한 저장소 반환 함수
+    캐시, 세션 등 메모리 저장소를 모듈 전역 변수에 두면 한 프로세스에서 만든 여러 앱(테스트 등)이
+    서로의 데이터를 보게 되므로, 앱의 extensions에 앱마다 따로 만들어 둠
+
+    Params:
+        name `str`:
+            저장소 이름 (app.extensions의 키)
+        factory `function`:
+            저장소가 없을 때 호출하여 새 저장소를 만드는 함수
+
+    Returns:
+        store:
+            현재 앱의 저장소
+    """
+    extensions = current_app.extensions
+    store = extensions.get(name)
+    if store is None:
+        store = extensions.setdefault(name, factory())
+    return store
@@ -0,0 +1,32 @@
+from config import Chatbot
+
+from .base import LLMBackend, request_key
+from .openai_backend import OpenAIBackend
+from .replay import RecordingBackend, ReplayBackend
+from .synthetic import SyntheticBackend
+
+# 응답 기록/재생 디렉토리
+RECORD_DIR = getattr(Chatbot, "LLM_RECORD_DIR", "llm_records")
+# SyntheticBackend 설정 (예: {"latency": "lognormal", "latency_ms": 800, "tokens_per_sec": 40})
+SYNTHETIC_OPTIONS = getattr(Chatbot, "LLM_SYNTHETIC_OPTIONS", {})
+
+def create_backend(name: str, pool_size: int, keepalive_timeout: int, api_base: str = None) -> LLMBackend:
+    """설정 이름으로 LLM 백엔드 생성
+
+    Params:
+        name `str`:
+            백엔드 이름
+            openai: 실제 API 호출
+            record: 실제 API 호출 + 응답을 RECORD_DIR에 기록
+            replay: RECORD_DIR에 기록된 응답 재생 (기록이 없으면 synthetic 응답)
+            synthetic: 설정한 지연 시간 분포로 가짜 응답 생성
+    """
+    if name == "openai":
+        return OpenAIBackend(pool_size, keepalive_timeout, api_base)
+    if name == "record":
+        return RecordingBackend(OpenAIBackend(pool_size, keepalive_timeout, api_base), RECORD_DIR)
+    if name == "replay":
+        return ReplayBackend(RECORD_DIR, fallback=SyntheticBackend(**SYNTHETIC_OPTIONS))
+    if name == "synthetic":
+        return SyntheticBackend(**SYNTHETIC_OPTIONS)
+    raise ValueError(f"unknown LLM backend: {name}")
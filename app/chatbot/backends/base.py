@@ -0,0 +1,32 @@
+import hashlib
+import json
+
+class LLMBackend:
+    """LLM 백엔드 인터페이스
+    LLMGateway는 이 인터페이스만 사용하므로, 구현체를 바꾸면 실제 API 없이도 챗봇을 실행할 수 있음.
+    모든 메소드는 LLMGateway의 이벤트 루프에서 호출됨
+    """
+    async def start(self):
+        """백엔드 초기화 (연결 풀 생성 등)
+        """
+
+    async def close(self):
+        """백엔드 종료
+        """
+
+    async def complete(self, messages: list, model: str) -> str:
+        """응답 메시지 전체를 한 번에 반환
+        """
+        raise NotImplementedError
+
+    async def stream(self, messages: list, model: str):
+        """응답 메시지 조각을 생성되는 대로 반환 (async generator)
+        """
+        yield await self.complete(messages, model)
+
+def request_key(messages: list, model: str) -> str:
+    """요청(모델 + 메시지 리스트)의 정규화된 해시값
+    키 순서나 공백과 관계없이 같은 요청은 항상 같은 값을 가짐
+    """
+    canonical = json.dumps({"model": model, "messages": messages}, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -0,0 +1,44 @@
+import aiohttp
+import openai
+
+from .base import LLMBackend
+
+class OpenAIBackend(LLMBackend):
+    """OpenAI Chat Completions API 백엔드
+    HTTP 연결은 keep-alive 연결 풀(aiohttp 세션 1개)로 재사용함
+    """
+    def __init__(self, pool_size: int, keepalive_timeout: int, api_base: str = None):
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.api_base = api_base
+        self._session = None
+
+    async def start(self):
+        connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=self.keepalive_timeout)
+        self._session = aiohttp.ClientSession(connector=connector)
+
+    async def close(self):
+        if self._session:
+            await self._session.close()
+
+    async def complete(self, messages: list, model: str) -> str:
+        openai.aiosession.set(self._session)
+        chatbot = await openai.ChatCompletion.acreate(
+            model = model,
+            messages = messages,
+            api_base = self.api_base
+        )
+        return chatbot["choices"][0]["message"]["content"]
+
+    async def stream(self, messages: list, model: str):
+        openai.aiosession.set(self._session)
+        chatbot = await openai.ChatCompletion.acreate(
+            model = model,
+            messages = messages,
+            api_base = self.api_base,
+            stream = True
+        )
+        async for chunk in chatbot:
+            piece = chunk["choices"][0]["delta"].get("content")
+            if piece:
+                yield piece
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import os
+import time
+
+from .base import LLMBackend, request_key
+
+class RecordingBackend(LLMBackend):
+    """다른 백엔드의 응답을 디스크에 기록하는 백엔드
+    기록한 파일은 ReplayBackend로 다시 재생할 수 있음
+    """
+    def __init__(self, backend: LLMBackend, directory: str):
+        self.backend = backend
+        self.directory = directory
+
+    async def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        await self.backend.start()
+
+    async def close(self):
+        await self.backend.close()
+
+    async def complete(self, messages: list, model: str) -> str:
+        started = time.monotonic()
+        bot_msg = await self.backend.complete(messages, model)
+        await asyncio.to_thread(self._save, messages, model, bot_msg, time.monotonic() - started)
+        return bot_msg
+
+    async def stream(self, messages: list, model: str):
+        started = time.monotonic()
+        pieces = []
+        async for piece in self.backend.stream(messages, model):
+            pieces.append(piece)
+            yield piece
+        await asyncio.to_thread(self._save, messages, model, "".join(pieces), time.monotonic() - started)
+
+    def _save(self, messages: list, model: str, bot_msg: str, latency: float):
+        path = os.path.join(self.directory, f"{request_key(messages, model)}.json")
+        record = {"model": model, "messages": messages, "response": bot_msg, "latency": latency}
+        # 기록 중 읽히지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+class ReplayBackend(LLMBackend):
+    """디스크에 기록된 응답을 재생하는 백엔드
+
+    Params:
+        directory `str`:
+            RecordingBackend가 응답을 기록한 디렉토리
+        replay_latency `bool`:
+            기록 당시의 응답 시간만큼 기다린 뒤 응답할지 여부
+        fallback `LLMBackend`:
+            기록이 없는 요청을 처리할 백엔드 (없으면 KeyError)
+    """
+    def __init__(self, directory: str, replay_latency: bool = True, fallback: LLMBackend = None):
+        self.directory = directory
+        self.replay_latency = replay_latency
+        self.fallback = fallback
+
+    async def start(self):
+        if self.fallback:
+            await self.fallback.start()
+
+    async def close(self):
+        if self.fallback:
+            await self.fallback.close()
+
+    async def complete(self, messages: list, model: str) -> str:
+        record = await asyncio.to_thread(self._load, messages, model)
+        if record is None:
+            return await self._fallback().complete(messages, model)
+        if self.replay_latency:
+            await asyncio.sleep(record.get("latency", 0))
+        return record["response"]
+
+    async def stream(self, messages: list, model: str):
+        record = await asyncio.to_thread(self._load, messages, model)
+        if record is None:
+            async for piece in self._fallback().stream(messages, model):
+                yield piece
+            return
+        bot_msg = record["response"]
+        pieces = [bot_msg[i:i + 2] for i in range(0, len(bot_msg), 2)]
+        delay = record.get("latency", 0) / max(len(pieces), 1) if self.replay_latency else 0
+        for piece in pieces:
+            await asyncio.sleep(delay)
+            yield piece
+
+    def _load(self, messages: list, model: str):
+        path = os.path.join(self.directory, f"{request_key(messages, model)}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _fallback(self):
+        if not self.fallback:
+            raise KeyError("no recorded response for request")
+        return self.fallback
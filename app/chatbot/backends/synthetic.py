@@ -0,0 +1,67 @@
+import asyncio
+import math
+import random
+
+from .base import LLMBackend
+
+REPLY = "네, 말씀 잘 들었어요. 오늘 하루는 어떻게 보내셨어요? 식사는 맛있게 하셨는지 궁금하네요."
+
+class SyntheticBackend(LLMBackend):
+    """실제 LLM 없이 지연 시간만 흉내 내는 백엔드 (부하 테스트용)
+
+    Params:
+        latency `str`:
+            첫 토큰까지의 지연 시간 분포 (constant, normal, lognormal, exponential)
+        latency_ms `float`:
+            첫 토큰까지의 평균 지연 시간 (ms)
+        jitter_ms `float`:
+            지연 시간 표준편차 (ms, normal/lognormal 분포에서 사용)
+        tokens_per_sec `float`:
+            초당 생성 토큰 수
+        reply_tokens `int`:
+            응답 토큰 수
+        seed `int`:
+            난수 시드 (같은 시드면 같은 지연 시간 순서)
+    """
+    def __init__(self, latency: str = "lognormal", latency_ms: float = 800, jitter_ms: float = 300,
+                 tokens_per_sec: float = 40, reply_tokens: int = 40, seed: int = None):
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tokens_per_sec = tokens_per_sec
+        self.reply_tokens = reply_tokens
+        self._random = random.Random(seed)
+
+    def first_token_delay(self) -> float:
+        """첫 토큰까지의 지연 시간 (초)
+        """
+        mean, sigma = self.latency_ms, self.jitter_ms
+        if self.latency == "constant":
+            delay = mean
+        elif self.latency == "normal":
+            delay = self._random.gauss(mean, sigma)
+        elif self.latency == "exponential":
+            delay = self._random.expovariate(1 / mean) if mean > 0 else 0
+        elif self.latency == "lognormal":
+            # 평균과 표준편차가 latency_ms, jitter_ms가 되도록 로그 정규분포 모수 계산
+            variance = math.log(1 + (sigma / mean) ** 2) if mean > 0 else 0
+            delay = self._random.lognormvariate(math.log(mean) - variance / 2, math.sqrt(variance)) if mean > 0 else 0
+        else:
+            raise ValueError(f"unknown latency distribution: {self.latency}")
+        return max(0.0, delay) / 1000
+
+    def _pieces(self):
+        return [REPLY[i % len(REPLY):i % len(REPLY) + 2] for i in range(0, self.reply_tokens * 2, 2)]
+
+    async def complete(self, messages: list, model: str) -> str:
+        pieces = self._pieces()
+        token_delay = 1 / self.tokens_per_sec if self.tokens_per_sec > 0 else 0
+        await asyncio.sleep(self.first_token_delay() + token_delay * len(pieces))
+        return "".join(pieces)
+
+    async def stream(self, messages: list, model: str):
+        token_delay = 1 / self.tokens_per_sec if self.tokens_per_sec > 0 else 0
+        await asyncio.sleep(self.first_token_delay())
+        for piece in self._pieces():
+            await asyncio.sleep(token_delay)
+            yield piece
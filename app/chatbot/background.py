@@ -0,0 +1,57 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class KeyedExecutor:
+    """키별로 작업이 겹치지 않게 등록하는 백그라운드 실행기
+    같은 키의 작업이 이미 대기 중이면 새로 등록하지 않음.
+    hold_while_running이 False면 작업이 시작되는 순간 키를 풀어, 실행 중에 들어온 변경은 다음 작업이 처리함
+    (인덱스 갱신처럼 마지막 처리 위치부터 이어서 하는 작업). True면 작업이 끝날 때까지 키를 잡아 둠
+    (같은 키의 작업이 동시에 실행되면 안 되는 경우)
+
+    Params:
+        max_workers `int`:
+            동시에 실행할 최대 작업 수
+        thread_name_prefix `str`:
+            작업 스레드 이름
+        hold_while_running `bool`:
+            작업이 끝날 때까지 같은 키의 작업 등록을 막을지 여부 (기본값 False)
+    """
+    def __init__(self, max_workers: int, thread_name_prefix: str, hold_while_running: bool = False):
+        self.hold_while_running = hold_while_running
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, *args) -> bool:
+        """키에 해당하는 작업 등록
+
+        Returns:
+            submitted `bool`:
+                등록 여부 (같은 키의 작업이 이미 있거나, 서버 종료 중이라 실행기가 닫혔으면 False)
+        """
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+        try:
+            self._executor.submit(self._run, key, fn, args)
+        except RuntimeError:
+            # 서버 종료 중 (남은 작업은 다음 실행 때 마지막 처리 위치부터 이어서 처리됨)
+            self._release(key)
+            return False
+        return True
+
+    def _run(self, key, fn, args):
+        if not self.hold_while_running:
+            self._release(key)
+        try:
+            fn(*args)
+        except Exception as e:
+            print(f"Error during background task {fn.__name__}: {e}")
+        finally:
+            if self.hold_while_running:
+                self._release(key)
+
+    def _release(self, key):
+        with self._lock:
+            self._pending.discard(key)
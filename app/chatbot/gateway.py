@@ -0,0 +1,195 @@
+import asyncio
+import queue
+import threading
+
+from config import Chatbot
+
+from app.chatbot import metrics
+from app.chatbot.backends import LLMBackend, create_backend, request_key
+from app.chatbot.latency import policy_for, run_with_policy
+from app.chatbot import response_cache
+from app.chatbot.scheduler import FairScheduler
+
+# 동시에 진행할 수 있는 최대 LLM 요청 수 (초과 요청은 스케줄러 대기열에서 대기)
+MAX_CONCURRENCY = getattr(Chatbot, "LLM_MAX_CONCURRENCY", 32)
+# LLM 서버와 유지할 최대 HTTP 연결 수 (keep-alive)
+POOL_SIZE = getattr(Chatbot, "LLM_POOL_SIZE", 32)
+KEEPALIVE_TIMEOUT = getattr(Chatbot, "LLM_KEEPALIVE_TIMEOUT", 60)
+# 요청 1건의 기본 제한 시간 (초, 대기 시간 포함)
+DEFAULT_TIMEOUT = getattr(Chatbot, "LLM_TIMEOUT", 60)
+# LLM API 주소 (None이면 openai 기본값, 로컬 스텁 서버 사용 시 http://127.0.0.1:8081/v1)
+API_BASE = getattr(Chatbot, "API_BASE", None)
+# LLM 백엔드 (openai, record, replay, synthetic / app.chatbot.backends.create_backend 참고)
+BACKEND = getattr(Chatbot, "LLM_BACKEND", "openai")
+
+_DONE = object()
+
+class LLMGateway:
+    """비동기 LLM 클라이언트
+    전용 이벤트 루프 스레드 하나에서 모든 LLM 요청을 처리함.
+    실제 요청은 LLM 백엔드가 처리하고, 게이트웨이는 요청 스케줄링(FairScheduler)과 제한 시간을 담당함.
+    요청 스레드(WSGI)와 다른 이벤트 루프(ASGI) 어디서 호출해도 요청은 이 루프에서 실행됨.
+    """
+    def __init__(self, backend: LLMBackend = None, max_concurrency: int = MAX_CONCURRENCY):
+        self.backend = backend or create_backend(BACKEND, POOL_SIZE, KEEPALIVE_TIMEOUT, API_BASE)
+        self.max_concurrency = max_concurrency
+        self._loop = None
+        self._scheduler = None
+        # 캐시를 사용하는 요청 중 같은 요청이 진행 중이면 그 결과를 함께 사용 ((캐시, 요청 키) -> Future)
+        self._in_flight = {}
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._loop:
+            return self._loop
+        with self._start_lock:
+            if self._loop:
+                return self._loop
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="llm-gateway", daemon=True)
+            thread.start()
+            asyncio.run_coroutine_threadsafe(self._setup(), loop).result()
+            self._loop = loop
+        return self._loop
+
+    async def _setup(self):
+        await self.backend.start()
+        self._scheduler = FairScheduler(self.max_concurrency)
+
+    async def _complete(self, messages: list, model: str, user):
+        async with self._scheduler.slot(user):
+            return await self.backend.complete(messages, model)
+
+    async def _stream(self, messages: list, model: str, deadline: float, user):
+        loop = asyncio.get_running_loop()
+        await asyncio.wait_for(self._scheduler.acquire(user), deadline - loop.time())
+        started = loop.time()
+        pieces = self.backend.stream(messages, model)
+        try:
+            while True:
+                try:
+                    piece = await asyncio.wait_for(pieces.__anext__(), deadline - loop.time())
+                except StopAsyncIteration:
+                    break
+                yield piece
+        finally:
+            self._scheduler.release(user, loop.time() - started)
+            await pieces.aclose()
+
+    async def _cached(self, cache: response_cache.ResponseCache, messages: list, model: str, compute):
+        key = (id(cache), request_key(messages, model))
+        bot_msg = cache.get(key[1])
+        if bot_msg is not None:
+            return bot_msg
+        in_flight = self._in_flight.get(key)
+        if in_flight:
+            metrics.increment("response_cache_coalesced")
+            try:
+                return await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                # 먼저 보낸 요청이 실패한 경우 직접 요청
+                if not in_flight.cancelled():
+                    raise
+                return await self._cached(cache, messages, model, compute)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            bot_msg = await compute()
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._in_flight[key]
+        cache.set(key[1], bot_msg)
+        future.set_result(bot_msg)
+        return bot_msg
+
+    async def chat(self, messages: list, model: str = None, timeout: float = None, user=None, route: str = None,
+                   cache: bool = False) -> str:
+        """LLM 응답 생성 (코루틴)
+
+        Params:
+            messages `list`:
+                프롬프트 메시지 리스트
+            model `str`:
+                사용할 모델 (기본값 Chatbot.MODEL)
+            timeout `float`:
+                제한 시간 (초, 기본값 LLM_TIMEOUT). 초과 시 asyncio.TimeoutError
+            user:
+                요청한 사용자 (스케줄러가 사용자별로 공정하게 처리하기 위해 사용)
+                대기열이 밀려 있으면 SchedulerBusy
+            route `str`:
+                요청한 라우트 (chat, quiz). 라우트의 지연 시간 정책(app.chatbot.latency)이 있으면
+                timeout 대신 정책의 제한 시간, hedge 요청, 대체 모델을 사용함
+            cache `bool`:
+                응답 캐시(app.chatbot.response_cache) 사용 여부. 모델과 메시지 리스트가 완전히 같은
+                요청의 응답을 재사용하므로, 같은 요청에 다른 응답이 필요한 곳에서는 사용하지 말 것.
+                캐시는 앱마다 따로 두므로 앱 컨텍스트 안에서 호출해야 함
+
+        Returns:
+            msg `str`:
+                응답 메시지
+        """
+        loop = self._ensure_started()
+        model = model or Chatbot.MODEL
+        policy = policy_for(route)
+
+        def compute():
+            if policy:
+                return run_with_policy(lambda attempt_model: self._complete(messages, attempt_model, user), model, policy)
+            return asyncio.wait_for(self._complete(messages, model, user), timeout or DEFAULT_TIMEOUT)
+
+        # 게이트웨이 루프에는 앱 컨텍스트가 없으므로 캐시는 호출한 쪽에서 미리 찾아 둠
+        coro = self._cached(response_cache.current_cache(), messages, model, compute) if cache else compute()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def chat_sync(self, messages: list, model: str = None, timeout: float = None, user=None) -> str:
+        """LLM 응답 생성 (동기 함수, 백그라운드 작업 등 이벤트 루프 밖에서 사용)
+        """
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(self.chat(messages, model, timeout, user), loop)
+        return future.result()
+
+    def stream_sync(self, messages: list, model: str = None, timeout: float = None, user=None):
+        """LLM 응답 스트리밍 (동기 제너레이터)
+        이벤트 루프에서 받은 응답 조각을 큐를 통해 호출한 스레드로 전달함
+        """
+        loop = self._ensure_started()
+        pieces = queue.Queue()
+        timeout = timeout or DEFAULT_TIMEOUT
+
+        async def pump():
+            try:
+                async for piece in self._stream(messages, model or Chatbot.MODEL, loop.time() + timeout, user):
+                    pieces.put(piece)
+                pieces.put(_DONE)
+            except BaseException as e:
+                pieces.put(e)
+                raise
+
+        future = asyncio.run_coroutine_threadsafe(pump(), loop)
+        try:
+            while True:
+                item = pieces.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # 클라이언트 연결이 끊겨 중간에 종료된 경우 LLM 요청도 취소
+            future.cancel()
+
+    def close(self):
+        """연결 풀과 이벤트 루프 종료
+        """
+        if not self._loop:
+            return
+        asyncio.run_coroutine_threadsafe(self.backend.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+
+gateway = LLMGateway()
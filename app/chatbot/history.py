@@ -0,0 +1,144 @@
+from flask import current_app
+from config import Chatbot
+
+from app import db
+from app.chatbot.background import KeyedExecutor
+from app.chatbot.gateway import gateway
+from app.chatbot.log_writer import chat_log_writer
+from app.models.user import ChatLog, ChatSummary
+
+# 프롬프트에 그대로 넣을 최근 대화 턴 수 (사용자 + 챗봇 메시지 한 쌍이 1턴)
+MAX_TURNS = getattr(Chatbot, "HISTORY_MAX_TURNS", 10)
+# 최근 대화에 사용할 최대 토큰 수
+TOKEN_BUDGET = getattr(Chatbot, "HISTORY_TOKEN_BUDGET", 1500)
+SUMMARY_MODEL = getattr(Chatbot, "SUMMARY_MODEL", Chatbot.MODEL)
+SUMMARY_PROMPT = getattr(Chatbot, "SUMMARY_PROMPT", (
+    "너는 노인 사용자와 챗봇의 대화를 요약하는 역할을 해. "
+    "기존 요약과 새로 추가된 대화를 합쳐서, 사용자에 대한 사실(이름, 가족, 취미, 건강, 약속 등)과 "
+    "대화의 흐름이 드러나도록 한국어로 10문장 이내로 다시 요약해줘."
+))
+
+# 요약 갱신은 요청과 별개로 백그라운드에서 진행 (같은 대화 그룹의 요약은 동시에 갱신하지 않음)
+_executor = KeyedExecutor(max_workers=2, thread_name_prefix="chat-summary", hold_while_running=True)
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 추정 함수
+    한글은 대략 한 글자당 1토큰, 영문/숫자는 4글자당 1토큰으로 계산함
+    """
+    ascii_count = sum(1 for c in text if c.isascii())
+    return (len(text) - ascii_count) + ascii_count // 4 + 4
+
+def log_text(log: ChatLog) -> str:
+    """대화 로그의 텍스트 반환 (BLOB으로 저장된 경우 디코딩)
+    """
+    if isinstance(log.text, bytes):
+        return log.text.decode("utf-8")
+    return log.text or ""
+
+def build_history(uid: int, chat_group_id: int):
+    """프롬프트에 넣을 대화 기록 생성 함수
+    최근 대화는 토큰 예산 안에서 그대로 넣고, 그보다 오래된 대화는 요약으로 대체함.
+    요약되지 않은 오래된 대화가 있다면 백그라운드에서 요약을 갱신함.
+
+    Params:
+        uid `int`:
+            사용자의 아이디
+        chat_group_id `int`:
+            대화 그룹 아이디
+
+    Returns:
+        messages `list`:
+            대화 기록 메시지 리스트
+        first_id `int`:
+            최근 대화로 그대로 넣은 로그 중 가장 오래된 로그의 아이디 (넣은 로그가 없으면 None)
+    """
+    # 아직 저장되지 않은 이전 대화가 있으면 먼저 저장
+    chat_log_writer.flush(uid)
+    # 현재 대화 그룹과 직전 대화 그룹(지난 대화 세션)의 요약을 한 번에 불러오기
+    summaries = {
+        row.chat_group_id: row for row in ChatSummary.query.filter(
+            ChatSummary.user_id == uid,
+            ChatSummary.chat_group_id.in_([chat_group_id - 1, chat_group_id])
+        ).all()
+    }
+    summary = summaries.get(chat_group_id)
+    previous = summaries.get(chat_group_id - 1)
+    summarized_until = summary.summarized_until if summary else 0
+
+    # 요약되지 않은 최근 로그만 최신순으로 불러오기 (잘려나간 로그 확인을 위해 1개 더)
+    logs = ChatLog.query.filter(
+        ChatLog.user_id == uid,
+        ChatLog.chat_group_id == chat_group_id,
+        ChatLog.id > summarized_until
+    ).order_by(ChatLog.id.desc()).limit(MAX_TURNS * 2 + 1).all()
+
+    kept = []
+    used_tokens = 0
+    for log in logs[:MAX_TURNS * 2]:
+        text = log_text(log)
+        tokens = estimate_tokens(text)
+        if kept and used_tokens + tokens > TOKEN_BUDGET:
+            break
+        kept.append(log)
+        used_tokens += tokens
+    kept.reverse()
+
+    # 예산 밖으로 밀려난 로그가 있으면 요약에 합치기
+    if len(kept) < len(logs):
+        schedule_summary(uid, chat_group_id, kept[0].id)
+
+    messages = []
+    if previous and previous.summary:
+        messages.append({"role":"system", "content":f"지난 대화 요약: {previous.summary}"})
+    if summary and summary.summary:
+        messages.append({"role":"system", "content":f"이전 대화 요약: {summary.summary}"})
+    for log in kept:
+        messages.append({"role":log.receiver, "content":log_text(log)})
+    return messages, kept[0].id if kept else None
+
+def schedule_summary(uid: int, chat_group_id: int, before_id: int = None):
+    """요약 갱신 작업을 백그라운드에 등록하는 함수 (대화 그룹마다 한 번에 하나씩 진행)
+
+    Params:
+        uid `int`:
+            사용자의 아이디
+        chat_group_id `int`:
+            대화 그룹 아이디
+        before_id `int`:
+            이 아이디 이전의 로그까지 요약 (None이면 대화 그룹의 모든 로그, 대화 세션이 끝났을 때)
+    """
+    app = current_app._get_current_object()
+    _executor.submit((app, uid, chat_group_id), _update_summary, app, uid, chat_group_id, before_id)
+
+def _update_summary(app, uid: int, chat_group_id: int, before_id: int):
+    """before_id 이전의 요약되지 않은 로그를 기존 요약에 합치는 함수
+    """
+    try:
+        with app.app_context():
+            summary = ChatSummary.query.filter_by(user_id=uid, chat_group_id=chat_group_id).first()
+            if not summary:
+                summary = ChatSummary(user_id=uid, chat_group_id=chat_group_id, summary="", summarized_until=0)
+                db.session.add(summary)
+
+            query = ChatLog.query.filter(
+                ChatLog.user_id == uid,
+                ChatLog.chat_group_id == chat_group_id,
+                ChatLog.id > summary.summarized_until
+            )
+            if before_id is not None:
+                query = query.filter(ChatLog.id < before_id)
+            logs = query.order_by(ChatLog.id).all()
+            if not logs:
+                db.session.rollback()
+                return
+
+            dialogue = "\n".join(f"{log.receiver}: {log_text(log)}" for log in logs)
+            messages = [
+                {"role":"system", "content":SUMMARY_PROMPT},
+                {"role":"user", "content":f"기존 요약:\n{summary.summary or '(없음)'}\n\n새 대화:\n{dialogue}"}
+            ]
+            summary.summary = gateway.chat_sync(messages, model=SUMMARY_MODEL)
+            summary.summarized_until = logs[-1].id
+            db.session.commit()
+    except Exception as e:
+        print(f"Error during chat summary update: {e}")
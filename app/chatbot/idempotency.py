@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+
+from config import Chatbot
+
+from app.chatbot import app_local
+
+# 완료된 요청 결과를 보관하는 시간 (초)
+RESULT_TTL = getattr(Chatbot, "IDEMPOTENCY_TTL", 300)
+# 같은 키로 진행 중인 요청을 기다리는 최대 시간 (초)
+WAIT_TIMEOUT = getattr(Chatbot, "IDEMPOTENCY_WAIT_TIMEOUT", 90)
+
+class _Entry:
+    def __init__(self):
+        self.done = False
+        self.result = None
+        self.expires_at = None
+        # 결과를 기다리는 요청 ((이벤트 루프, Future) 리스트)
+        # WSGI 모드에서는 요청마다 이벤트 루프가 다르므로 각 루프에 깨우기를 예약함
+        self.waiters = []
+
+class IdempotencyStore:
+    """멱등성 키별 요청 결과 저장소 (서버 메모리, 앱마다 하나)
+    같은 키의 요청이 진행 중이면 그 요청의 결과를 기다리고, 완료됐다면 저장된 결과를 돌려줌
+    """
+    def __init__(self, ttl: int = RESULT_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def begin(self, key: str):
+        """키에 해당하는 요청 시작
+        처음 들어온 요청이면 owner=True (직접 처리해야 함), 아니면 기존 요청의 entry를 반환함
+        """
+        with self._lock:
+            self._purge()
+            entry = self._entries.get(key)
+            if entry:
+                return entry, False
+            entry = _Entry()
+            self._entries[key] = entry
+            return entry, True
+
+    def complete(self, key: str, entry: _Entry, result):
+        with self._lock:
+            entry.result = result
+            entry.expires_at = time.monotonic() + self.ttl
+            self._finish(entry)
+
+    def fail(self, key: str, entry: _Entry):
+        """요청 실패 시 키를 풀어 재시도 요청이 다시 처리할 수 있도록 함
+        """
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            self._finish(entry)
+
+    async def wait(self, entry: _Entry, timeout: float) -> bool:
+        """먼저 들어온 요청이 끝날 때까지 대기 (스레드를 점유하지 않음)
+
+        Returns:
+            finished `bool`:
+                제한 시간 안에 끝났는지 여부
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if entry.done:
+                return True
+            waiter = (loop, loop.create_future())
+            entry.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter[1], timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                if waiter in entry.waiters:
+                    entry.waiters.remove(waiter)
+
+    def _finish(self, entry: _Entry):
+        entry.done = True
+        for loop, future in entry.waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                # 기다리던 요청의 이벤트 루프가 이미 닫힘
+                pass
+        entry.waiters = []
+
+    def _purge(self):
+        now = time.monotonic()
+        expired = [key for key, entry in self._entries.items() if entry.expires_at and entry.expires_at < now]
+        for key in expired:
+            del self._entries[key]
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+def current_store() -> IdempotencyStore:
+    """현재 앱의 멱등성 키 저장소
+    """
+    return app_local("chatbot_idempotency", IdempotencyStore)
+
+async def run_once(key: str, handler):
+    """같은 멱등성 키의 요청을 한 번만 처리하는 함수
+
+    Params:
+        key `str`:
+            멱등성 키 (None이면 그냥 handler 실행)
+        handler `coroutine function`:
+            요청 처리 함수, (응답 데이터 `dict`, 상태 코드 `int`)를 반환해야 함.
+            상태 코드가 200일 때만 결과를 저장함
+
+    Returns:
+        data `dict`:
+            응답 데이터 (같은 키의 요청이 아직 진행 중이라 기다리다 시간이 초과되면 None)
+        status `int`:
+            상태 코드
+    """
+    if not key:
+        return await handler()
+    store = current_store()
+    while True:
+        entry, owner = store.begin(key)
+        if owner:
+            break
+        finished = await store.wait(entry, WAIT_TIMEOUT)
+        if not finished:
+            return None, 409
+        if entry.result is not None:
+            return entry.result
+        # 먼저 들어온 요청이 실패한 경우 직접 처리
+
+    try:
+        data, status = await handler()
+    except BaseException:
+        store.fail(key, entry)
+        raise
+    if status == 200:
+        store.complete(key, entry, (data, status))
+    else:
+        store.fail(key, entry)
+    return data, status
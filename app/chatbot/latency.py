@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import time
+from collections import defaultdict, deque
+
+from config import Chatbot
+
+from app.chatbot.scheduler import SchedulerBusy
+
+# 라우트별 지연 시간 정책
+# deadline: 전체 제한 시간 (초)
+# hedge: 응답이 p95 시간 안에 오지 않으면 같은 요청을 한 번 더 보낼지 여부
+# fallback_model: 제한 시간이 다가오면 대신 사용할 빠른 모델 (None이면 사용 안 함)
+# fallback_budget: 대체 모델 응답에 필요한 시간 (초, 기록이 쌓이면 대체 모델의 p95 사용)
+POLICIES = getattr(Chatbot, "LATENCY_POLICIES", {
+    "chat": {"deadline": 20, "hedge": True, "fallback_model": getattr(Chatbot, "FALLBACK_MODEL", None), "fallback_budget": 5},
+    "quiz": {"deadline": 20, "hedge": False, "fallback_model": getattr(Chatbot, "FALLBACK_MODEL", None), "fallback_budget": 5},
+})
+# p95 계산에 사용할 최근 기록 수와, p95를 믿을 수 있는 최소 기록 수
+WINDOW_SIZE = 200
+MIN_SAMPLES = 20
+
+class LatencyPolicy:
+    """라우트별 지연 시간 정책
+    """
+    def __init__(self, deadline: float, hedge: bool = False, fallback_model: str = None, fallback_budget: float = 5):
+        self.deadline = deadline
+        self.hedge = hedge
+        self.fallback_model = fallback_model
+        self.fallback_budget = fallback_budget
+
+class LatencyTracker:
+    """모델별 LLM 요청 소요 시간 기록
+    """
+    def __init__(self, window_size: int = WINDOW_SIZE):
+        self._samples = defaultdict(lambda: deque(maxlen=window_size))
+        self._counts = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    def record(self, model: str, kind: str, outcome: str, duration: float):
+        """요청 1건의 기록
+
+        Params:
+            model `str`:
+                사용한 모델
+            kind `str`:
+                요청 종류 (primary, hedge, fallback)
+            outcome `str`:
+                결과 (ok, error, cancelled)
+            duration `float`:
+                소요 시간 (초)
+        """
+        with self._lock:
+            if outcome == "ok":
+                self._samples[model].append(duration)
+            self._counts[model][f"{kind}_{outcome}"] += 1
+
+    def p95(self, model: str):
+        """최근 성공한 요청 소요 시간의 95백분위수 (기록이 부족하면 None)
+        """
+        with self._lock:
+            return self._p95_unlocked(model)
+
+    def snapshot(self):
+        """모델별 p95, 기록 수, 요청 종류/결과별 횟수
+        """
+        with self._lock:
+            return {
+                model: {"p95": self._p95_unlocked(model), "samples": len(self._samples[model]), **self._counts[model]}
+                for model in set(self._samples) | set(self._counts)
+            }
+
+    def _p95_unlocked(self, model: str):
+        samples = sorted(self._samples[model])
+        if len(samples) < MIN_SAMPLES:
+            return None
+        return samples[int(len(samples) * 0.95) - 1]
+
+tracker = LatencyTracker()
+
+def policy_for(route: str):
+    """라우트의 지연 시간 정책 (정책이 없으면 None)
+    """
+    options = POLICIES.get(route) if route else None
+    return LatencyPolicy(**options) if options else None
+
+async def run_with_policy(attempt, model: str, policy: LatencyPolicy):
+    """지연 시간 정책에 따라 LLM 요청 실행
+    1. model로 요청을 보냄
+    2. hedge가 켜져 있고 p95 시간 안에 응답이 없으면 같은 요청을 한 번 더 보냄
+    3. 제한 시간까지 대체 모델 응답에 필요한 시간만 남으면 대체 모델로 요청을 보냄
+    가장 먼저 성공한 응답을 반환하고, 나머지 요청은 취소함
+
+    Params:
+        attempt `coroutine function`:
+            attempt(model)로 호출하면 응답 메시지를 반환하는 함수
+        model `str`:
+            기본 모델
+        policy `LatencyPolicy`:
+            지연 시간 정책
+
+    Returns:
+        msg `str`:
+            응답 메시지 (제한 시간 초과 시 asyncio.TimeoutError)
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + policy.deadline
+    tasks = {}
+
+    async def timed(kind: str, attempt_model: str):
+        attempt_started = time.monotonic()
+        outcome = "error"
+        try:
+            result = await attempt(attempt_model)
+            outcome = "ok"
+            return result
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            tracker.record(attempt_model, kind, outcome, time.monotonic() - attempt_started)
+
+    def launch(kind: str, attempt_model: str):
+        tasks[loop.create_task(timed(kind, attempt_model))] = kind
+
+    hedge_delay = tracker.p95(model) if policy.hedge else None
+    hedge_at = started + hedge_delay if hedge_delay is not None else None
+    fallback_at = None
+    if policy.fallback_model:
+        fallback_at = deadline - (tracker.p95(policy.fallback_model) or policy.fallback_budget)
+
+    launch("primary", model)
+    last_error = None
+    busy = None
+    try:
+        while True:
+            now = loop.time()
+            if now >= deadline:
+                raise asyncio.TimeoutError()
+            wake_at = min(t for t in (hedge_at, fallback_at, deadline) if t is not None)
+            done, _ = await asyncio.wait(tasks, timeout=max(0, wake_at - now), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                tasks.pop(task)
+                if task.exception() is None:
+                    return task.result()
+                if isinstance(task.exception(), SchedulerBusy):
+                    # 대기열이 밀려 거절된 요청은 건너뛰고, 진행 중인 다른 요청의 응답을 기다림
+                    busy = task.exception()
+                else:
+                    last_error = task.exception()
+            # 진행 중인 요청 없이 대기열에서 거절됐다면 다른 요청을 더 보내지 않음
+            if busy and not tasks:
+                raise busy
+
+            now = loop.time()
+            if hedge_at is not None and now >= hedge_at:
+                launch("hedge", model)
+                hedge_at = None
+            if fallback_at is not None and (now >= fallback_at or not tasks):
+                # 제한 시간이 다가오거나, 진행 중인 요청이 모두 실패하면 대체 모델 사용
+                launch("fallback", policy.fallback_model)
+                fallback_at = None
+            if not tasks:
+                raise last_error
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,174 @@
+import atexit
+import threading
+from collections import Counter
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import insert
+from config import Chatbot
+
+from app import db
+from app.models.user import ChatLog
+
+# 한 번에 INSERT 할 최대 로그 수 (이만큼 쌓이면 바로 저장)
+BATCH_SIZE = getattr(Chatbot, "CHAT_LOG_BATCH_SIZE", 200)
+# 로그가 BATCH_SIZE만큼 쌓이지 않아도 저장하는 주기 (초)
+FLUSH_INTERVAL = getattr(Chatbot, "CHAT_LOG_FLUSH_INTERVAL", 0.5)
+# 저장 실패 시 재시도 횟수 (넘기면 한 행씩 저장하고, 그래도 실패한 로그만 버림)
+MAX_RETRIES = 3
+
+class ChatLogWriter:
+    """대화 로그 지연 저장(write-behind) 큐
+    모든 요청의 대화 로그를 모아 두었다가, 백그라운드 스레드에서 여러 행을 한 번의 INSERT로 저장함.
+    저장 전의 로그를 읽어야 하는 곳은 flush(user_id)를 먼저 호출해야 함 (read-your-writes)
+    로그마다 요청을 처리한 앱을 함께 보관하므로, 한 프로세스에 앱(create_app)이 여러 개 있어도 각자의 DB에 저장됨
+    """
+    def __init__(self, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # (앱, 로그, 재시도 횟수) 리스트
+        self._rows = []
+        # 아직 저장되지 않은(대기 중 + 저장 중) 사용자별 로그 수
+        self._unsaved = Counter()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self._listeners = []
+
+    def add(self, user_id: int, receiver: str, chat_group_id: int, text: str):
+        """대화 로그 저장 요청 (요청 처리 스레드에서 호출, DB 접근 없음)
+        """
+        row = {
+            "user_id": user_id,
+            "receiver": receiver,
+            "chat_group_id": chat_group_id,
+            "text": text,
+            "time": datetime.utcnow()
+        }
+        with self._lock:
+            if self._thread is None:
+                self._start()
+            self._rows.append((current_app._get_current_object(), row, 0))
+            self._unsaved[user_id] += 1
+            if len(self._rows) >= self.batch_size:
+                self._wakeup.notify()
+            closed = self._closed
+        # 종료 후에 들어온 로그는 저장 스레드가 없으므로 바로 저장
+        if closed:
+            self._flush()
+
+    def add_listener(self, listener):
+        """로그가 저장될 때마다 호출할 함수 등록
+        listener(app, rows)로 호출되며 (rows: 저장된 로그 dict 리스트),
+        저장 스레드에서 실행되므로 오래 걸리는 작업은 따로 넘겨야 함
+        """
+        self._listeners.append(listener)
+
+    def flush(self, user_id: int = None):
+        """대기 중인 로그를 바로 저장
+        user_id를 주면 해당 사용자의 로그가 남아 있을 때만 저장함
+
+        Params:
+            user_id `int`:
+                사용자의 아이디 (옵션)
+        """
+        with self._lock:
+            if user_id is not None and not self._unsaved[user_id]:
+                return
+        self._flush()
+
+    def close(self):
+        """남은 로그를 모두 저장하고 백그라운드 스레드 종료
+        저장 스레드가 로그를 저장하는 중이면 그 저장이 끝난 뒤 종료하며, 여러 번 호출해도 됨
+        """
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify()
+            thread = self._thread
+        if thread and thread is not threading.current_thread():
+            thread.join()
+        # 저장에 실패한 로그는 재시도 횟수를 넘기면 버려지므로 반드시 끝남
+        while True:
+            self._flush()
+            with self._lock:
+                if not self._rows:
+                    return
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="chat-log-writer", daemon=True)
+        self._thread.start()
+        # 종료 시 남은 로그 저장. atexit은 백그라운드 실행기(ThreadPoolExecutor)가 닫힌 뒤에 실행되므로
+        # 이때 저장된 로그의 리스너 작업(인덱스, 프로필 갱신)은 등록되지 않고, 다음 로그가 저장될 때 이어서 처리됨
+        atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._closed and len(self._rows) < self.batch_size:
+                    self._wakeup.wait(self.flush_interval)
+                if self._closed:
+                    return
+            self._flush()
+
+    def _flush(self):
+        # 저장은 한 번에 하나씩 진행 (저장 중인 로그가 있으면 끝날 때까지 기다림)
+        with self._flush_lock:
+            with self._lock:
+                batch, self._rows = self._rows, []
+            if not batch:
+                return
+            # 같은 앱의 연속된 로그끼리 batch_size개씩 나누어 저장
+            chunk = []
+            for entry in batch:
+                if chunk and (entry[0] is not chunk[0][0] or len(chunk) >= self.batch_size):
+                    self._write(chunk[0][0], chunk)
+                    chunk = []
+                chunk.append(entry)
+            self._write(chunk[0][0], chunk)
+
+    def _write(self, app, batch: list):
+        rows = [row for _, row, _ in batch]
+        try:
+            self._insert(app, rows)
+        except Exception as e:
+            print(f"Error during chat log flush: {e}")
+            retry = [(app, row, tries + 1) for _, row, tries in batch if tries + 1 < MAX_RETRIES]
+            with self._lock:
+                # 실패한 로그는 순서를 유지하도록 큐 앞쪽에 다시 넣음
+                self._rows = retry + self._rows
+            # 재시도 횟수를 넘긴 로그는 한 행씩 저장하여, 저장할 수 없는 로그만 버림
+            rows = []
+            for _, row, tries in batch:
+                if tries + 1 < MAX_RETRIES:
+                    continue
+                try:
+                    self._insert(app, [row])
+                    rows.append(row)
+                except Exception as e:
+                    print(f"Dropped chat log of user {row['user_id']} after {MAX_RETRIES} retries: {e}")
+                    self._done([row])
+            if not rows:
+                return
+        self._done(rows)
+        for listener in self._listeners:
+            try:
+                listener(app, rows)
+            except Exception as e:
+                print(f"Error during chat log listener: {e}")
+
+    def _insert(self, app, rows: list):
+        with app.app_context():
+            db.session.execute(insert(ChatLog), rows)
+            db.session.commit()
+
+    def _done(self, rows: list):
+        # 저장했거나 버린 로그를 저장 대기 수에서 제외
+        with self._lock:
+            for row in rows:
+                self._unsaved[row["user_id"]] -= 1
+                if self._unsaved[row["user_id"]] <= 0:
+                    del self._unsaved[row["user_id"]]
+
+chat_log_writer = ChatLogWriter()
@@ -0,0 +1,140 @@
+import hashlib
+import os
+import tempfile
+
+from flask import current_app
+from config import Chatbot
+
+from app.chatbot import app_local
+from app.chatbot.background import KeyedExecutor
+from app.chatbot.history import log_text
+from app.models.user import ChatLog
+
+from .embedders import Embedder, HashingEmbedder, OpenAIEmbedder
+from .vector_index import VectorIndex
+
+# 사용자별 벡터 인덱스를 저장할 디렉토리
+# 앱 설정(MEMORY_INDEX_DIR)이 있으면 그 디렉토리를, 없으면 이 디렉토리 아래에 DB마다 하위 디렉토리를 만들어 사용함
+INDEX_DIR = getattr(Chatbot, "MEMORY_INDEX_DIR", "memory_index")
+# 임베딩 방식 (local: 서버에서 계산하는 HashingEmbedder, openai: OpenAI Embeddings API)
+EMBEDDER = getattr(Chatbot, "MEMORY_EMBEDDER", "local")
+EMBEDDING_MODEL = getattr(Chatbot, "MEMORY_EMBEDDING_MODEL", "text-embedding-ada-002")
+# 대화마다 프롬프트에 넣을 예전 대화 수와 최소 유사도 (None이면 임베더별 기본값)
+TOP_K = getattr(Chatbot, "MEMORY_TOP_K", 4)
+MIN_SCORE = getattr(Chatbot, "MEMORY_MIN_SCORE", None)
+# 프롬프트에 넣을 예전 대화 1개의 최대 글자 수
+MAX_CHARS = 200
+# 너무 짧은 메시지("네", "응" 등)는 검색에 도움이 되지 않으므로 인덱스에 넣지 않음
+MIN_CHARS = 4
+# 인덱스 갱신 시 한 번에 임베딩할 로그 수
+INDEX_BATCH_SIZE = 256
+
+def create_embedder(name: str) -> Embedder:
+    """설정 이름으로 임베더 생성
+    """
+    if name == "local":
+        return HashingEmbedder()
+    if name == "openai":
+        return OpenAIEmbedder(EMBEDDING_MODEL, api_base=getattr(Chatbot, "API_BASE", None))
+    raise ValueError(f"unknown memory embedder: {name}")
+
+embedder = create_embedder(EMBEDDER)
+
+# 인덱스 갱신은 요청과 별개로 백그라운드에서 진행
+_executor = KeyedExecutor(max_workers=1, thread_name_prefix="chat-memory")
+
+def _index_dir(app) -> str:
+    """앱의 벡터 인덱스 디렉토리
+    사용자 아이디는 DB마다 겹치므로 DB 주소별로 디렉토리를 나눔 (메모리 DB는 앱마다 임시 디렉토리)
+    """
+    if app.config.get("MEMORY_INDEX_DIR"):
+        return app.config["MEMORY_INDEX_DIR"]
+    uri = app.config.get("SQLALCHEMY_DATABASE_URI") or ""
+    if uri in ("sqlite://", "sqlite:///:memory:"):
+        # 임시 디렉토리를 앱에 보관하여, 앱이 사라지거나 프로세스가 끝나면 함께 삭제되도록 함
+        temp_dir = tempfile.TemporaryDirectory(prefix="memory_index-")
+        app.extensions["chatbot_memory_temp_dir"] = temp_dir
+        return temp_dir.name
+    return os.path.join(INDEX_DIR, hashlib.sha1(uri.encode()).hexdigest()[:12])
+
+def index_for(uid: int) -> VectorIndex:
+    """현재 앱에서 사용자의 벡터 인덱스
+    """
+    index_dir = app_local("chatbot_memory_index_dir", lambda: _index_dir(current_app))
+    return VectorIndex(os.path.join(index_dir, embedder.name, str(uid)), embedder.dim)
+
+def retrieve(uid: int, msg: str, before_id: int = None):
+    """사용자 메시지와 관련된 예전 대화를 프롬프트 메시지로 반환하는 함수
+    최근 대화(build_history)에 이미 들어가는 메시지는 제외하고, 최대 TOP_K개만 넣으므로
+    대화 기록이 아무리 길어져도 프롬프트 크기는 일정함
+
+    Params:
+        uid `int`:
+            사용자의 아이디
+        msg `str`:
+            사용자가 보낸 채팅 내용
+        before_id `int`:
+            최근 대화로 들어가는 가장 오래된 로그 아이디 (build_history의 first_id, 이후 로그는 검색에서 제외)
+
+    Returns:
+        messages `list`:
+            예전 대화 메시지 리스트 (관련된 대화가 없으면 빈 리스트)
+    """
+    if not msg or not msg.strip():
+        return []
+    try:
+        query = embedder.embed([msg])[0]
+        min_score = embedder.min_score if MIN_SCORE is None else MIN_SCORE
+        results = index_for(uid).search(query, TOP_K, before_id=before_id, min_score=min_score)
+    except Exception as e:
+        # 검색에 실패해도 대화는 계속 진행
+        print(f"Error during chat memory search: {e}")
+        return []
+    if not results:
+        return []
+
+    logs = ChatLog.query.filter(ChatLog.user_id == uid, ChatLog.id.in_([log_id for log_id, _ in results])).all()
+    logs.sort(key=lambda log: log.id)
+    lines = [f"- {log.time.year}년 {log.time.month}월 {log.time.day}일: {log_text(log)[:MAX_CHARS]}" for log in logs]
+    if not lines:
+        return []
+    return [{"role":"system", "content":"지금 대화와 관련된, 사용자가 예전에 했던 말:\n" + "\n".join(lines)}]
+
+def schedule_index(app, rows):
+    """인덱스 갱신 작업을 백그라운드에 등록하는 함수 (대화 로그가 저장될 때마다 호출됨)
+    """
+    for uid in {row["user_id"] for row in rows}:
+        _executor.submit((app, uid), _update_index, app, uid)
+
+def delete(uid: int):
+    """사용자의 벡터 인덱스 삭제 (회원 탈퇴 시)
+    """
+    index = index_for(uid)
+    with index.lock():
+        index.delete()
+
+def _update_index(app, uid: int):
+    """인덱스에 아직 들어가지 않은 사용자의 대화 로그를 임베딩하여 추가하는 함수
+    처음 호출되면 예전 대화 로그 전체를 INDEX_BATCH_SIZE개씩 나누어 추가함
+    """
+    try:
+        with app.app_context():
+            index = index_for(uid)
+            with index.lock():
+                while True:
+                    last_id = index.meta()["last_id"]
+                    logs = ChatLog.query.filter(
+                        ChatLog.user_id == uid,
+                        ChatLog.receiver == "user",
+                        ChatLog.id > last_id
+                    ).order_by(ChatLog.id).limit(INDEX_BATCH_SIZE).all()
+                    if not logs:
+                        return
+                    logs = [(log.id, log_text(log)) for log in logs]
+                    last_id = logs[-1][0]
+                    logs = [(log_id, text) for log_id, text in logs if len(text.strip()) >= MIN_CHARS]
+                    vectors = embedder.embed([text for _, text in logs]) if logs else None
+                    index.add([log_id for log_id, _ in logs], vectors, last_id)
+    except Exception as e:
+        # 실패한 로그는 last_id가 갱신되지 않으므로 다음 저장 때 다시 시도함
+        print(f"Error during chat memory index update: {e}")
@@ -0,0 +1,71 @@
+import re
+import zlib
+
+import numpy as np
+import openai
+
+class Embedder:
+    """문장 임베딩 인터페이스
+    name이 다르면 벡터 공간이 다르므로, 벡터 인덱스는 임베더 이름별로 따로 저장됨
+    """
+    name = None
+    dim = None
+    # 관련된 대화로 볼 최소 코사인 유사도 (임베딩 방식마다 유사도 분포가 다름)
+    min_score = 0.0
+
+    def embed(self, texts: list) -> np.ndarray:
+        """문장 리스트를 (len(texts), dim) 크기의 float32 벡터로 변환 (각 벡터의 길이는 1)
+        """
+        raise NotImplementedError
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return (vectors / norms).astype(np.float32)
+
+class HashingEmbedder(Embedder):
+    """외부 API 없이 서버에서 계산하는 임베딩 (기본값, OpenAI 임베딩을 사용할 수 없을 때의 대체 수단)
+    어절과 글자 2-gram/3-gram을 해시하여 고정 크기 벡터에 더함.
+    의미까지 이해하지는 못하지만, 같은 단어(이름, 지명, 음식 등)가 들어간 예전 대화를 찾는 데는 충분함
+    """
+    min_score = 0.1
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str):
+        text = re.sub(r"[^0-9a-zA-Z가-힣\s]", " ", text).lower()
+        for word in text.split():
+            yield "w:" + word
+            padded = f" {word} "
+            for n in (2, 3):
+                for i in range(len(padded) - n + 1):
+                    yield f"{n}:{padded[i:i + n]}"
+
+    def embed(self, texts: list) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                # 프로세스마다 값이 달라지는 hash() 대신 crc32 사용 (인덱스 파일을 여러 워커가 공유)
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        # 자주 나오는 특징의 영향을 줄이기 위해 log 스케일로 변환
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        return _normalize_rows(vectors)
+
+class OpenAIEmbedder(Embedder):
+    """OpenAI Embeddings API
+    """
+    min_score = 0.8
+
+    def __init__(self, model: str = "text-embedding-ada-002", dim: int = 1536, api_base: str = None):
+        self.model = model
+        self.dim = dim
+        self.api_base = api_base
+        self.name = model
+
+    def embed(self, texts: list) -> np.ndarray:
+        response = openai.Embedding.create(model=self.model, input=texts, api_base=self.api_base)
+        data = sorted(response["data"], key=lambda item: item["index"])
+        return _normalize_rows(np.array([item["embedding"] for item in data], dtype=np.float32))
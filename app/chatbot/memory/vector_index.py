@@ -0,0 +1,156 @@
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# 인덱스 파일을 처음 만들 때의 용량 (메시지 수, 가득 차면 두 배씩 늘림)
+INITIAL_CAPACITY = 256
+
+_thread_locks = {}
+_thread_locks_lock = threading.Lock()
+
+class VectorIndex:
+    """사용자 1명의 대화 벡터 인덱스 (NumPy memory-mapped 파일)
+
+    directory 아래에 다음 파일을 저장함
+        vectors.npy: (capacity, dim) float32 벡터
+        ids.npy: (capacity,) int64 대화 로그 아이디
+        meta.json: 저장된 벡터 수(count)와 마지막으로 확인한 대화 로그 아이디(last_id)
+
+    벡터를 먼저 쓰고 meta.json을 마지막에 교체하므로, 읽는 쪽은 항상 count개까지의 완성된 벡터만 보게 됨.
+    쓰기는 lock() 안에서만 해야 함 (같은 프로세스의 스레드, 다른 워커 프로세스 모두 막음)
+    """
+    def __init__(self, directory: str, dim: int):
+        self.directory = directory
+        self.dim = dim
+        self._vectors_path = os.path.join(directory, "vectors.npy")
+        self._ids_path = os.path.join(directory, "ids.npy")
+        self._meta_path = os.path.join(directory, "meta.json")
+
+    def meta(self) -> dict:
+        try:
+            with open(self._meta_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"count": 0, "last_id": 0}
+
+    @contextmanager
+    def lock(self):
+        """인덱스 쓰기 잠금
+        """
+        with _thread_locks_lock:
+            thread_lock = _thread_locks.setdefault(self.directory, threading.Lock())
+        with thread_lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, "lock"), "w") as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def add(self, ids: list, vectors: np.ndarray, last_id: int):
+        """벡터 추가 후 last_id 갱신 (lock() 안에서 호출)
+
+        Params:
+            ids `list`:
+                벡터에 해당하는 대화 로그 아이디
+            vectors `np.ndarray`:
+                (len(ids), dim) 벡터
+            last_id `int`:
+                이번에 확인한 마지막 대화 로그 아이디 (인덱스에 넣지 않은 로그 포함)
+        """
+        meta = self.meta()
+        count = meta["count"]
+        if ids:
+            stored_vectors, stored_ids = self._reserve(count + len(ids))
+            stored_vectors[count:count + len(ids)] = vectors
+            stored_ids[count:count + len(ids)] = ids
+            stored_vectors.flush()
+            stored_ids.flush()
+            del stored_vectors, stored_ids
+        self._write_meta({"count": count + len(ids), "last_id": last_id})
+
+    def search(self, query: np.ndarray, k: int, before_id: int = None, min_score: float = 0.0):
+        """query와 가장 비슷한 벡터 k개 검색
+
+        Params:
+            query `np.ndarray`:
+                (dim,) 벡터
+            k `int`:
+                검색할 개수
+            before_id `int`:
+                이 아이디 이전의 대화 로그만 검색 (프롬프트에 이미 들어가는 최근 대화 제외, None이면 전체)
+            min_score `float`:
+                최소 코사인 유사도
+
+        Returns:
+            results `list`:
+                (대화 로그 아이디, 유사도) 리스트, 유사도 높은 순
+        """
+        count = self.meta()["count"]
+        if count <= 0 or k <= 0:
+            return []
+        vectors = np.load(self._vectors_path, mmap_mode="r")
+        ids = np.load(self._ids_path, mmap_mode="r")
+        if before_id is not None:
+            # 대화 로그 아이디 순서대로 추가되므로 before_id 앞까지만 검색
+            count = int(np.searchsorted(ids[:count], before_id))
+            if count <= 0:
+                return []
+        scores = vectors[:count] @ query
+        k = min(k, count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top if scores[i] >= min_score]
+
+    def delete(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _reserve(self, size: int):
+        """size개 이상 저장할 수 있는 memmap 반환 (용량이 부족하면 두 배로 늘린 파일로 교체)
+        """
+        if os.path.exists(self._vectors_path):
+            vectors = np.load(self._vectors_path, mmap_mode="r+")
+            ids = np.load(self._ids_path, mmap_mode="r+")
+            if len(ids) >= size:
+                return vectors, ids
+            capacity = len(ids)
+        else:
+            vectors = ids = None
+            capacity = INITIAL_CAPACITY // 2
+        while capacity < size:
+            capacity *= 2
+
+        new_vectors = self._create(self._vectors_path, (capacity, self.dim), np.float32)
+        new_ids = self._create(self._ids_path, (capacity,), np.int64)
+        if vectors is not None:
+            new_vectors[:len(ids)] = vectors
+            new_ids[:len(ids)] = ids
+            del vectors, ids
+        new_vectors.flush()
+        new_ids.flush()
+        del new_vectors, new_ids
+        # 검색 중인 쪽은 기존 파일을 계속 읽을 수 있도록 새 파일을 만들어 교체
+        os.replace(self._vectors_path + ".tmp", self._vectors_path)
+        os.replace(self._ids_path + ".tmp", self._ids_path)
+        return np.load(self._vectors_path, mmap_mode="r+"), np.load(self._ids_path, mmap_mode="r+")
+
+    def _create(self, path: str, shape: tuple, dtype):
+        return np.lib.format.open_memmap(path + ".tmp", mode="w+", dtype=dtype, shape=shape)
+
+    def _write_meta(self, meta: dict):
+        tmp_path = self._meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path)
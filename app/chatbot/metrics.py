@@ -0,0 +1,17 @@
+import threading
+from collections import Counter
+
+_counters = Counter()
+_lock = threading.Lock()
+
+def increment(name: str, value: int = 1):
+    """카운터 증가
+    """
+    with _lock:
+        _counters[name] += value
+
+def snapshot():
+    """현재 카운터 값
+    """
+    with _lock:
+        return dict(_counters)
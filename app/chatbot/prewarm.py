@@ -0,0 +1,95 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from config import Chatbot
+
+from app.chatbot import app_local, history as chat_history, profile, router, sessions
+from app.chatbot.gateway import DEFAULT_TIMEOUT, gateway
+from app.models.user import User
+
+# 채팅 화면 진입 신호(/check_user_first type=get)에 미리 첫 인사를 만들어 둘지 여부
+ENABLED = getattr(Chatbot, "GREETING_PREWARM", True)
+# 미리 만든 첫 인사를 보관하는 시간 (초)
+GREETING_TTL = getattr(Chatbot, "GREETING_TTL", 120)
+# 미리 만들고 있는 첫 인사를 기다리는 최대 시간 (초)
+# LLM 제한 시간보다 짧으면 거의 다 만든 첫 인사를 버리고 같은 요청을 한 번 더 보내게 되므로 기본값은 LLM 제한 시간
+WAIT_TIMEOUT = getattr(Chatbot, "GREETING_WAIT_TIMEOUT", DEFAULT_TIMEOUT)
+GREETING_PROMPT = getattr(Chatbot, "GREETING_PROMPT", (
+    "사용자가 방금 채팅 화면을 열었어. 사용자의 정보와 지난 대화를 참고해서, "
+    "먼저 다정하게 안부를 묻는 첫 인사를 한두 문장으로 건네줘."
+))
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="chat-prewarm")
+_lock = threading.Lock()
+
+def _greetings() -> dict:
+    """현재 앱의 미리 만든 첫 인사 (사용자 id -> (첫 인사 Future, 만료 시각))
+    """
+    return app_local("chatbot_prewarmed_greetings", dict)
+
+def start(uid: int):
+    """첫 인사 미리 만들기 시작 (요청 처리 스레드에서 호출, 바로 반환)
+    사용자 프로필 프롬프트도 함께 만들어 캐시에 올려 두므로, 첫 대화는 프로필 조회 없이 진행됨
+
+    Params:
+        uid `int`:
+            사용자의 아이디
+    """
+    if not ENABLED:
+        return
+    greetings = _greetings()
+    with _lock:
+        _purge(greetings)
+        if uid in greetings:
+            return
+        app = current_app._get_current_object()
+        greetings[uid] = (_executor.submit(_generate, app, uid), time.monotonic() + GREETING_TTL)
+
+def take(uid: int):
+    """미리 만든 첫 인사 꺼내기 (한 번만 사용, 없거나 만들다 실패했으면 None)
+    """
+    greetings = _greetings()
+    with _lock:
+        _purge(greetings)
+        entry = greetings.pop(uid, None)
+    if entry is None:
+        return None
+    try:
+        return entry[0].result(WAIT_TIMEOUT)
+    except Exception as e:
+        print(f"Error during prewarmed greeting: {e}")
+        return None
+
+def generate(uid: int, chat_group_id: int = None) -> str:
+    """첫 인사 생성 함수
+
+    Params:
+        uid `int`:
+            사용자의 아이디
+        chat_group_id `int`:
+            대화 그룹 아이디 (옵션, 없으면 sessions.current_group으로 이번 대화 그룹을 찾음)
+
+    Returns:
+        msg `str`:
+            첫 인사 메시지
+    """
+    if chat_group_id is None:
+        chat_group_id = sessions.current_group(User.query.filter_by(id=uid).first())
+    messages = profile.prefix_messages(Chatbot.CHAT_PROMPT, uid)
+    messages.extend(chat_history.build_history(uid, chat_group_id)[0])
+    messages.append({"role":"system", "content":GREETING_PROMPT})
+    decision = router.choose(uid, "greeting")
+    with router.timed(decision):
+        return gateway.chat_sync(messages, model=decision.model, user=uid)
+
+def _generate(app, uid: int) -> str:
+    with app.app_context():
+        return generate(uid)
+
+def _purge(greetings: dict):
+    now = time.monotonic()
+    expired = [uid for uid, (_, expires_at) in greetings.items() if expires_at < now]
+    for uid in expired:
+        del greetings[uid]
@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+
+from config import Chatbot
+
+from app.chatbot import app_local
+
+# 캐시에 보관할 최대 사용자 수 (초과 시 가장 오래 사용하지 않은 사용자부터 제거)
+CACHE_SIZE = getattr(Chatbot, "PROFILE_CACHE_SIZE", 1024)
+# 프롬프트 보관 시간 (초). 무효화(invalidate)는 호출한 프로세스의 캐시에만 적용되므로,
+# 워커가 여러 개일 때 다른 워커에서 수정된 정보는 최대 이 시간만큼 늦게 반영됨
+CACHE_TTL = getattr(Chatbot, "PROFILE_CACHE_TTL", 60)
+
+class ProfileCache:
+    """사용자 프로필 프롬프트 캐시 (앱마다 하나, app_local 참고)
+    """
+    def __init__(self, size: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        # 조회 중에 무효화된 프롬프트가 다시 캐시에 들어가지 않도록 사용자별 무효화 횟수를 기록
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, uid: int, load) -> str:
+        with self._lock:
+            entry = self._entries.get(uid)
+            if entry is not None and entry[1] >= time.monotonic():
+                self._entries.move_to_end(uid)
+                return entry[0]
+            version = self._versions.get(uid, 0)
+
+        prompt = load(uid)
+
+        with self._lock:
+            if self._versions.get(uid, 0) != version:
+                return prompt
+            self._entries[uid] = (prompt, time.monotonic() + self.ttl)
+            self._entries.move_to_end(uid)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return prompt
+
+    def invalidate(self, uid: int):
+        with self._lock:
+            self._entries.pop(uid, None)
+            self._versions[uid] = self._versions.get(uid, 0) + 1
+
+def _cache() -> ProfileCache:
+    return app_local("chatbot_profile_cache", ProfileCache)
+
+def get_profile_prompt(uid: int) -> str:
+    """사용자 프로필 프롬프트 반환 함수
+    사용자 정보와 선호 정보 테이블을 매번 조회하지 않도록, 한 번 만든 프롬프트를 캐시에 보관함.
+    캐시는 사용자 정보가 수정/삭제될 때 무효화되고 (invalidate 참고), 다른 워커 프로세스에서 수정된 경우에는
+    CACHE_TTL이 지나야 다시 조회함
+
+    Params:
+        uid `int`:
+            사용자의 아이디
+
+    Returns:
+        prompt `str`:
+            사용자 프로필 프롬프트
+    """
+    return _cache().get(uid, lambda uid: Chatbot.request_propmt(uid=uid))
+
+def invalidate(uid: int):
+    """사용자 프로필 프롬프트 캐시 무효화 함수
+    """
+    _cache().invalidate(uid)
+
+def prefix_messages(system_prompt: str, uid: int):
+    """프롬프트의 고정 앞부분(시스템 프롬프트 + 사용자 프로필) 생성 함수
+    매 요청마다 내용이 바뀌지 않는 부분을 항상 맨 앞에 같은 순서로 두어야
+    LLM 제공자의 프롬프트 prefix 캐싱이 적용됨. 대화 기록 등 바뀌는 내용은 이 뒤에 붙일 것.
+    """
+    return [
+        {"role":"system", "content":system_prompt},
+        {"role":"user", "content":get_profile_prompt(uid)}
+    ]
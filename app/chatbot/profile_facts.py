@@ -0,0 +1,182 @@
+import json
+import re
+import threading
+from datetime import datetime, timedelta
+
+from config import Chatbot, Season
+
+from app import db
+from app.chatbot import profile
+from app.chatbot.background import KeyedExecutor
+from app.chatbot.gateway import gateway
+from app.chatbot.history import log_text
+from app.models.user import User, ChatLog, ProfileFactCheckpoint
+from app.models.user import UserFavoriteFood, UserFavoriteMusic, UserFavoriteSeason, UserPastJob, UserPet
+
+FACT_MODEL = getattr(Chatbot, "FACT_MODEL", getattr(Chatbot, "SUMMARY_MODEL", Chatbot.MODEL))
+# LLM 요청 1번에 넣을 최대 사용자 메시지 수
+BATCH_SIZE = getattr(Chatbot, "FACT_BATCH_SIZE", 40)
+# 새 메시지가 이만큼 쌓여야 추출함 (가장 오래된 메시지가 MAX_DELAY초 지나면 적어도 추출함)
+MIN_BATCH = getattr(Chatbot, "FACT_MIN_BATCH", 10)
+MAX_DELAY = getattr(Chatbot, "FACT_MAX_DELAY", 600)
+# 추출 작업을 동시에 진행할 최대 사용자 수
+WORKERS = getattr(Chatbot, "FACT_WORKERS", 2)
+FACT_PROMPT = getattr(Chatbot, "FACT_PROMPT", (
+    "너는 노인 사용자가 챗봇에게 한 말에서 사용자 프로필 정보를 찾는 역할을 해. "
+    "사용자가 직접, 분명하게 말한 내용만 골라서 다음 JSON 형식으로만 답해. 해당하는 내용이 없으면 빈 리스트나 null로 둬.\n"
+    '{"favorite_food": [좋아하는 음식], "favorite_music": [좋아하는 노래나 가수], '
+    '"favorite_season": [좋아하는 계절 (봄, 여름, 가을, 겨울 중)], "past_job": [예전에 했던 일], '
+    '"pet": [키우는 반려동물], "hometown": 고향 또는 null}\n'
+    "각 값은 \"된장찌개\", \"트로트\", \"강아지\"처럼 짧은 명사로 써줘."
+))
+
+# 선호 정보 테이블 (응답 키 -> (모델, 컬럼 이름))
+FACT_TABLES = {
+    "favorite_food": (UserFavoriteFood, "favorite_food"),
+    "favorite_music": (UserFavoriteMusic, "favorite_music"),
+    "favorite_season": (UserFavoriteSeason, "favorite_season"),
+    "past_job": (UserPastJob, "past_job"),
+    "pet": (UserPet, "pet"),
+}
+
+_executor = KeyedExecutor(max_workers=WORKERS, thread_name_prefix="profile-facts")
+# 메시지가 적어 추출을 미룬 사용자의 재확인 타이머 ((앱, 사용자 id) -> Timer)
+_timers = {}
+_timers_lock = threading.Lock()
+
+def schedule_extract(app, rows):
+    """프로필 정보 추출 작업을 백그라운드에 등록하는 함수 (대화 로그가 저장될 때마다 호출됨)
+    """
+    for uid in {row["user_id"] for row in rows}:
+        _executor.submit((app, uid), _extract, app, uid)
+
+def _recheck_later(app, uid: int, delay: float):
+    """delay초 뒤에 추출 작업을 다시 등록 (새 메시지가 없어도 MAX_DELAY가 지난 묶음을 추출하기 위함)
+    """
+    with _timers_lock:
+        if (app, uid) in _timers:
+            return
+        timer = threading.Timer(delay, _recheck, (app, uid))
+        timer.daemon = True
+        _timers[(app, uid)] = timer
+    timer.start()
+
+def _recheck(app, uid: int):
+    with _timers_lock:
+        _timers.pop((app, uid), None)
+    _executor.submit((app, uid), _extract, app, uid)
+
+def _extract(app, uid: int):
+    """체크포인트 이후의 사용자 메시지를 BATCH_SIZE개씩 묶어 프로필 정보를 추출하는 함수
+    묶음 하나를 처리할 때마다 추출 결과와 체크포인트를 한 트랜잭션으로 저장함
+    """
+    changed = False
+    try:
+        with app.app_context():
+            while True:
+                checkpoint = ProfileFactCheckpoint.query.filter_by(user_id=uid).first()
+                last_log_id = checkpoint.last_log_id if checkpoint else 0
+                logs = ChatLog.query.filter(
+                    ChatLog.user_id == uid,
+                    ChatLog.receiver == "user",
+                    ChatLog.id > last_log_id
+                ).order_by(ChatLog.id).limit(BATCH_SIZE).all()
+                if not logs:
+                    break
+                waited = datetime.utcnow() - logs[0].time
+                if len(logs) < MIN_BATCH and waited < timedelta(seconds=MAX_DELAY):
+                    # 새 메시지가 더 오지 않아도 MAX_DELAY가 지나면 추출하도록 재확인 예약
+                    _recheck_later(app, uid, MAX_DELAY - waited.total_seconds() + 1)
+                    break
+                texts = [log_text(log) for log in logs]
+                next_log_id = logs[-1].id
+                db.session.rollback()
+
+                facts = _ask(texts)
+                # 다른 워커가 같은 메시지를 먼저 처리했다면 결과를 버림
+                if checkpoint:
+                    claimed = ProfileFactCheckpoint.query.filter_by(
+                        user_id=uid, last_log_id=last_log_id
+                    ).update({"last_log_id": next_log_id})
+                    if not claimed:
+                        db.session.rollback()
+                        continue
+                else:
+                    db.session.add(ProfileFactCheckpoint(user_id=uid, last_log_id=next_log_id))
+                changed = _apply(uid, facts) or changed
+                db.session.commit()
+    except Exception as e:
+        # 실패한 묶음은 체크포인트가 갱신되지 않으므로 다음 저장 때 다시 시도함
+        print(f"Error during profile fact extraction: {e}")
+    finally:
+        if changed:
+            with app.app_context():
+                profile.invalidate(uid)
+
+def _ask(texts: list) -> dict:
+    """메시지 묶음에서 프로필 정보를 추출하는 LLM 요청 (묶음당 1번)
+    """
+    messages = [
+        {"role":"system", "content":FACT_PROMPT},
+        {"role":"user", "content":"\n".join(f"- {text}" for text in texts)}
+    ]
+    response = gateway.chat_sync(messages, model=FACT_MODEL)
+    match = re.search(r"\{.*\}", response, re.S)
+    if not match:
+        return {}
+    try:
+        facts = json.loads(match.group())
+    except ValueError:
+        return {}
+    return facts if isinstance(facts, dict) else {}
+
+def _clean(values, max_length: int):
+    """LLM이 준 값 정리 (문자열이 아니거나, 비어 있거나, 컬럼 길이를 넘는 값은 버림)
+    """
+    if isinstance(values, str):
+        values = [values]
+    if not isinstance(values, list):
+        return []
+    cleaned = []
+    for value in values:
+        if not isinstance(value, str):
+            continue
+        value = value.strip()
+        if value and len(value) <= max_length:
+            cleaned.append(value)
+    return cleaned
+
+def _apply(uid: int, facts: dict) -> bool:
+    """추출한 프로필 정보 중 아직 저장되지 않은 값만 추가 (기존 값은 수정/삭제하지 않음)
+
+    Returns:
+        changed `bool`:
+            추가한 값이 있는지 여부
+    """
+    changed = False
+    for key, (model, column) in FACT_TABLES.items():
+        values = _clean(facts.get(key), getattr(model, column).type.length)
+        if key == "favorite_season":
+            values = [Season.season_data[value] for value in values if value in Season.season_data]
+        if not values:
+            continue
+        existing = {
+            re.sub(r"\s", "", getattr(row, column) or "")
+            for row in model.query.filter_by(user_id=uid).all()
+        }
+        for value in values:
+            normalized = re.sub(r"\s", "", value)
+            if normalized in existing:
+                continue
+            existing.add(normalized)
+            db.session.add(model(user_id=uid, **{column: value}))
+            changed = True
+
+    hometown = _clean(facts.get("hometown"), User.hometown.type.length)
+    if hometown:
+        user = User.query.filter_by(id=uid).first()
+        # 사용자가 직접 입력한 고향은 덮어쓰지 않음
+        if user and not user.hometown:
+            user.hometown = hometown[0]
+            changed = True
+    return changed
@@ -0,0 +1,272 @@
+import asyncio
+import random
+import re
+from difflib import SequenceMatcher
+
+from config import Chatbot
+
+from app.chatbot import router, sessions
+from app.chatbot.gateway import gateway
+from app.chatbot.history import log_text
+from app.chatbot.log_writer import chat_log_writer
+from app.models.user import User, ChatLog
+from app.models.user import UserFavoriteFood, UserFavoriteMusic, UserFavoriteSeason, UserPastJob, UserPet
+
+# 퀴즈 엔진 (local: 프로필/대화 기록으로 서버에서 출제/채점, llm: LLM이 퀴즈 전체 진행)
+ENGINE = getattr(Chatbot, "QUIZ_ENGINE", "local")
+# 퀴즈 1회당 문제 수
+QUESTION_COUNT = getattr(Chatbot, "QUIZ_QUESTION_COUNT", 5)
+# 정답으로 인정할 최소 유사도 (자모 단위 비교, 0~1)
+MATCH_THRESHOLD = getattr(Chatbot, "QUIZ_MATCH_THRESHOLD", 0.75)
+# 문제 문장을 LLM으로 자연스럽게 다듬을지 여부
+PHRASE_WITH_LLM = getattr(Chatbot, "QUIZ_PHRASE_WITH_LLM", False)
+# 빈칸 문제를 만들 때 살펴볼 최근 사용자 메시지 수
+RECENT_LOG_LIMIT = 50
+
+PHRASE_PROMPT = (
+    "너는 노인 사용자에게 기억력 퀴즈를 내는 친절한 말동무야. "
+    "주어진 문제 문장의 뜻과 정답은 바꾸지 말고, 어르신께 말하듯 다정하고 자연스러운 한 문장으로 다시 써줘. "
+    "문제 문장만 답해."
+)
+END_MSG = "기억력 퀴즈는 여기까지 하도록 하겠습니다."
+
+SEASON_NAMES = {"SP": "봄", "SU": "여름", "AU": "가을", "WI": "겨울"}
+
+# 답변 끝에 붙는 조사/어미 (긴 것부터 확인)
+SUFFIXES = sorted([
+    "이었어요", "였어요", "이에요", "예요", "입니다", "이었지", "였지", "이요", "이야", "이랑", "에서", "으로", "하고",
+    "요", "야", "은", "는", "이", "가", "을", "를", "에", "로", "와", "과", "랑", "도", "의"
+], key=len, reverse=True)
+
+# 빈칸으로 만들지 않을 인사말 (이 말로 시작하는 어절)
+GREETINGS = ("안녕", "반가", "감사", "고마", "고맙", "미안", "죄송", "수고", "잘자", "잘가")
+# 문장을 끝맺는 어미 (이 말로 끝나는 어절은 서술어이므로 빈칸으로 만들지 않음)
+FINAL_ENDINGS = ("요", "다", "네", "죠", "까")
+
+CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONG = " ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
+
+def to_jamo(text: str) -> str:
+    """한글 음절을 초성/중성/종성 자모로 분리
+    ("사과" -> "ㅅㅏㄱㅘ"), 받침 하나가 틀린 정도의 오타도 높은 유사도를 갖도록 하기 위함
+    """
+    result = []
+    for c in text:
+        if "가" <= c <= "힣":
+            code = ord(c) - ord("가")
+            result.append(CHO[code // 588])
+            result.append(JUNG[(code % 588) // 28])
+            if code % 28:
+                result.append(JONG[code % 28])
+        else:
+            result.append(c)
+    return "".join(result)
+
+def normalize(text: str) -> str:
+    """공백과 문장 부호를 없애고 소문자로 변환
+    """
+    return re.sub(r"[^0-9a-zA-Z가-힣]", "", text).lower()
+
+def strip_suffix(word: str) -> str:
+    """단어 끝의 조사/어미 제거 (남는 글자가 없으면 그대로 반환)
+    """
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) > len(suffix):
+            return word[:-len(suffix)]
+    return word
+
+def similarity(answer: str, response: str) -> float:
+    """정답과 사용자 답변의 유사도 (0~1)
+    답변 전체, 조사를 뗀 답변, 답변의 각 어절 중 가장 높은 값을 사용함
+    """
+    answer = normalize(answer)
+    if not answer:
+        return 0.0
+    candidates = {normalize(response)}
+    for word in response.split():
+        candidates.add(normalize(word))
+        candidates.add(strip_suffix(normalize(word)))
+    candidates.add(strip_suffix(normalize(response)))
+    candidates.discard("")
+
+    best = 0.0
+    for candidate in candidates:
+        if len(answer) >= 2 and answer in candidate:
+            return 1.0
+        best = max(best, SequenceMatcher(None, to_jamo(answer), to_jamo(candidate)).ratio())
+    return best
+
+def is_correct(question: dict, response: str) -> bool:
+    return any(similarity(answer, response) >= MATCH_THRESHOLD for answer in question["answers"])
+
+def past_copula(word: str) -> str:
+    """단어 뒤에 붙일 "이었어요/였어요" (마지막 글자에 받침이 있으면 이었어요)
+    """
+    last = word[-1:] if word else ""
+    if "가" <= last <= "힣" and (ord(last) - ord("가")) % 28:
+        return "이었어요"
+    return "였어요"
+
+def _blank_candidates(text: str):
+    """빈칸으로 만들 수 있는 어절 찾기
+    인사말, 문장 끝의 서술어(좋네요, 먹었어요 등)는 빼고, 조사를 포함한 어절 전체를 정답으로 함
+
+    Returns:
+        candidates `list`:
+            (어절 위치, 정답) 리스트
+    """
+    words = text.split()
+    candidates = []
+    for index, word in enumerate(words):
+        keyword = re.sub(r"[^0-9a-zA-Z가-힣]", "", word)
+        if len(keyword) < 2 or not re.search("[가-힣]", keyword) or keyword not in word:
+            continue
+        if keyword.startswith(GREETINGS) or keyword.endswith(FINAL_ENDINGS):
+            continue
+        # 문장의 마지막 어절 (서술어)
+        if index == len(words) - 1 or re.search(r"[.?!~…]$", word):
+            continue
+        candidates.append((index, keyword))
+    return candidates
+
+def _profile_questions(uid: int):
+    user = User.query.filter_by(id=uid).first()
+    foods = [row.favorite_food for row in UserFavoriteFood.query.filter_by(user_id=uid).all() if row.favorite_food]
+    musics = [row.favorite_music for row in UserFavoriteMusic.query.filter_by(user_id=uid).all() if row.favorite_music]
+    seasons = [SEASON_NAMES.get(row.favorite_season, row.favorite_season)
+               for row in UserFavoriteSeason.query.filter_by(user_id=uid).all() if row.favorite_season]
+    pets = [row.pet for row in UserPet.query.filter_by(user_id=uid).all() if row.pet]
+    past_jobs = [row.past_job for row in UserPastJob.query.filter_by(user_id=uid).all() if row.past_job]
+
+    questions = []
+    if foods:
+        questions.append({"question": "전에 좋아한다고 말씀해 주신 음식이 있었어요. 어떤 음식이었을까요?", "answers": foods})
+    if musics:
+        questions.append({"question": "즐겨 들으신다고 말씀해 주신 노래가 있었어요. 어떤 노래였을까요?", "answers": musics})
+    if seasons:
+        questions.append({"question": "가장 좋아하는 계절이 언제라고 하셨었나요?", "answers": seasons})
+    if pets:
+        questions.append({"question": "함께 지내는 반려동물이 있다고 하셨어요. 어떤 동물이었나요?", "answers": pets})
+    if past_jobs:
+        questions.append({"question": "예전에 어떤 일을 하셨었는지 기억나세요?", "answers": past_jobs})
+    if user and user.hometown:
+        questions.append({"question": "고향이 어디라고 말씀해 주셨었나요?", "answers": [user.hometown]})
+    return questions
+
+def _chat_questions(uid: int):
+    """최근 사용자 메시지로 빈칸 문제 생성
+    메시지에서 빈칸으로 만들 수 있는 어절 중 가장 긴 어절을 빈칸으로 만들고, 그 어절을 정답으로 함
+    ("학교에서"가 정답이면 조사를 뗀 "학교"도 정답으로 인정)
+    """
+    chat_log_writer.flush(uid)
+    logs = ChatLog.query.filter_by(user_id=uid, receiver="user").order_by(ChatLog.id.desc()).limit(RECENT_LOG_LIMIT).all()
+    questions = []
+    for log in logs:
+        text = log_text(log).strip()
+        words = text.split()
+        if len(words) < 3 or len(text) > 80:
+            continue
+        candidates = _blank_candidates(text)
+        if not candidates:
+            continue
+        index, keyword = max(candidates, key=lambda candidate: len(candidate[1]))
+        words[index] = words[index].replace(keyword, "____", 1)
+        blanked = " ".join(words)
+        said_at = sessions.local_time(log.time)
+        answers = [keyword]
+        if strip_suffix(keyword) != keyword:
+            answers.append(strip_suffix(keyword))
+        questions.append({
+            "question": f"{said_at.month}월 {said_at.day}일에 이렇게 말씀하셨어요. \"{blanked}\" 빈칸에 들어갈 말은 무엇이었을까요?",
+            "answers": answers
+        })
+    return questions
+
+def build_questions(uid: int, count: int = QUESTION_COUNT):
+    """사용자 프로필과 최근 대화로 퀴즈 문제 생성
+    프로필 문제와 대화 빈칸 문제를 섞어서, 최대 count개를 반환함
+    """
+    profile_questions = _profile_questions(uid)
+    chat_questions = _chat_questions(uid)
+    random.shuffle(profile_questions)
+    random.shuffle(chat_questions)
+    half = (count + 1) // 2
+    questions = profile_questions[:half]
+    questions += chat_questions[:count - len(questions)]
+    # 대화 빈칸 문제가 부족하면 남은 프로필 문제로 채움
+    questions += profile_questions[half:half + count - len(questions)]
+    random.shuffle(questions)
+    return questions
+
+async def _phrase(uid: int, question: str) -> str:
+    """문제 문장을 LLM으로 자연스럽게 다듬음 (PHRASE_WITH_LLM이 꺼져 있거나 실패하면 원래 문장)
+    """
+    if not PHRASE_WITH_LLM:
+        return question
+    messages = [
+        {"role":"system", "content":PHRASE_PROMPT},
+        {"role":"user", "content":question}
+    ]
+    decision = router.choose(uid, "quiz_phrase", question)
+    try:
+        with router.timed(decision):
+            return await gateway.chat(messages, model=decision.model, user=uid, route="quiz", cache=True)
+    except Exception as e:
+        print(f"Error during quiz phrasing: {e}")
+        return question
+
+async def start(uid: int):
+    """로컬 퀴즈 시작
+
+    Params:
+        uid `int`:
+            사용자의 아이디
+
+    Returns:
+        msg `str`:
+            응답 메시지 (첫 번째 문제, 문제를 만들 수 없으면 None)
+        state `dict`:
+            퀴즈 세션 상태
+    """
+    # 문제 생성은 DB를 조회하므로 이벤트 루프 밖(스레드)에서 실행
+    questions = await asyncio.to_thread(build_questions, uid)
+    if not questions:
+        return None, None
+    state = {"engine": "local", "questions": questions, "index": 0, "correct": 0}
+    question = await _phrase(uid, questions[0]["question"])
+    return f"기억력 퀴즈를 시작할게요. 모두 {len(questions)}문제예요.\n1번 문제: {question}", state
+
+async def answer(uid: int, state: dict, msg: str):
+    """로컬 퀴즈 답변 채점 후 다음 문제 출제
+
+    Params:
+        uid `int`:
+            사용자의 아이디
+        state `dict`:
+            퀴즈 세션 상태
+        msg `str`:
+            사용자의 답변
+
+    Returns:
+        msg `str`:
+            응답 메시지 (채점 결과 + 다음 문제 또는 최종 결과)
+        state `dict`:
+            갱신된 퀴즈 세션 상태
+        finished `bool`:
+            퀴즈 종료 여부 (종료 시 state의 correct, questions로 결과 저장)
+    """
+    questions = state["questions"]
+    question = questions[state["index"]]
+    if is_correct(question, msg):
+        state["correct"] += 1
+        feedback = "맞았어요! 잘 기억하고 계시네요."
+    else:
+        correct_answer = question["answers"][0]
+        feedback = f"아쉬워요. 정답은 '{correct_answer}'{past_copula(correct_answer)}."
+    state["index"] += 1
+
+    if state["index"] >= len(questions):
+        return f"{feedback}\n{END_MSG} {len(questions)}문제 중 {state['correct']}문제를 맞히셨어요.", state, True
+    next_question = await _phrase(uid, questions[state["index"]]["question"])
+    return f"{feedback}\n{state['index'] + 1}번 문제: {next_question}", state, False
@@ -0,0 +1,96 @@
+import copy
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from config import Chatbot
+
+from app import db
+from app.chatbot import app_local
+from app.models.user import QuizSession
+
+# 퀴즈 세션 유지 시간 (초). 마지막 요청 이후 이 시간이 지나면 세션이 만료됨
+SESSION_TTL = getattr(Chatbot, "QUIZ_SESSION_TTL", 1800)
+# 퀴즈 세션 저장소 (memory: 서버 메모리, db: quiz_session 테이블)
+SESSION_STORE = getattr(Chatbot, "QUIZ_SESSION_STORE", "memory")
+
+class MemorySessionStore:
+    """서버 메모리 기반 퀴즈 세션 저장소
+    세션 상태는 퀴즈 대화 기록(LLM 퀴즈) 또는 문제/채점 상태(로컬 퀴즈) 등 JSON으로 저장 가능한 값
+    단일 프로세스에서만 공유되므로, 여러 워커를 사용할 경우 DBSessionStore를 사용해야 함
+    """
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, uid: int):
+        with self._lock:
+            self._purge()
+            session = self._sessions.get(session_id)
+            if not session or session["uid"] != uid:
+                return None
+            session["expires_at"] = time.monotonic() + self.ttl
+            return copy.deepcopy(session["state"])
+
+    def set(self, session_id: str, uid: int, state):
+        with self._lock:
+            self._sessions[session_id] = {
+                "uid": uid,
+                "state": copy.deepcopy(state),
+                "expires_at": time.monotonic() + self.ttl
+            }
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _purge(self):
+        now = time.monotonic()
+        expired = [key for key, session in self._sessions.items() if session["expires_at"] < now]
+        for key in expired:
+            del self._sessions[key]
+
+class DBSessionStore:
+    """DB(quiz_session 테이블) 기반 퀴즈 세션 저장소
+    """
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+
+    def get(self, session_id: str, uid: int):
+        session = QuizSession.query.filter_by(id=session_id, user_id=uid).first()
+        if not session:
+            return None
+        if session.expires_at < datetime.utcnow():
+            db.session.delete(session)
+            db.session.commit()
+            return None
+        return json.loads(session.state)
+
+    def set(self, session_id: str, uid: int, state):
+        session = QuizSession.query.filter_by(id=session_id).first()
+        if not session:
+            session = QuizSession(id=session_id, user_id=uid)
+            db.session.add(session)
+        session.state = json.dumps(state, ensure_ascii=False)
+        session.expires_at = datetime.utcnow() + timedelta(seconds=self.ttl)
+        db.session.commit()
+
+    def delete(self, session_id: str):
+        QuizSession.query.filter_by(id=session_id).delete()
+        db.session.commit()
+
+def current_store():
+    """현재 앱의 퀴즈 세션 저장소 (SESSION_STORE 설정에 따라 MemorySessionStore 또는 DBSessionStore)
+    """
+    return app_local(
+        "chatbot_quiz_sessions",
+        lambda: DBSessionStore(SESSION_TTL) if SESSION_STORE == "db" else MemorySessionStore(SESSION_TTL)
+    )
+
+def new_session_id() -> str:
+    """새 퀴즈 세션 아이디 생성 함수
+    """
+    return uuid.uuid4().hex
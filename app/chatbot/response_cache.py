@@ -0,0 +1,51 @@
+import threading
+import time
+from collections import OrderedDict
+
+from config import Chatbot
+
+from app.chatbot import app_local, metrics
+
+# 캐시에 보관할 최대 응답 수 (초과 시 가장 오래 사용하지 않은 응답부터 제거)
+CACHE_SIZE = getattr(Chatbot, "RESPONSE_CACHE_SIZE", 2048)
+# 응답 보관 시간 (초)
+CACHE_TTL = getattr(Chatbot, "RESPONSE_CACHE_TTL", 600)
+
+class ResponseCache:
+    """LLM 응답 캐시
+    키는 모델 + 메시지 리스트의 정규화된 해시값(app.chatbot.backends.request_key)으로,
+    완전히 같은 요청만 일치함
+    """
+    def __init__(self, size: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                metrics.increment("response_cache_miss")
+                return None
+            bot_msg, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                metrics.increment("response_cache_miss")
+                return None
+            self._entries.move_to_end(key)
+            metrics.increment("response_cache_hit")
+            return bot_msg
+
+    def set(self, key: str, bot_msg: str):
+        with self._lock:
+            self._entries[key] = (bot_msg, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+                metrics.increment("response_cache_evict")
+
+def current_cache() -> ResponseCache:
+    """현재 앱의 응답 캐시
+    """
+    return app_local("chatbot_response_cache", ResponseCache)
@@ -0,0 +1,147 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import Chatbot
+
+from app.chatbot import metrics
+
+# 짧은 잡담 등 가벼운 요청에 사용할 빠른 모델 (None이면 모든 요청에 Chatbot.MODEL 사용)
+FAST_MODEL = getattr(Chatbot, "FAST_MODEL", None)
+# 모델 선택 규칙 (위에서부터 확인하여 처음으로 조건이 모두 맞는 규칙의 모델 사용, 맞는 규칙이 없으면 Chatbot.MODEL)
+# route: 요청 종류 (chat, greeting, quiz, quiz_phrase)
+# max_length / min_length: 사용자 메시지 글자 수 범위
+# max_history: 프롬프트에 들어가는 최근 대화 메시지 수 상한 (대화 초반인지)
+# memory: 예전 대화 검색 결과가 프롬프트에 들어가는지 여부
+RULES = getattr(Chatbot, "ROUTER_RULES", [
+    # 퀴즈 진행/채점은 정확도가 중요하므로 기본 모델 사용
+    {"name": "quiz", "route": "quiz", "model": Chatbot.MODEL},
+    {"name": "quiz_phrase", "route": "quiz_phrase", "model": FAST_MODEL},
+    # 예전 대화를 떠올려야 하는 대화는 기본 모델 사용
+    {"name": "recall", "route": "chat", "memory": True, "model": Chatbot.MODEL},
+    # 채팅 화면을 열 때의 첫 인사, 맞장구 등 짧은 잡담
+    {"name": "greeting", "route": "greeting", "model": FAST_MODEL},
+    {"name": "small_talk", "route": "chat", "max_length": 10, "model": FAST_MODEL},
+    {"name": "short_chat", "route": "chat", "max_length": 40, "max_history": 6, "model": FAST_MODEL},
+])
+# 사용자별 모델 지정 (사용자 id -> 모델), 규칙보다 우선함
+USER_OVERRIDES = getattr(Chatbot, "ROUTER_USER_OVERRIDES", {})
+# 모델 선택 기록을 JSON Lines로 남길 파일 (None이면 남기지 않음)
+LOG_FILE = getattr(Chatbot, "ROUTER_LOG_FILE", None)
+
+class Decision:
+    """모델 선택 결과
+    """
+    def __init__(self, uid: int, route: str, model: str, rule: str, length: int):
+        self.uid = uid
+        self.route = route
+        self.model = model
+        self.rule = rule
+        self.length = length
+
+def _matches(rule: dict, route: str, length: int, history: int, memory: bool) -> bool:
+    if not rule.get("model"):
+        return False
+    if rule.get("route") is not None and rule["route"] != route:
+        return False
+    if rule.get("max_length") is not None and length > rule["max_length"]:
+        return False
+    if rule.get("min_length") is not None and length < rule["min_length"]:
+        return False
+    if rule.get("max_history") is not None and history > rule["max_history"]:
+        return False
+    if rule.get("memory") is not None and rule["memory"] != memory:
+        return False
+    return True
+
+def choose(uid: int, route: str, msg: str = "", history: int = 0, memory: bool = False) -> Decision:
+    """요청에 사용할 모델 선택 함수
+
+    Params:
+        uid `int`:
+            사용자의 아이디
+        route `str`:
+            요청 종류 (chat, greeting, quiz, quiz_phrase)
+        msg `str`:
+            사용자 메시지
+        history `int`:
+            프롬프트에 들어가는 최근 대화 메시지 수
+        memory `bool`:
+            예전 대화 검색 결과가 프롬프트에 들어가는지 여부
+
+    Returns:
+        decision `Decision`:
+            선택한 모델과 적용된 규칙
+    """
+    length = len((msg or "").strip())
+    if uid in USER_OVERRIDES:
+        return Decision(uid, route, USER_OVERRIDES[uid], "user_override", length)
+    for rule in RULES:
+        if _matches(rule, route, length, history, memory):
+            return Decision(uid, route, rule["model"], rule.get("name", "rule"), length)
+    return Decision(uid, route, Chatbot.MODEL, "default", length)
+
+class RouterStats:
+    """규칙별 모델 선택 횟수와 소요 시간 기록
+    """
+    def __init__(self):
+        self._stats = defaultdict(lambda: {"count": 0, "errors": 0, "total_time": 0.0})
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+
+    def record(self, decision: Decision, duration: float, ok: bool = True):
+        """요청 1건의 모델 선택 결과와 소요 시간 기록
+        """
+        key = f"{decision.route}.{decision.rule}.{decision.model}"
+        with self._lock:
+            stat = self._stats[key]
+            stat["count"] += 1
+            stat["total_time"] += duration
+            if not ok:
+                stat["errors"] += 1
+        metrics.increment(f"router_{decision.rule}")
+        if LOG_FILE:
+            self._log(decision, duration, ok)
+
+    def snapshot(self):
+        """규칙별 선택 횟수, 실패 횟수, 평균 소요 시간
+        """
+        with self._lock:
+            return {
+                key: {"count": stat["count"], "errors": stat["errors"], "avg_time": stat["total_time"] / stat["count"]}
+                for key, stat in self._stats.items()
+            }
+
+    def _log(self, decision: Decision, duration: float, ok: bool):
+        line = json.dumps({
+            "time": datetime.utcnow().isoformat(),
+            "uid": decision.uid,
+            "route": decision.route,
+            "rule": decision.rule,
+            "model": decision.model,
+            "length": decision.length,
+            "duration": round(duration, 3),
+            "ok": ok
+        }, ensure_ascii=False)
+        try:
+            with self._log_lock, open(LOG_FILE, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"Error during router log write: {e}")
+
+stats = RouterStats()
+
+@contextmanager
+def timed(decision: Decision):
+    """선택한 모델로 요청하는 블록의 소요 시간과 성공 여부를 기록하는 컨텍스트 매니저
+    """
+    started = time.monotonic()
+    ok = False
+    try:
+        yield decision
+        ok = True
+    finally:
+        stats.record(decision, time.monotonic() - started, ok)
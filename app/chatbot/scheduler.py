@@ -0,0 +1,130 @@
+import asyncio
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from config import Chatbot
+
+# 사용자 1명이 동시에 진행할 수 있는 최대 LLM 요청 수
+PER_USER_LIMIT = getattr(Chatbot, "SCHEDULER_PER_USER_LIMIT", 2)
+# 대기열에서 기다릴 수 있는 최대 시간 (초). 이보다 오래 기다려야 하면 바로 거절함
+QUEUE_TIMEOUT = getattr(Chatbot, "SCHEDULER_QUEUE_TIMEOUT", 10)
+# 사용자별 가중치 (기본값 1, 값이 클수록 더 많은 몫을 받음)
+USER_WEIGHTS = getattr(Chatbot, "SCHEDULER_USER_WEIGHTS", {})
+
+class SchedulerBusy(Exception):
+    """대기 시간이 QUEUE_TIMEOUT을 넘어 요청이 거절됨
+
+    Params:
+        retry_after `int`:
+            다시 시도할 때까지 기다려야 하는 시간 (초)
+    """
+    def __init__(self, retry_after: int):
+        super().__init__(f"scheduler busy, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+class _Waiter:
+    def __init__(self, user, start_tag: float, finish_tag: float, future: asyncio.Future):
+        self.user = user
+        self.start_tag = start_tag
+        self.finish_tag = finish_tag
+        self.future = future
+
+class FairScheduler:
+    """사용자별 공정 큐 스케줄러 (weighted fair queueing)
+    전체 동시 요청 수와 사용자별 동시 요청 수를 제한하고, 자리가 나면 대기 중인 요청 중
+    가상 종료 시각(finish tag)이 가장 이른 요청부터 처리함. 요청을 많이 보낸 사용자일수록
+    finish tag가 뒤로 밀리므로, 한 사용자가 대기열을 독차지할 수 없음.
+    LLMGateway의 이벤트 루프에서만 사용해야 함
+    """
+    def __init__(self, max_in_flight: int, per_user_limit: int = PER_USER_LIMIT,
+                 queue_timeout: float = QUEUE_TIMEOUT, weights: dict = USER_WEIGHTS):
+        self.max_in_flight = max_in_flight
+        self.per_user_limit = per_user_limit
+        self.queue_timeout = queue_timeout
+        self.weights = weights
+        self._in_flight = 0
+        self._user_in_flight = defaultdict(int)
+        self._last_finish = defaultdict(float)
+        self._virtual_time = 0.0
+        self._waiters = []
+        # 요청 1건의 평균 처리 시간 (초, 지수 이동 평균)
+        self._service_time = 1.0
+
+    def _can_run(self, user) -> bool:
+        return self._in_flight < self.max_in_flight and self._user_in_flight.get(user, 0) < self.per_user_limit
+
+    def _runnable_waiters(self):
+        return [waiter for waiter in self._waiters if self._user_in_flight.get(waiter.user, 0) < self.per_user_limit]
+
+    def _estimated_wait(self) -> float:
+        return (len(self._waiters) + 1) * self._service_time / self.max_in_flight
+
+    async def acquire(self, user):
+        """요청 처리 자리 확보 (자리가 날 때까지 대기, 대기 시간 초과 시 SchedulerBusy)
+        """
+        # 먼저 기다리던 요청 중 처리 가능한 요청이 없다면 바로 처리
+        if self._can_run(user) and not self._runnable_waiters():
+            self._grant(user)
+            return
+
+        # Error: 예상 대기 시간이 제한 시간을 넘으면 기다리지 않고 바로 거절
+        estimated_wait = self._estimated_wait()
+        if estimated_wait > self.queue_timeout:
+            raise SchedulerBusy(max(1, round(estimated_wait - self.queue_timeout)))
+
+        weight = self.weights.get(user, 1)
+        start_tag = max(self._virtual_time, self._last_finish[user])
+        finish_tag = start_tag + 1 / weight
+        self._last_finish[user] = finish_tag
+        waiter = _Waiter(user, start_tag, finish_tag, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 자리를 받은 직후 취소된 경우 자리를 돌려줌
+                self.release(user)
+            else:
+                waiter.future.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise SchedulerBusy(max(1, round(self._estimated_wait()))) from None
+            raise
+
+    def release(self, user, service_time: float = None):
+        """요청 처리 자리 반환 후 대기 중인 다음 요청 처리
+        """
+        self._in_flight -= 1
+        self._user_in_flight[user] -= 1
+        if self._user_in_flight[user] <= 0:
+            del self._user_in_flight[user]
+        if service_time is not None:
+            self._service_time = 0.9 * self._service_time + 0.1 * service_time
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, user):
+        """요청 처리 자리를 확보하고, 블록이 끝나면 반환하는 컨텍스트 매니저
+        """
+        await self.acquire(user)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(user, time.monotonic() - started)
+
+    def _grant(self, user):
+        self._in_flight += 1
+        self._user_in_flight[user] += 1
+
+    def _dispatch(self):
+        while self._waiters and self._in_flight < self.max_in_flight:
+            runnable = self._runnable_waiters()
+            if not runnable:
+                return
+            waiter = min(runnable, key=lambda w: w.finish_tag)
+            self._waiters.remove(waiter)
+            self._virtual_time = max(self._virtual_time, waiter.start_tag)
+            self._grant(waiter.user)
+            waiter.future.set_result(None)
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.exc import IntegrityError
+from config import Chatbot
+
+from app import db
+from app.chatbot import history as chat_history
+from app.chatbot.log_writer import chat_log_writer
+from app.models.user import User, ChatSummary
+
+# 마지막 대화 이후 이 시간(초)이 지나면 새 대화 세션(대화 그룹)을 시작함
+IDLE_GAP = getattr(Chatbot, "SESSION_IDLE_GAP", 1800)
+# 하루가 바뀌는 시각 (사용자 지역 시간 기준). 이 시각을 넘기면 대화가 이어지고 있어도 새 세션을 시작함
+DAY_START_HOUR = getattr(Chatbot, "SESSION_DAY_START_HOUR", 4)
+TIMEZONE = ZoneInfo(getattr(Chatbot, "SESSION_TIMEZONE", "Asia/Seoul"))
+# 대화 세션 목록 한 번에 불러올 최대 개수
+MAX_LIST_SIZE = 50
+
+def local_time(at: datetime) -> datetime:
+    """DB에 저장된 UTC 시각을 사용자 지역 시간(TIMEZONE)으로 변환
+    """
+    return at.replace(tzinfo=ZoneInfo("UTC")).astimezone(TIMEZONE)
+
+def _session_day(at: datetime):
+    """세션 기준 날짜 (UTC 시각 -> 사용자 지역 시간에서 DAY_START_HOUR를 하루의 시작으로 본 날짜)
+    """
+    return (local_time(at) - timedelta(hours=DAY_START_HOUR)).date()
+
+def should_rotate(last_at: datetime, now: datetime) -> bool:
+    """마지막 대화 시각(last_at)과 현재 시각(now, UTC)으로 새 세션을 시작해야 하는지 판단
+    """
+    if now - last_at > timedelta(seconds=IDLE_GAP):
+        return True
+    return _session_day(last_at) != _session_day(now)
+
+def current_group(user: User) -> int:
+    """이번 대화에 사용할 대화 그룹 아이디 반환 함수
+    현재 대화 그룹의 마지막 대화가 오래됐거나 하루가 바뀌었다면 새 대화 그룹을 시작함
+
+    Params:
+        user `User`:
+            사용자
+
+    Returns:
+        chat_group_id `int`:
+            대화 그룹 아이디
+    """
+    # 아직 저장되지 않은 로그가 있으면 먼저 저장 (세션 정보가 함께 갱신됨)
+    chat_log_writer.flush(user.id)
+    session = ChatSummary.query.filter_by(user_id=user.id, chat_group_id=user.last_chat_group).first()
+    if session and session.ended_at and should_rotate(session.ended_at, datetime.utcnow()):
+        return rotate(user)
+    return user.last_chat_group
+
+def close(user: User) -> bool:
+    """현재 대화 세션 종료 (대화가 없는 세션이면 그대로 둠)
+
+    Returns:
+        closed `bool`:
+            세션 종료 여부
+    """
+    chat_log_writer.flush(user.id)
+    session = ChatSummary.query.filter_by(user_id=user.id, chat_group_id=user.last_chat_group).first()
+    if not session or not session.message_count:
+        return False
+    rotate(user)
+    return True
+
+def rotate(user: User) -> int:
+    """새 대화 그룹 시작 후 끝난 대화 그룹 전체를 요약
+    여러 요청이 동시에 새 그룹을 시작하려 해도 한 번만 넘어가도록 현재 값을 조건으로 갱신함
+
+    Returns:
+        chat_group_id `int`:
+            새 대화 그룹 아이디
+    """
+    ended_group = user.last_chat_group
+    User.query.filter_by(id=user.id, last_chat_group=ended_group).update({"last_chat_group": ended_group + 1})
+    db.session.commit()
+    db.session.refresh(user)
+    if user.last_chat_group == ended_group + 1:
+        chat_history.schedule_summary(user.id, ended_group)
+    return user.last_chat_group
+
+def record_activity(app, rows):
+    """저장된 대화 로그로 대화 세션 정보(시작/마지막 대화 시각, 메시지 수) 갱신 (로그 저장 시 호출됨)
+    """
+    stats = {}
+    for row in rows:
+        key = (row["user_id"], row["chat_group_id"])
+        count, started_at, ended_at = stats.get(key, (0, row["time"], row["time"]))
+        stats[key] = (count + 1, min(started_at, row["time"]), max(ended_at, row["time"]))
+
+    with app.app_context():
+        for (uid, chat_group_id), (count, started_at, ended_at) in stats.items():
+            # 요약 작업과 동시에 행을 만들다 충돌하면 한 번 더 시도
+            for _ in range(2):
+                try:
+                    _record(uid, chat_group_id, count, started_at, ended_at)
+                    db.session.commit()
+                    break
+                except IntegrityError:
+                    db.session.rollback()
+
+def _record(uid: int, chat_group_id: int, count: int, started_at: datetime, ended_at: datetime):
+    updated = ChatSummary.query.filter_by(user_id=uid, chat_group_id=chat_group_id).update({
+        "message_count": ChatSummary.message_count + count,
+        "started_at": db.func.coalesce(ChatSummary.started_at, started_at),
+        "ended_at": ended_at
+    }, synchronize_session=False)
+    if not updated:
+        db.session.add(ChatSummary(
+            user_id=uid,
+            chat_group_id=chat_group_id,
+            summary="",
+            summarized_until=0,
+            started_at=started_at,
+            ended_at=ended_at,
+            message_count=count
+        ))
+
+def list_sessions(uid: int, limit: int = 20, before: int = None):
+    """대화 세션 목록 (최신순)
+
+    Params:
+        uid `int`:
+            사용자의 아이디
+        limit `int`:
+            불러올 개수 (최대 MAX_LIST_SIZE)
+        before `int`:
+            이 대화 그룹 아이디보다 이전 세션만 불러오기 (옵션, 다음 페이지 조회 시)
+
+    Returns:
+        sessions `list`:
+            ChatSummary 리스트
+    """
+    query = ChatSummary.query.filter(ChatSummary.user_id == uid, ChatSummary.message_count > 0)
+    if before is not None:
+        query = query.filter(ChatSummary.chat_group_id < before)
+    return query.order_by(ChatSummary.chat_group_id.desc()).limit(min(limit, MAX_LIST_SIZE)).all()
@@ -0,0 +1,115 @@
+"""DB 스키마 버전 관리
+
+적용된 스키마 변경(versions.py)의 버전을 schema_version 테이블에 기록하고, 아직 적용되지 않은 변경을 순서대로 실행함.
+
+사용법:
+    flask --app app db-upgrade    # 밀린 스키마 변경 적용
+    flask --app app db-check      # 모델과 실제 스키마 비교
+"""
+from datetime import datetime
+
+import click
+import sqlalchemy as sa
+from flask import Flask
+from flask.cli import with_appcontext
+
+from app import db
+from app.migrations.versions import MIGRATIONS
+
+# 앱 테이블(db.metadata)과 따로 관리하여 모델 검사(check)에 포함되지 않도록 함
+_metadata = sa.MetaData()
+schema_version = sa.Table(
+    "schema_version", _metadata,
+    sa.Column("version", sa.Integer, primary_key=True, autoincrement=False),
+    sa.Column("name", sa.String(100), nullable=False),
+    sa.Column("applied_at", sa.DateTime, nullable=False),
+)
+
+def applied_versions(conn) -> set:
+    if not sa.inspect(conn).has_table("schema_version"):
+        return set()
+    return {row.version for row in conn.execute(sa.select(schema_version.c.version))}
+
+def upgrade() -> list:
+    """아직 적용되지 않은 스키마 변경을 버전 순서대로 적용 (앱 컨텍스트 안에서 호출)
+
+    Returns:
+        applied `list`:
+            이번에 적용한 변경의 (버전, 이름) 리스트
+    """
+    applied = []
+    with db.engine.connect() as conn:
+        schema_version.create(conn, checkfirst=True)
+        conn.commit()
+        done = applied_versions(conn)
+        for version, name, func in sorted(MIGRATIONS, key=lambda m: m[0]):
+            if version in done:
+                continue
+            func(conn)
+            conn.execute(sa.insert(schema_version).values(version=version, name=name, applied_at=datetime.utcnow()))
+            conn.commit()
+            applied.append((version, name))
+    return applied
+
+def check() -> list:
+    """모델(app/models)에 선언된 테이블/컬럼/인덱스 중 실제 DB에 없는 것 찾기 (앱 컨텍스트 안에서 호출)
+
+    Returns:
+        problems `list`:
+            문제 설명 문자열 리스트 (없으면 빈 리스트)
+    """
+    problems = []
+    with db.engine.connect() as conn:
+        inspector = sa.inspect(conn)
+        pending = sorted({version for version, _, _ in MIGRATIONS} - applied_versions(conn))
+        if pending:
+            problems.append(f"schema migrations {pending} not applied")
+        tables = set(inspector.get_table_names())
+        for table in db.metadata.sorted_tables:
+            if table.name not in tables:
+                problems.append(f"missing table {table.name}")
+                continue
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in columns:
+                    problems.append(f"missing column {table.name}.{column.name}")
+            indexes = {index["name"]: index for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    problems.append(f"missing {'unique ' if index.unique else ''}index {index.name} on {table.name}")
+                elif index.unique and not indexes[index.name]["unique"]:
+                    problems.append(f"index {index.name} on {table.name} is not unique")
+    return problems
+
+def warn_if_outdated(app: Flask):
+    """앱 시작 시 스키마 확인 (모자란 인덱스 등이 있으면 경고만 출력하고 계속 실행)
+    """
+    with app.app_context():
+        try:
+            problems = check()
+        except Exception as e:
+            print(f"Error during schema check: {e}")
+            return
+    for problem in problems:
+        print(f"Warning: {problem} (run 'flask --app app db-upgrade')")
+
+@click.command("db-upgrade")
+@with_appcontext
+def upgrade_command():
+    """밀린 스키마 변경 적용"""
+    applied = upgrade()
+    for version, name in applied:
+        click.echo(f"applied {version}: {name}")
+    if not applied:
+        click.echo("schema is up to date")
+
+@click.command("db-check")
+@with_appcontext
+def check_command():
+    """모델과 실제 스키마 비교"""
+    problems = check()
+    for problem in problems:
+        click.echo(problem)
+    if problems:
+        raise SystemExit(1)
+    click.echo("schema is up to date")
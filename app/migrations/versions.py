@@ -0,0 +1,167 @@
+"""스키마 변경 목록
+
+버전 번호 순서대로 한 번씩 실행되며, 이미 적용된 변경은 다시 실행하지 않음.
+변경 함수는 DB 연결(conn) 하나를 받아 DDL을 실행함. MySQL은 DDL이 트랜잭션으로 묶이지 않으므로,
+중간에 실패한 변경을 다시 실행해도 되도록 이미 있는 테이블/컬럼/인덱스는 건너뜀.
+
+각 변경은 그 버전 시점의 테이블/컬럼/인덱스를 이 파일 안에 직접 적어 둠 (모델이나 db.metadata를 참조하지 않음).
+모델은 이후에도 계속 바뀌므로, 모델을 참조하면 오래된 DB를 올릴 때 이전 버전이 나중 버전의 내용까지 만들어 버림.
+새 변경은 맨 아래에 다음 버전 번호로 추가하고, 모델(app/models)에도 같은 내용을 선언해야 함.
+"""
+import sqlalchemy as sa
+
+MIGRATIONS = []
+
+def migration(version: int, name: str):
+    """스키마 변경 함수 등록 데코레이터
+    """
+    def decorator(func):
+        MIGRATIONS.append((version, name, func))
+        return func
+    return decorator
+
+def add_column(conn, table: str, column: sa.Column):
+    """컬럼 추가 (이미 있으면 건너뜀)
+    NOT NULL 컬럼은 기존 행에 넣을 server_default를 지정해야 함
+    """
+    if column.name in {c["name"] for c in sa.inspect(conn).get_columns(table)}:
+        return
+    ddl = sa.schema.CreateColumn(column).compile(dialect=conn.dialect)
+    conn.execute(sa.text(f"ALTER TABLE {conn.dialect.identifier_preparer.quote(table)} ADD COLUMN {ddl}"))
+
+def create_index(conn, table: str, name: str, columns: list, unique: bool = False):
+    """인덱스 생성 (이미 있으면 건너뜀)
+    유니크 인덱스는 중복된 값이 있으면 만들 수 없으므로, 중복을 먼저 찾아 알려 줌
+    """
+    if name in {index["name"] for index in sa.inspect(conn).get_indexes(table)}:
+        return
+    # 인덱스 DDL에는 컬럼 이름만 필요하므로 이름만 가진 테이블로 만듦
+    target = sa.Table(table, sa.MetaData(), *(sa.Column(column) for column in columns))
+    index = sa.Index(name, *(target.c[column] for column in columns), unique=unique)
+    if unique:
+        duplicates = conn.execute(
+            sa.select(*target.c, sa.func.count()).group_by(*target.c).having(sa.func.count() > 1).limit(5)
+        ).all()
+        if duplicates:
+            raise RuntimeError(f"cannot create unique index {name}: duplicated values {[tuple(row[:-1]) for row in duplicates]}")
+    index.create(conn)
+
+@migration(1, "create missing tables")
+def create_tables(conn):
+    # 처음 설치하는 DB는 모든 테이블을 만들고,
+    # 기존 DB는 이후에 추가된 테이블(chat_summary, quiz_session, profile_fact_checkpoint 등)만 만듦
+    # (버전 1 시점의 테이블. 이후 버전에서 추가한 컬럼과 인덱스는 넣지 않음)
+    metadata = sa.MetaData()
+    tables = [
+        sa.Table(
+            "main_nok", metadata,
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("nok_id", sa.String(20), nullable=False),
+            sa.Column("nok_pw", sa.String(100), nullable=False),
+            sa.Column("name", sa.String(20), nullable=False),
+            sa.Column("birthday", sa.DateTime, nullable=False),
+            sa.Column("gender", sa.String(1), nullable=False),
+            sa.Column("address", sa.String(100), nullable=False),
+            sa.Column("tell", sa.String(20), nullable=False),
+        ),
+        sa.Table(
+            "user", metadata,
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("main_nok_id", sa.Integer, sa.ForeignKey("main_nok.id"), nullable=False),
+            sa.Column("user_id", sa.String(20), nullable=False),
+            sa.Column("user_pw", sa.String(100), nullable=False),
+            sa.Column("name", sa.String(20), nullable=False),
+            sa.Column("birthday", sa.DateTime),
+            sa.Column("gender", sa.String(1), nullable=False),
+            sa.Column("relation", sa.String(20), nullable=False),
+            sa.Column("address", sa.String(100), nullable=False),
+            sa.Column("blood_type", sa.String(2), nullable=True),
+            sa.Column("chronic_illness", sa.BLOB, nullable=True),
+            sa.Column("hometown", sa.String(100), nullable=True),
+            sa.Column("details", sa.String(500), nullable=True),
+            sa.Column("last_chat_group", sa.Integer, nullable=False),
+            sa.Column("is_first", sa.Boolean, nullable=False),
+            sa.Column("is_exercise_first", sa.Boolean, nullable=False),
+        ),
+    ]
+    for table, column, length in (
+        ("user_favorite_food", "favorite_food", 20),
+        ("user_favorite_music", "favorite_music", 50),
+        ("user_favorite_season", "favorite_season", 2),
+        ("user_past_job", "past_job", 20),
+        ("user_pet", "pet", 20),
+    ):
+        tables.append(sa.Table(
+            table, metadata,
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("user_id", sa.Integer, sa.ForeignKey("user.id"), nullable=False),
+            sa.Column(column, sa.String(length)),
+        ))
+    tables += [
+        sa.Table(
+            "chat_log", metadata,
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("user_id", sa.Integer, sa.ForeignKey("user.id"), nullable=False),
+            sa.Column("receiver", sa.String(20), nullable=False),
+            sa.Column("chat_group_id", sa.Integer, nullable=False),
+            sa.Column("text", sa.Text, nullable=False),
+            sa.Column("time", sa.DateTime, nullable=False),
+        ),
+        sa.Table(
+            "memory_test_result", metadata,
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("user_id", sa.Integer, sa.ForeignKey("user.id"), nullable=False),
+            sa.Column("date", sa.DateTime, nullable=False),
+            sa.Column("correct", sa.Integer, nullable=False),
+            sa.Column("total", sa.Integer, nullable=False),
+        ),
+        sa.Table(
+            "level_test", metadata,
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("user_id", sa.Integer, sa.ForeignKey("user.id"), nullable=False),
+            sa.Column("up_level", sa.Integer, nullable=False),
+            sa.Column("down_level", sa.Integer, nullable=False),
+        ),
+        sa.Table(
+            "chat_summary", metadata,
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("user_id", sa.Integer, sa.ForeignKey("user.id"), nullable=False),
+            sa.Column("chat_group_id", sa.Integer, nullable=False),
+            sa.Column("summary", sa.Text, nullable=False),
+            sa.Column("summarized_until", sa.Integer, nullable=False),
+            sa.Column("updated_at", sa.DateTime, nullable=False),
+            sa.UniqueConstraint("user_id", "chat_group_id"),
+        ),
+        sa.Table(
+            "quiz_session", metadata,
+            sa.Column("id", sa.String(32), primary_key=True),
+            sa.Column("user_id", sa.Integer, sa.ForeignKey("user.id"), nullable=False),
+            sa.Column("state", sa.Text, nullable=False),
+            sa.Column("expires_at", sa.DateTime, nullable=False),
+        ),
+        sa.Table(
+            "profile_fact_checkpoint", metadata,
+            sa.Column("user_id", sa.Integer, sa.ForeignKey("user.id"), primary_key=True),
+            sa.Column("last_log_id", sa.Integer, nullable=False),
+            sa.Column("updated_at", sa.DateTime, nullable=False),
+        ),
+    ]
+    for table in tables:
+        table.create(conn, checkfirst=True)
+
+@migration(2, "add chat session columns to chat_summary")
+def add_chat_session_columns(conn):
+    add_column(conn, "chat_summary", sa.Column("started_at", sa.DateTime, nullable=True))
+    add_column(conn, "chat_summary", sa.Column("ended_at", sa.DateTime, nullable=True))
+    add_column(conn, "chat_summary", sa.Column("message_count", sa.Integer, nullable=False, server_default="0"))
+
+@migration(3, "add lookup indexes and unique constraints")
+def add_lookup_indexes(conn):
+    create_index(conn, "user", "ux_user_user_id", ["user_id"], unique=True)
+    create_index(conn, "main_nok", "ux_main_nok_nok_id", ["nok_id"], unique=True)
+    create_index(conn, "chat_log", "ix_chat_log_user_time", ["user_id", "time"])
+    create_index(conn, "chat_log", "ix_chat_log_user_group", ["user_id", "chat_group_id"])
+    create_index(conn, "memory_test_result", "ix_memory_test_result_user_date", ["user_id", "date"])
+    create_index(conn, "level_test", "ux_level_test_user_id", ["user_id"], unique=True)
+    for table in ("user_favorite_food", "user_favorite_music", "user_favorite_season", "user_past_job", "user_pet"):
+        create_index(conn, table, f"ix_{table}_user_id", ["user_id"])
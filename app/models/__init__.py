@@ -1,4 +1,5 @@
 from .user import MainNok, User
 from .user import UserFavoriteFood, UserFavoriteMusic, UserFavoriteSeason, UserPastJob, UserPet
-from .user import ChatLog, MemoryTestResult
+from .user import ChatLog, ChatSummary, MemoryTestResult, QuizSession
+from .user import ProfileFactCheckpoint
 from app import db
\ No newline at end of file
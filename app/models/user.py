@@ -19,6 +19,12 @@ class User(db.Model):
     is_first = db.Column(db.Boolean, nullable=False, default=True)
     is_exercise_first = db.Column(db.Boolean, nullable=False, default=True)
 
+    # 조회용 관계 (viewonly: 추가/삭제는 기존처럼 각 테이블에 직접 함)
+    # 기본은 접근할 때 조회(lazy)하며, 사용자와 함께 읽을 때는 joinedload 옵션 사용
+    main_nok = db.relationship("MainNok", viewonly=True)
+
+    __table_args__ = (db.Index("ux_user_user_id", "user_id", unique=True),)
+
     def __repr__(self):
         return f"<User {self.user_id}>"
 
@@ -32,6 +38,8 @@ class MainNok(db.Model):
     address = db.Column(db.String(100), nullable=False)
     tell = db.Column(db.String(20), nullable=False)
 
+    __table_args__ = (db.Index("ux_main_nok_nok_id", "nok_id", unique=True),)
+
     def __repr__(self):
         return f"<NokUser {self.nok_id}>"
 
@@ -40,6 +48,8 @@ class UserFavoriteFood(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     favorite_food = db.Column(db.String(20))
 
+    __table_args__ = (db.Index("ix_user_favorite_food_user_id", "user_id"),)
+
     def __repr__(self):
         return f"<UserFavoriteFood {self.id}>"
 
@@ -48,6 +58,8 @@ class UserFavoriteMusic(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     favorite_music = db.Column(db.String(50))
 
+    __table_args__ = (db.Index("ix_user_favorite_music_user_id", "user_id"),)
+
     def __repr__(self):
         return f"<UserFavoriteMusic {self.id}>"
 
@@ -56,6 +68,8 @@ class UserFavoriteSeason(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     favorite_season = db.Column(db.String(2))
 
+    __table_args__ = (db.Index("ix_user_favorite_season_user_id", "user_id"),)
+
     def __repr__(self):
         return f"<UserFavoriteSeason {self.id}>"
 
@@ -64,6 +78,8 @@ class UserPastJob(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     past_job = db.Column(db.String(20))
 
+    __table_args__ = (db.Index("ix_user_past_job_user_id", "user_id"),)
+
     def __repr__(self):
         return f"<UserPastJob {self.id}>"
 
@@ -72,6 +88,8 @@ class UserPet(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     pet = db.Column(db.String(20))
 
+    __table_args__ = (db.Index("ix_user_pet_user_id", "user_id"),)
+
     def __repr__(self):
         return f"<UserPet {self.id}>"
 
@@ -83,6 +101,11 @@ class ChatLog(db.Model):
     text = db.Column(db.Text, nullable=False)
     time = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
+    __table_args__ = (
+        db.Index("ix_chat_log_user_time", "user_id", "time"),
+        db.Index("ix_chat_log_user_group", "user_id", "chat_group_id"),
+    )
+
     def __repr__(self):
         return f"<ChatLog {self.id}>"
 
@@ -93,6 +116,8 @@ class MemoryTestResult(db.Model):
     correct = db.Column(db.Integer, nullable=False)
     total = db.Column(db.Integer, nullable=False)
 
+    __table_args__ = (db.Index("ix_memory_test_result_user_date", "user_id", "date"),)
+
     def __repr__(self):
         return f"<MemoryTestResult {self.id}>"
     
@@ -103,5 +128,41 @@ class LevelTest(db.Model):
     up_level = db.Column(db.Integer, nullable=False, default=0)
     down_level = db.Column(db.Integer, nullable=False, default=0)
 
+    __table_args__ = (db.Index("ux_level_test_user_id", "user_id", unique=True),)
+
+    def __repr__(self):
+        return f"<LevelTest {self.id}>"
+
+class ChatSummary(db.Model):
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    chat_group_id = db.Column(db.Integer, nullable=False)
+    summary = db.Column(db.Text, nullable=False, default="")
+    summarized_until = db.Column(db.Integer, nullable=False, default=0)
+    started_at = db.Column(db.DateTime, nullable=True)
+    ended_at = db.Column(db.DateTime, nullable=True)
+    message_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (db.UniqueConstraint('user_id', 'chat_group_id'),)
+
+    def __repr__(self):
+        return f"<ChatSummary {self.user_id}:{self.chat_group_id}>"
+
+
+class QuizSession(db.Model):
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    state = db.Column(db.Text, nullable=False, default="[]")
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<QuizSession {self.id}>"
+
+class ProfileFactCheckpoint(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    last_log_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
     def __repr__(self):
-        return f"<LevelTest {self.id}>"
\ No newline at end of file
+        return f"<ProfileFactCheckpoint {self.user_id}:{self.last_log_id}>"
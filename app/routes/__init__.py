@@ -1,4 +1,3 @@
-from app import app
 from .page import page_routes
 from .auth import auth_routes
 from .check_user_first import check_user_first_routes
@@ -1,15 +1,37 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
 from app import db
+import asyncio
+import json
 import chatbot_func
+from app.chatbot import idempotency, memory, metrics, prewarm, profile_facts, quiz_engine, quiz_session, router, sessions
+from app.chatbot.latency import tracker as latency_tracker
+from app.chatbot.log_writer import chat_log_writer
+from app.chatbot.scheduler import SchedulerBusy
 
 from app.models.user import User
-from app.models.user import ChatLog, MemoryTestResult
+from app.models.user import MemoryTestResult
 
 chatbot_routes = Blueprint("chatbot", __name__)
 
+# 대화 로그가 저장되면 대화 세션 정보를 갱신하고, 백그라운드에서 대화 검색 인덱스와 사용자 프로필 갱신
+chat_log_writer.add_listener(sessions.record_activity)
+chat_log_writer.add_listener(memory.schedule_index)
+chat_log_writer.add_listener(profile_facts.schedule_extract)
+
+# Error: 챗봇 응답 시간 초과
+TIMEOUT_ERROR = {
+    "result": "error", 
+    "msg": "chatbot response timeout", 
+    "err_code": "101"
+}
+
 @chatbot_routes.route("/chatbot_chat", methods=["POST"])
-def chatbot_chat():
+async def chatbot_chat():
     """챗봇 대화 함수
+    async 핸들러이므로 ASGI 모드(asgi.py)에서는 LLM 응답을 기다리는 동안 스레드를 점유하지 않음.
+    WSGI 모드(run.py, serve.py의 sync/threaded/gevent/eventlet 워커)에서는 Flask가 요청마다 스레드 1개에서
+    이벤트 루프를 돌려 실행하므로, 요청 1건이 응답이 끝날 때까지 스레드 1개를 점유함
+    (동시에 처리할 수 있는 대화 수 = 워커 스레드 수)
 
     ** 현재 아이디만 안다면 데이터를 수정할 수 있는 상태로, 수정이 필요
 
@@ -18,12 +40,19 @@ def chatbot_chat():
             사용자 아이디 
         msg `str`:
             사용자가 보낸 채팅 내용
+        stream `bool`:
+            스트리밍 응답 여부 (옵션, 기본값 false)
+            true라면 text/event-stream 형식으로 응답 메시지 조각을 생성되는 대로 전송함
+        idempotency_key `str`:
+            멱등성 키 (옵션, Idempotency-Key 헤더로도 전달 가능. 스트리밍 응답에는 적용되지 않음)
+            같은 키로 재시도하면 챗봇을 다시 호출하지 않고 처음 요청의 응답을 돌려줌
     
     Returns:
         result `str`:
             응답 성공 여부 (success, error)
+            스트리밍 응답일 경우 메시지 조각은 stream, 마지막 이벤트는 success 또는 error
         msg `str`:
-            응답 메시지
+            응답 메시지 (스트리밍 응답일 경우 메시지 조각)
         err_code `str`:
             오류 코드 (API_GUIDE.md 참고)
     """
@@ -48,8 +77,10 @@ def chatbot_chat():
     # 파라미터 받아오기
     user_id = request.json["user_id"]
     user_msg = request.json["msg"]
+    stream = bool(request.json.get("stream"))
 
-    user = User.query.filter_by(user_id=user_id).first()
+    # DB 조회 등 블로킹 작업은 이벤트 루프를 막지 않도록 스레드에서 실행 (요청/앱 컨텍스트는 그대로 이어짐)
+    user = await asyncio.to_thread(User.query.filter_by(user_id=user_id).first)
 
     # Error: 사용자가 존재하지 않음
     if not user:
@@ -59,31 +90,106 @@ def chatbot_chat():
             "err_code": "20"
         }), 401
 
-    bot_msg = chatbot_func.chatbot_chat(user.id, user_msg)
+    uid = user.id
+    chat_group_id = await asyncio.to_thread(sessions.current_group, user)
 
-    try:
-        new_chat_log_user = ChatLog(user_id=user.id, receiver="user", chat_group_id=user.last_chat_group, text=user_msg)
-        db.session.add(new_chat_log_user)
-        new_chat_log_chatbot = ChatLog(user_id=user.id, receiver="assistant", chat_group_id=user.last_chat_group, text=bot_msg)
-        db.session.add(new_chat_log_chatbot)
-        return jsonify({
+    # 스트리밍 응답
+    if stream:
+        return _chatbot_chat_stream(uid, user_msg, chat_group_id)
+
+    async def reply():
+        try:
+            bot_msg = await chatbot_func.chatbot_chat(uid, user_msg, chat_group_id)
+        # Error: 챗봇 응답 시간 초과
+        except asyncio.TimeoutError:
+            return TIMEOUT_ERROR, 504
+        # Error: 요청이 몰려 대기 시간 초과
+        except SchedulerBusy as e:
+            return _busy_error(e), 503
+
+        # 대화 로그는 백그라운드에서 모아서 저장
+        chat_log_writer.add(uid, "user", chat_group_id, user_msg)
+        chat_log_writer.add(uid, "assistant", chat_group_id, bot_msg)
+        return {
             "result": "success", 
             "msg": bot_msg,
             "err_code": "00"
-        }), 200
-    # Error: SQL Commit 에러
-    except Exception as e:
-        print(f"Error during commit: {e}")
-        db.session.rollback()
+        }, 200
+
+    data, status = await idempotency.run_once(_idempotency_key("chatbot_chat", uid), reply)
+    return _json_response(data, status)
+
+def _chatbot_chat_stream(uid: int, user_msg: str, chat_group_id: int):
+    """챗봇 대화 스트리밍 응답 생성 함수 (Server-Sent Events)
+    응답 메시지 조각을 생성되는 대로 전송하고, 스트림이 끝나면 전체 메시지를 대화 로그 저장 큐에 넣음
+    async 핸들러에서 넣은 요청 컨텍스트는 다른 Context에서 꺼낼 수 없으므로 stream_with_context를 쓰지 않고,
+    제너레이터 안에서 앱 컨텍스트를 직접 열어 사용함 (요청 정보는 필요한 값만 미리 꺼내 둠)
+    """
+    app = current_app._get_current_object()
+
+    def event(data: dict):
+        return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    def generate():
+        with app.app_context():
+            pieces = []
+            try:
+                for piece in chatbot_func.chatbot_chat_stream(uid, user_msg, chat_group_id):
+                    pieces.append(piece)
+                    yield event({"result": "stream", "msg": piece, "err_code": "00"})
+            # Error: 챗봇 응답 시간 초과
+            except asyncio.TimeoutError:
+                yield event(TIMEOUT_ERROR)
+                return
+            # Error: 요청이 몰려 대기 시간 초과
+            except SchedulerBusy as e:
+                yield event(_busy_error(e))
+                return
+            bot_msg = "".join(pieces)
+
+            # 대화 로그는 백그라운드에서 모아서 저장
+            chat_log_writer.add(uid, "user", chat_group_id, user_msg)
+            chat_log_writer.add(uid, "assistant", chat_group_id, bot_msg)
+            yield event({"result": "success", "msg": bot_msg, "err_code": "00"})
+
+    response = Response(generate(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    # 리버스 프록시(nginx)의 응답 버퍼링 방지
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+def _idempotency_key(route: str, uid: int):
+    """요청의 멱등성 키 (Idempotency-Key 헤더 또는 idempotency_key 파라미터, 없으면 None)
+    """
+    key = request.headers.get("Idempotency-Key") or request.json.get("idempotency_key")
+    return f"{route}:{uid}:{key}" if key else None
+
+def _busy_error(e: SchedulerBusy):
+    return {
+        "result": "error", 
+        "msg": "chatbot is busy, retry later", 
+        "err_code": "102",
+        "retry_after": e.retry_after
+    }
+
+def _json_response(data: dict, status: int):
+    # Error: 같은 멱등성 키의 요청이 아직 처리 중
+    if data is None:
         return jsonify({
             "result": "error", 
-            "msg": "Error during commit",
-            "err_code": "100"
-        }), 500
+            "msg": "request with the same idempotency key is in progress", 
+            "err_code": "31"
+        }), 409
+    response = jsonify(data)
+    if status == 503:
+        response.headers["Retry-After"] = str(data["retry_after"])
+    return response, status
 
 @chatbot_routes.route("/chatbot_quiz", methods=["POST"])
-def chatbot_quiz():
+async def chatbot_quiz():
     """챗봇 기억력 테스트 함수
+    퀴즈 진행 상태는 서버의 퀴즈 세션에 저장되므로, 클라이언트는 세션 아이디와 새 답변만 보내면 됨
+    문제는 사용자 프로필과 최근 대화로 서버에서 출제/채점하며, 문제를 만들 수 없으면 LLM이 퀴즈를 진행함
 
     ** 현재 아이디만 안다면 데이터를 수정할 수 있는 상태로, 수정이 필요
 
@@ -91,19 +197,22 @@ def chatbot_quiz():
         user_id `str`:
             사용자 아이디 
         msg `str`:
-            사용자가 보낸 채팅 내용
-        history `list`:
-            사용자와의 기억력 테스트 대화 기록
+            사용자가 보낸 채팅 내용 (퀴즈 시작 시 생략)
+        session_id `str`:
+            퀴즈 세션 아이디 (옵션, 없으면 새 퀴즈를 시작함)
+        idempotency_key `str`:
+            멱등성 키 (옵션, Idempotency-Key 헤더로도 전달 가능)
+            같은 키로 재시도하면 챗봇을 다시 호출하지 않고 처음 요청의 응답을 돌려줌
     
     Returns:
         result `str`:
-            응답 성공 여부 (success, error)
+            응답 성공 여부 (success, end, error)
         msg `str`:
             응답 메시지
         err_code `str`:
             오류 코드 (API_GUIDE.md 참고)
-        history `list`:
-            퀴즈 히스토리
+        session_id `str`:
+            퀴즈 세션 아이디 (다음 요청에 그대로 보낼 것)
     """
     # Error: 데이터 형식이 JSON이 아님
     if not request.is_json:
@@ -126,9 +235,9 @@ def chatbot_quiz():
     # 파라미터 받아오기
     user_id = request.json["user_id"]
     user_msg = request.json["msg"] if "msg" in request.json else ""
-    history = request.json["history"] if "history" in request.json != None else []
+    session_id = request.json.get("session_id")
 
-    user = User.query.filter_by(user_id=user_id).first()
+    user = await asyncio.to_thread(User.query.filter_by(user_id=user_id).first)
     # Error: 유저가 존재하지 않음
     if not user:
         return jsonify({
@@ -137,34 +246,264 @@ def chatbot_quiz():
             "err_code": "20"
         }), 401
     
-    bot_msg, history = chatbot_func.chatbot_quiz(user.id, user_msg, history)
+    uid = user.id
 
-    # 문제가 모두 종료되고 챗봇이 결과를 말해줄 때
-    try:
-        if (history[-2]["content"] == "result"):
-            mem_res = history[-1]["content"].split("/")
-            memory_test_result = MemoryTestResult(user_id=user.id, correct=int(mem_res[0]), total=int(mem_res[1]))
-            db.session.add(memory_test_result)
-            db.session.commit()
-            return jsonify({
-                "result": "end", 
-                "msg": bot_msg,
-                "err_code": "00",
-                "history": history
-            }), 200
+    async def reply(session_id: str, user_msg: str):
+        # 퀴즈 세션 불러오기 (세션 아이디가 없으면 새 퀴즈 시작)
+        store = quiz_session.current_store()
+        if session_id:
+            state = await asyncio.to_thread(store.get, session_id, uid)
+            # Error: 퀴즈 세션이 존재하지 않거나 만료됨
+            if state is None:
+                return {
+                    "result": "error", 
+                    "msg": "quiz session does not exist or expired", 
+                    "err_code": "30"
+                }, 404
         else:
-            return jsonify({
-                "result": "success", 
-                "msg": bot_msg,
-                "err_code": "00",
-                "history": history
-            }), 200
-    # Error: SQL Commit 에러
-    except Exception as e:
-        print(f"Error during commit: {e}")
-        db.session.rollback()
+            session_id = quiz_session.new_session_id()
+            state = None
+        
+        try:
+            bot_msg, state, score = await _quiz_turn(uid, state, user_msg)
+        # Error: 챗봇 응답 시간 초과
+        except asyncio.TimeoutError:
+            return TIMEOUT_ERROR, 504
+        # Error: 요청이 몰려 대기 시간 초과
+        except SchedulerBusy as e:
+            return _busy_error(e), 503
+        # Error: LLM 퀴즈 결과("맞은 개수/전체 개수")를 읽을 수 없음
+        except ValueError as e:
+            print(f"Error during quiz result: {e}")
+            return {
+                "result": "error", 
+                "msg": "Error during commit",
+                "err_code": "100"
+            }, 500
+
+        # 문제가 모두 종료되고 챗봇이 결과를 말해줄 때
+        try:
+            if score:
+                await asyncio.to_thread(_save_quiz_result, store, session_id, uid, score)
+                return {
+                    "result": "end", 
+                    "msg": bot_msg,
+                    "err_code": "00",
+                    "session_id": session_id
+                }, 200
+            else:
+                await asyncio.to_thread(store.set, session_id, uid, state)
+                return {
+                    "result": "success", 
+                    "msg": bot_msg,
+                    "err_code": "00",
+                    "session_id": session_id
+                }, 200
+        # Error: SQL Commit 에러
+        except Exception as e:
+            print(f"Error during commit: {e}")
+            await asyncio.to_thread(db.session.rollback)
+            return {
+                "result": "error", 
+                "msg": "Error during commit",
+                "err_code": "100"
+            }, 500
+
+    data, status = await idempotency.run_once(_idempotency_key("chatbot_quiz", uid), lambda: reply(session_id, user_msg))
+    return _json_response(data, status)
+
+def _save_quiz_result(store, session_id: str, uid: int, score: tuple):
+    """끝난 퀴즈 세션 삭제 후 결과 저장
+    """
+    store.delete(session_id)
+    memory_test_result = MemoryTestResult(user_id=uid, correct=score[0], total=score[1])
+    db.session.add(memory_test_result)
+    db.session.commit()
+
+async def _quiz_turn(uid: int, state, user_msg: str):
+    """퀴즈 한 턴 진행
+    로컬 퀴즈 엔진(app.chatbot.quiz_engine)을 우선 사용하고, 문제를 만들 수 없거나
+    LLM 퀴즈로 설정된 경우 LLM 퀴즈(chatbot_func.chatbot_quiz)를 진행함
+
+    Returns:
+        msg `str`:
+            응답 메시지
+        state:
+            갱신된 퀴즈 세션 상태
+        score `tuple`:
+            퀴즈가 끝났다면 (맞은 개수, 전체 개수), 아니면 None
+    """
+    # 로컬 퀴즈 진행 중
+    if isinstance(state, dict) and state.get("engine") == "local":
+        bot_msg, state, finished = await quiz_engine.answer(uid, state, user_msg)
+        return bot_msg, state, (state["correct"], len(state["questions"])) if finished else None
+
+    # 새 퀴즈 시작
+    if state is None:
+        user_msg = ""
+        if quiz_engine.ENGINE == "local":
+            bot_msg, state = await quiz_engine.start(uid)
+            if bot_msg:
+                return bot_msg, state, None
+
+    # LLM 퀴즈 (state는 퀴즈 대화 기록)
+    bot_msg, history = await chatbot_func.chatbot_quiz(uid, user_msg, state)
+    if len(history) >= 2 and history[-2]["content"] == "result":
+        try:
+            mem_res = history[-1]["content"].split("/")
+            score = (int(mem_res[0]), int(mem_res[1]))
+        except (ValueError, IndexError):
+            raise ValueError(f"invalid quiz result: {history[-1]['content']!r}") from None
+        return bot_msg, history, score
+    return bot_msg, history, None
+
+@chatbot_routes.route("/chatbot_greeting", methods=["POST"])
+def chatbot_greeting():
+    """챗봇 첫 인사 함수
+    채팅 화면을 열 때 챗봇이 먼저 건네는 인사를 반환함.
+    /check_user_first (type=get) 요청 때 미리 만들어 둔 인사가 있으면 LLM을 기다리지 않고 바로 반환함
+
+    ** 현재 아이디만 안다면 데이터를 수정할 수 있는 상태로, 수정이 필요
+
+    Params:
+        user_id `str`:
+            사용자 아이디 
+    
+    Returns:
+        result `str`:
+            응답 성공 여부 (success, error)
+        msg `str`:
+            응답 메시지 (첫 인사)
+        err_code `str`:
+            오류 코드 (API_GUIDE.md 참고)
+    """
+    # Error: 데이터 형식이 JSON이 아님
+    if not request.is_json:
         return jsonify({
             "result": "error", 
-            "msg": "Error during commit",
-            "err_code": "100"
-        }), 500
+            "msg": "missing json in request", 
+            "err_code": "10"
+        }), 400
+    
+    # Error: 파라미터 값이 비어있거나 없음
+    if "user_id" not in request.json or not request.json["user_id"]:
+        return jsonify({
+            "result": "error", 
+            "msg": "missing user_id parameter", 
+            "err_code": "11"
+        }), 400
+
+    user = User.query.filter_by(user_id=request.json["user_id"]).first()
+
+    # Error: 사용자가 존재하지 않음
+    if not user:
+        return jsonify({
+            "result": "error", 
+            "msg": "user does not exist", 
+            "err_code": "20"
+        }), 401
+
+    uid = user.id
+    chat_group_id = sessions.current_group(user)
+    bot_msg = prewarm.take(uid)
+    if bot_msg is None:
+        try:
+            bot_msg = prewarm.generate(uid, chat_group_id)
+        # Error: 챗봇 응답 시간 초과
+        except asyncio.TimeoutError:
+            return jsonify(TIMEOUT_ERROR), 504
+        # Error: 요청이 몰려 대기 시간 초과
+        except SchedulerBusy as e:
+            return _json_response(_busy_error(e), 503)
+    else:
+        metrics.increment("greeting_prewarm_hit")
+
+    chat_log_writer.add(uid, "assistant", chat_group_id, bot_msg)
+    return jsonify({
+        "result": "success", 
+        "msg": bot_msg,
+        "err_code": "00"
+    }), 200
+
+@chatbot_routes.route("/chatbot_close_session", methods=["POST"])
+def chatbot_close_session():
+    """챗봇 대화 세션 종료 함수
+    다음 대화부터 새 대화 그룹으로 기록되며, 끝난 대화는 백그라운드에서 요약됨
+    (대화 세션은 마지막 대화 후 일정 시간이 지나거나 날짜가 바뀌면 자동으로도 종료됨)
+
+    ** 현재 아이디만 안다면 데이터를 수정할 수 있는 상태로, 수정이 필요
+
+    Params:
+        user_id `str`:
+            사용자 아이디 
+    
+    Returns:
+        result `str`:
+            응답 성공 여부 (success, error)
+        msg `str`:
+            응답 메시지
+        err_code `str`:
+            오류 코드 (API_GUIDE.md 참고)
+        closed `bool`:
+            세션 종료 여부 (진행 중인 대화가 없었다면 false)
+    """
+    # Error: 데이터 형식이 JSON이 아님
+    if not request.is_json:
+        return jsonify({
+            "result": "error", 
+            "msg": "missing json in request", 
+            "err_code": "10"
+        }), 400
+    
+    # Error: 파라미터 값이 비어있거나 없음
+    if "user_id" not in request.json or not request.json["user_id"]:
+        return jsonify({
+            "result": "error", 
+            "msg": "missing user_id parameter", 
+            "err_code": "11"
+        }), 400
+
+    user = User.query.filter_by(user_id=request.json["user_id"]).first()
+
+    # Error: 사용자가 존재하지 않음
+    if not user:
+        return jsonify({
+            "result": "error", 
+            "msg": "user does not exist", 
+            "err_code": "20"
+        }), 401
+
+    closed = sessions.close(user)
+    return jsonify({
+        "result": "success", 
+        "msg": "chat session closed" if closed else "no chat session in progress", 
+        "err_code": "00",
+        "closed": closed
+    }), 200
+
+@chatbot_routes.route("/chatbot_metrics", methods=["GET"])
+def chatbot_metrics():
+    """챗봇 성능 지표 조회 함수
+
+    Returns:
+        result `str`:
+            응답 성공 여부 (success)
+        msg `str`:
+            응답 메시지
+        err_code `str`:
+            오류 코드 (API_GUIDE.md 참고)
+        counters `dict`:
+            카운터 (응답 캐시 hit/miss 등)
+        latency `dict`:
+            모델별 LLM 요청 소요 시간 (p95, 요청 종류/결과별 횟수)
+        router `dict`:
+            요청 종류.규칙.모델별 선택 횟수, 실패 횟수, 평균 소요 시간
+    """
+    return jsonify({
+        "result": "success", 
+        "msg": "get chatbot metrics", 
+        "err_code": "00",
+        "counters": metrics.snapshot(),
+        "latency": latency_tracker.snapshot(),
+        "router": router.stats.snapshot()
+    }), 200
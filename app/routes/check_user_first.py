@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request
 from app import db
 
 from app.models.user import User
+from app.chatbot import prewarm
 
 check_user_first_routes = Blueprint("check_user_first", __name__)
 
@@ -19,6 +20,8 @@ def check_user_first():
         type `str`:
             리퀘스트 타입 (최초 실행 여부 파악: get, 최초 실행 여부 수정: set)
     
+    type이 get이면 곧 채팅 화면이 열리므로, 백그라운드에서 챗봇의 첫 인사를 미리 만들어 둠 (/chatbot_greeting 참고)
+
     Returns:
         result `str`:
             응답 성공 여부 (success, error)
@@ -61,6 +64,8 @@ def check_user_first():
                 "err_code": "20"
             }), 401
         else:
+            # 채팅 화면 진입 전에 첫 인사 미리 만들기
+            prewarm.start(user.id)
             return jsonify({
                 "result":"success", 
                 "msg":"get user first", 
@@ -1,4 +1,7 @@
 from flask import Blueprint, jsonify, request, make_response
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.orm import joinedload
+from app import db
 import json
 
 from app.models.user import User, MainNok
@@ -6,6 +9,53 @@ from app.models.user import UserFavoriteFood, UserFavoriteMusic, UserFavoriteSea
 
 user_info_routes = Blueprint("user_info", __name__)
 
+# /get_user_info_all에서 함께 불러오는 선호 정보 (응답 키 -> (모델, 컬럼 이름))
+PREFERENCE_COLUMNS = {
+    "favorite_food": (UserFavoriteFood, "favorite_food"),
+    "favorite_music": (UserFavoriteMusic, "favorite_music"),
+    "favorite_season": (UserFavoriteSeason, "favorite_season"),
+    "pet": (UserPet, "pet"),
+    "past_job": (UserPastJob, "past_job"),
+}
+
+def _load_user_with_preferences(user_id: str):
+    """사용자와 선호 정보를 한 번의 쿼리로 불러오는 함수
+    선호 정보 테이블을 UNION ALL로 합쳐 사용자 행에 outer join 함 (선호 정보 1개당 1행, 선호 정보가 없으면 사용자만 1행).
+    각 테이블은 사용자 아이디로 먼저 거르므로 (user_id) 인덱스로 해당 사용자의 행만 읽음
+
+    Params:
+        user_id `str`:
+            사용자 아이디
+
+    Returns:
+        user `User`:
+            사용자 (없으면 None)
+        preferences `dict`:
+            선호 정보 (PREFERENCE_COLUMNS의 키 -> 값 리스트, 입력한 순서)
+    """
+    uid = select(User.id).where(User.user_id == user_id).scalar_subquery()
+    preferences = union_all(*(
+        select(
+            model.user_id.label("user_id"),
+            literal(key).label("kind"),
+            getattr(model, column).label("value"),
+            model.id.label("id")
+        ).where(model.user_id == uid)
+        for key, (model, column) in PREFERENCE_COLUMNS.items()
+    )).subquery()
+    rows = db.session.execute(
+        select(User, preferences.c.kind, preferences.c.value)
+        .outerjoin(preferences, preferences.c.user_id == User.id)
+        .where(User.user_id == user_id)
+        .order_by(preferences.c.id)
+    ).all()
+
+    result = {key: [] for key in PREFERENCE_COLUMNS}
+    for _, kind, value in rows:
+        if kind is not None:
+            result[kind].append(value)
+    return (rows[0][0] if rows else None), result
+
 @user_info_routes.route("/get_main_nok_info", methods=["POST"])
 def get_main_nok_info():
     """사용자의 정보를 받아오는 함수
@@ -140,7 +190,8 @@ def get_user_info():
             }), 400
     
     user_id = request.json["user_id"]
-    user = User.query.filter_by(user_id=user_id).first()
+    # 보호자 정보를 함께 조회 (JOIN 한 번)
+    user = User.query.options(joinedload(User.main_nok)).filter_by(user_id=user_id).first()
     # Error: 유저가 존재하지 않음
     if not user:
         return jsonify({
@@ -152,7 +203,7 @@ def get_user_info():
     # 생일 형식 변경
     formatted_birthday = user.birthday.strftime("%Y-%m-%d") if user.birthday else None
 
-    nok = MainNok.query.filter_by(id=user.main_nok_id).first()
+    nok = user.main_nok
 
     response_data = {
         "result":"success", 
@@ -237,7 +288,8 @@ def get_user_info_all():
                 "err_code": "11"
             }), 400
     user_id = request.json["user_id"]
-    user = User.query.filter_by(user_id=user_id).first()
+    # 사용자 정보와 선호 정보(음식, 음악, 계절, 반려동물, 과거직업)를 한 번에 조회
+    user, preferences = _load_user_with_preferences(user_id)
     # Error: 유저가 존재하지 않음
     if not user:
         return jsonify({
@@ -251,36 +303,6 @@ def get_user_info_all():
     # BLOB 데이터 디코딩
     chronic_illness = user.chronic_illness.decode('utf-8') if user.chronic_illness else None
 
-    # 좋아하는 음식
-    user_favorite_food_list = []
-    user_favorite_foods = UserFavoriteFood.query.filter_by(user_id=user.id).all()
-    for food in user_favorite_foods:
-        user_favorite_food_list.append(food.favorite_food)
-
-    # 좋아하는 음악
-    user_favorite_music_list = []
-    user_favorite_musics = UserFavoriteMusic.query.filter_by(user_id=user.id).all()
-    for music in user_favorite_musics:
-        user_favorite_music_list.append(music.favorite_music)
-    
-    # 좋아하는 계절
-    user_favorite_season_list = []
-    user_favorite_seasons = UserFavoriteSeason.query.filter_by(user_id=user.id).all()
-    for season in user_favorite_seasons:
-        user_favorite_season_list.append(season.favorite_season)
-
-    # 반려동물
-    user_pet_list = []
-    user_pets = UserPet.query.filter_by(user_id=user.id).all()
-    for pet in user_pets:
-        user_pet_list.append(pet.pet)
-
-    # 과거직업
-    user_past_job_list = []
-    user_past_jobs = UserPastJob.query.filter_by(user_id=user.id).all()
-    for past_job in user_past_jobs:
-        user_past_job_list.append(past_job.past_job)
-
     response_data = {
         "result":"success", 
         "msg":"get user info", 
@@ -292,11 +314,11 @@ def get_user_info_all():
         "blood_type":user.blood_type,
         "chronic_illness":chronic_illness,
         "hometown":user.hometown,
-        "favorite_music":user_favorite_music_list,
-        "favorite_food":user_favorite_food_list,
-        "favorite_season":user_favorite_season_list,
-        "pet":user_pet_list,
-        "past_job":user_past_job_list,
+        "favorite_music":preferences["favorite_music"],
+        "favorite_food":preferences["favorite_food"],
+        "favorite_season":preferences["favorite_season"],
+        "pet":preferences["pet"],
+        "past_job":preferences["past_job"],
         "details":user.details
     }
     print(response_data)
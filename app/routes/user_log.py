@@ -1,13 +1,128 @@
-from flask import Blueprint, jsonify, request, make_response
+from flask import Blueprint, Response, jsonify, request, make_response, stream_with_context
+from sqlalchemy import and_, or_, select
 from app import db
+import csv
+import io
+import itertools
 import json
-from datetime import datetime
+import zlib
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 
 from app.models.user import User
 from app.models.user import ChatLog, MemoryTestResult
+from app.chatbot import history as chat_history, sessions
+from app.chatbot.log_writer import chat_log_writer
 
 user_log_routes = Blueprint("user_log", __name__)
 
+UTC = ZoneInfo("UTC")
+# /get_user_chat_log 한 번에 불러오는 대화 로그 수 (기본값, 최댓값)
+CHAT_LOG_PAGE_SIZE = 100
+CHAT_LOG_MAX_PAGE_SIZE = 500
+# /export_user_chat_log 파일 형식 (형식 -> (mimetype, 확장자))와 열 이름
+EXPORT_FORMATS = {
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "csv": ("text/csv", "csv"),
+}
+EXPORT_COLUMNS = ("id", "time", "receiver", "chat_group_id", "text")
+# DB 서버 쪽 커서에서 한 번에 가져올 로그 수
+EXPORT_BATCH_SIZE = 500
+
+def _date_range(params: dict):
+    """요청 파라미터(date, from, to, timezone)로 조회할 시간 범위 계산
+    날짜는 사용자 시간대 기준이며, DB에 저장된 시간(UTC)의 반열린 구간 [start, end)로 변환함
+    (컬럼에 함수를 씌우지 않으므로 (user_id, time) 인덱스로 범위를 바로 찾을 수 있음)
+
+    Params:
+        params `dict`:
+            요청 파라미터 (date, from, to: YYYY-MM-DD, timezone: 시간대 이름)
+
+    Returns:
+        start `datetime`:
+            범위 시작 (UTC, 없으면 None)
+        end `datetime`:
+            범위 끝, 포함하지 않음 (UTC, 없으면 None)
+        tz `ZoneInfo`:
+            사용자 시간대
+
+    Raises:
+        ValueError: 날짜/시간대 형식이 잘못되었거나 시작이 끝보다 늦음
+    """
+    for key in ("date", "from", "to", "timezone"):
+        if params.get(key) and not isinstance(params[key], str):
+            raise ValueError(f"{key} must be a string")
+    try:
+        tz = ZoneInfo(params["timezone"]) if params.get("timezone") else sessions.TIMEZONE
+    except (KeyError, OSError):
+        raise ValueError(f"unknown timezone: {params['timezone']}") from None
+    first = params.get("date") or params.get("from")
+    last = params.get("date") or params.get("to")
+    start = end = None
+    if first:
+        start = datetime.strptime(first, "%Y-%m-%d").replace(tzinfo=tz).astimezone(UTC).replace(tzinfo=None)
+    if last:
+        end = (datetime.strptime(last, "%Y-%m-%d") + timedelta(days=1)).replace(tzinfo=tz).astimezone(UTC).replace(tzinfo=None)
+    if start and end and start >= end:
+        raise ValueError("from is later than to")
+    return start, end, tz
+
+def _local_date(at: datetime, tz: ZoneInfo) -> str:
+    # DB의 UTC 시간을 사용자 시간대의 날짜로 변환
+    return at.replace(tzinfo=UTC).astimezone(tz).strftime("%Y-%m-%d")
+
+def _page_params(params: dict):
+    """요청 파라미터(limit, order, cursor)로 페이지 조건 계산
+
+    Returns:
+        limit `int`:
+            불러올 로그 수 (최대 CHAT_LOG_MAX_PAGE_SIZE)
+        newest_first `bool`:
+            최신순 여부
+        cursor `tuple`:
+            이전 페이지 마지막 로그의 (시간, 아이디) (첫 페이지면 None)
+
+    Raises:
+        ValueError: 파라미터 형식이 잘못됨
+    """
+    limit = min(max(1, int(params.get("limit") or CHAT_LOG_PAGE_SIZE)), CHAT_LOG_MAX_PAGE_SIZE)
+    order = params.get("order") or "asc"
+    if order not in ("asc", "desc"):
+        raise ValueError(f"unknown order: {order}")
+    cursor = None
+    if params.get("cursor"):
+        at, _, log_id = str(params["cursor"]).partition("_")
+        cursor = (datetime.fromisoformat(at), int(log_id))
+    return limit, order == "desc", cursor
+
+def _next_cursor(log) -> str:
+    # 다음 페이지 조회용 커서 (마지막 로그의 시간과 아이디)
+    return f"{log.time.isoformat()}_{log.id}"
+
+def _export_chunk(rows: list, file_format: str, tz: ZoneInfo, header: bool = False) -> str:
+    # 내보낼 로그 묶음을 파일 형식에 맞는 문자열로 변환 (csv는 첫 조각에 머리글 포함)
+    records = [
+        (row.id, row.time.replace(tzinfo=UTC).astimezone(tz).isoformat(), row.receiver, row.chat_group_id, chat_history.log_text(row))
+        for row in rows
+    ]
+    if file_format == "jsonl":
+        return "".join(json.dumps(dict(zip(EXPORT_COLUMNS, record)), ensure_ascii=False) + "\n" for record in records)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        # 엑셀에서 한글이 깨지지 않도록 BOM 추가
+        buffer.write("\ufeff")
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(records)
+    return buffer.getvalue()
+
+def _invalid_date_range(e: ValueError):
+    return jsonify({
+        "result": "error", 
+        "msg": f"invalid date range: {e}", 
+        "err_code": "12"
+    }), 400
+
 @user_log_routes.route("/get_user_chat_log", methods=["POST"])
 def get_user_chat_log():
     """사용자 대화 로그 불러오기
@@ -20,6 +135,20 @@ def get_user_chat_log():
             사용자 아이디
         date `str`:
             기준날짜 (옵션, YYYY-MM-DD)
+        from `str`:
+            조회 시작 날짜 (옵션, YYYY-MM-DD, date가 없을 때 사용, 이 날짜 포함)
+        to `str`:
+            조회 끝 날짜 (옵션, YYYY-MM-DD, date가 없을 때 사용, 이 날짜 포함)
+        timezone `str`:
+            날짜 기준 시간대 (옵션, 예: Asia/Seoul, 기본값 Chatbot.SESSION_TIMEZONE)
+        chat_group_id `int`:
+            대화 세션(대화 그룹) 아이디 (옵션, /get_user_chat_sessions 참고)
+        limit `int`:
+            불러올 로그 수 (옵션, 기본값 100, 최대 500)
+        order `str`:
+            정렬 순서 (옵션, asc: 오래된 순(기본값), desc: 최신순)
+        cursor `str`:
+            다음 페이지 조회 시 이전 응답의 next_cursor (옵션)
     
     Returns:
         result `str`:
@@ -31,7 +160,9 @@ def get_user_chat_log():
         log `list`:
             대화 로그 리스트
         date `list`:
-            대화 날짜 (YYYY-MM-DD)
+            대화 날짜 (YYYY-MM-DD, 사용자 시간대 기준)
+        next_cursor `str`:
+            다음 페이지 조회 시 cursor 값 (더 이상 없으면 null)
     """
     # Error: 데이터 형식이 JSON이 아님
     if not request.is_json:
@@ -51,11 +182,33 @@ def get_user_chat_log():
                 "err_code": "11"
             }), 400
         
-    # 날짜 데이터가 없는지 확인
-    if "date" in request.json and request.json["date"]:
-        date = request.json["date"]
-    else:
-        date = None
+    # 조회할 날짜 범위 (date, from, to)
+    try:
+        start, end, tz = _date_range(request.json)
+    except ValueError as e:
+        # Error: 날짜 형식이 잘못됨
+        return _invalid_date_range(e)
+    try:
+        limit, newest_first, cursor = _page_params(request.json)
+    except (TypeError, ValueError) as e:
+        # Error: 페이지 파라미터 형식이 잘못됨
+        return jsonify({
+            "result": "error", 
+            "msg": f"invalid page parameter: {e}", 
+            "err_code": "12"
+        }), 400
+    # 대화 세션 (옵션)
+    chat_group_id = request.json.get("chat_group_id")
+    if chat_group_id is not None:
+        try:
+            chat_group_id = int(chat_group_id)
+        except (TypeError, ValueError):
+            # Error: 대화 세션 아이디 형식이 잘못됨
+            return jsonify({
+                "result": "error", 
+                "msg": f"invalid chat_group_id: {chat_group_id}", 
+                "err_code": "12"
+            }), 400
         
     user_id = request.json["user_id"]
     user = User.query.filter_by(user_id=user_id).first()
@@ -67,25 +220,46 @@ def get_user_chat_log():
             "err_code": "20"
         }), 401
     
-    if not date:
-        chat_logs = ChatLog.query.filter_by(user_id=user.id).all()
+    # 아직 저장되지 않은 대화 로그가 있으면 먼저 저장
+    chat_log_writer.flush(user.id)
+    # ORM 객체 대신 필요한 컬럼만, (시간, 아이디) 순서로 한 페이지(+다음 페이지 확인용 1개)만 불러오기
+    query = select(ChatLog.id, ChatLog.receiver, ChatLog.text, ChatLog.time).where(ChatLog.user_id == user.id)
+    # 대화 세션이 주어지면 해당 세션의 로그만 불러오기
+    if chat_group_id is not None:
+        query = query.where(ChatLog.chat_group_id == chat_group_id)
+    if start:
+        query = query.where(ChatLog.time >= start)
+    if end:
+        query = query.where(ChatLog.time < end)
+    # 커서 이후의 로그만 불러오기 (keyset pagination, OFFSET 없이 인덱스에서 바로 이어서 읽음)
+    if cursor:
+        at, log_id = cursor
+        if newest_first:
+            query = query.where(or_(ChatLog.time < at, and_(ChatLog.time == at, ChatLog.id < log_id)))
+        else:
+            query = query.where(or_(ChatLog.time > at, and_(ChatLog.time == at, ChatLog.id > log_id)))
+    if newest_first:
+        query = query.order_by(ChatLog.time.desc(), ChatLog.id.desc())
     else:
-        formatted_date = datetime.strptime(date, '%Y-%m-%d').date()
-        chat_logs = ChatLog.query.filter_by(user_id=user.id).filter(db.func.date(ChatLog.time) == formatted_date).all()
+        query = query.order_by(ChatLog.time, ChatLog.id)
+    chat_logs = db.session.execute(query.limit(limit + 1)).all()
+    has_more = len(chat_logs) > limit
+    chat_logs = chat_logs[:limit]
+
     log_list = []
     date_list = []
     for log in chat_logs:
         # BLOB 데이터 디코딩
-        log_text = log.text.decode('utf-8') if log.text else ""
-        log_list.append({log.receiver:log_text})
-        date_list.append(log.time.strftime("%Y-%m-%d"))
+        log_list.append({log.receiver:chat_history.log_text(log)})
+        date_list.append(_local_date(log.time, tz))
 
     response_data = {
         "result": "success", 
         "msg": "get chat log", 
         "err_code": "00",
         "log": log_list,
-        "date": date_list
+        "date": date_list,
+        "next_cursor": _next_cursor(chat_logs[-1]) if has_more else None
     }
     # 직접 JSON으로 변환하여 유니코드 처리 변경
     response_json = json.dumps(response_data, ensure_ascii=False).encode('utf8')
@@ -96,6 +270,111 @@ def get_user_chat_log():
 
     return response
 
+@user_log_routes.route("/export_user_chat_log", methods=["POST"])
+def export_user_chat_log():
+    """사용자 전체 대화 로그 내보내기 (파일 다운로드)
+    DB 서버 쪽 커서로 EXPORT_BATCH_SIZE개씩 읽어 바로 응답으로 흘려보내므로, 대화 기록이 아무리 길어도
+    서버 메모리 사용량은 일정하고 첫 데이터가 바로 전송됨
+
+    ** 현재 아이디만 안다면 데이터를 확인할 수 있는 상태로, 수정이 필요
+
+    Params:
+        user_id `str`:
+            사용자 아이디
+        format `str`:
+            파일 형식 (옵션, jsonl(기본값): 한 줄에 로그 하나씩 JSON, csv)
+        gzip `bool`:
+            gzip으로 압축할지 여부 (옵션, 기본값 False)
+        date / from / to / timezone:
+            조회할 날짜 범위와 시간대 (옵션, /get_user_chat_log 참고)
+    
+    Returns:
+        파일 (jsonl: {"id", "time", "receiver", "chat_group_id", "text"} / csv: 같은 열과 머리글 행)
+        time은 timezone 기준 ISO 8601 형식, 오래된 순서로 정렬됨
+        오류 시 result, msg, err_code (JSON)
+    """
+    # Error: 데이터 형식이 JSON이 아님
+    if not request.is_json:
+        return jsonify({
+            "result": "error", 
+            "msg": "missing json in request", 
+            "err_code": "10"
+        }), 400
+    
+    # Error: 파라미터 값이 비어있거나 없음
+    required_fields = ["user_id"]
+    for field in required_fields:
+        if field not in request.json or not request.json[field]:
+            return jsonify({
+                "result": "error", 
+                "msg": f"missing {field} parameter", 
+                "err_code": "11"
+            }), 400
+
+    # 조회할 날짜 범위 (date, from, to)
+    try:
+        start, end, tz = _date_range(request.json)
+    except ValueError as e:
+        # Error: 날짜 형식이 잘못됨
+        return _invalid_date_range(e)
+    file_format = request.json.get("format") or "jsonl"
+    # Error: 지원하지 않는 파일 형식
+    if file_format not in EXPORT_FORMATS:
+        return jsonify({
+            "result": "error", 
+            "msg": f"unknown format: {file_format}", 
+            "err_code": "12"
+        }), 400
+    compress = bool(request.json.get("gzip"))
+
+    user_id = request.json["user_id"]
+    user = User.query.filter_by(user_id=user_id).first()
+    # Error: 유저가 존재하지 않음
+    if not user:
+        return jsonify({
+            "result": "error", 
+            "msg": "user does not exist", 
+            "err_code": "20"
+        }), 401
+
+    # 아직 저장되지 않은 대화 로그가 있으면 먼저 저장
+    chat_log_writer.flush(user.id)
+    query = select(ChatLog.id, ChatLog.time, ChatLog.receiver, ChatLog.chat_group_id, ChatLog.text).where(ChatLog.user_id == user.id)
+    if start:
+        query = query.where(ChatLog.time >= start)
+    if end:
+        query = query.where(ChatLog.time < end)
+    query = query.order_by(ChatLog.time, ChatLog.id)
+
+    def generate():
+        # stream_results: 결과를 한 번에 받지 않고 서버 쪽 커서(MySQL SSCursor)에서 yield_per개씩 가져옴
+        result = db.session.execute(query.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE))
+        encoder = zlib.compressobj(wbits=31) if compress else None
+        try:
+            # 첫 조각은 빈 묶음으로 두어, DB 결과를 기다리지 않고 csv 머리글/gzip 헤더를 바로 보냄
+            chunks = itertools.chain([[]], result.partitions())
+            for index, rows in enumerate(chunks):
+                data = _export_chunk(rows, file_format, tz, header=index == 0).encode("utf-8")
+                if encoder:
+                    # 모아 둔 데이터를 바로 내보내도록 조각마다 flush
+                    data = encoder.compress(data) + encoder.flush(zlib.Z_SYNC_FLUSH)
+                if data:
+                    yield data
+            if encoder:
+                yield encoder.flush()
+        finally:
+            result.close()
+
+    mimetype, extension = EXPORT_FORMATS[file_format]
+    filename = f"chat_log_{user.user_id}.{extension}"
+    if compress:
+        mimetype, filename = "application/gzip", f"{filename}.gz"
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    # 프록시(nginx 등)가 응답을 모았다가 보내지 않도록 함
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
 
 @user_log_routes.route("/get_user_test_result", methods=["POST"])
 def get_user_test_result():
@@ -108,6 +387,12 @@ def get_user_test_result():
             사용자 아이디 
         date `str`:
             기준날짜 (옵션, YYYY-MM-DD)
+        from `str`:
+            조회 시작 날짜 (옵션, YYYY-MM-DD, date가 없을 때 사용, 이 날짜 포함)
+        to `str`:
+            조회 끝 날짜 (옵션, YYYY-MM-DD, date가 없을 때 사용, 이 날짜 포함)
+        timezone `str`:
+            날짜 기준 시간대 (옵션, 예: Asia/Seoul, 기본값 Chatbot.SESSION_TIMEZONE)
     
     Returns:
         result `str`:
@@ -121,7 +406,7 @@ def get_user_test_result():
         total `list`:
             전체 개수
         date `list`:
-            퀴즈 날짜 (YYYY-MM-DD)
+            퀴즈 날짜 (YYYY-MM-DD, 사용자 시간대 기준)
     """
     # Error: 데이터 형식이 JSON이 아님
     if not request.is_json:
@@ -143,11 +428,12 @@ def get_user_test_result():
                 "err_code": "11"
             }), 400
     
-    # 날짜 데이터가 없는지 확인
-    if "date" in request.json and request.json["date"]:
-        date = request.json["date"]
-    else:
-        date = None
+    # 조회할 날짜 범위 (date, from, to)
+    try:
+        start, end, tz = _date_range(request.json)
+    except ValueError as e:
+        # Error: 날짜 형식이 잘못됨
+        return _invalid_date_range(e)
     
     user_id = request.json["user_id"]
     user = User.query.filter_by(user_id=user_id).first()
@@ -159,11 +445,12 @@ def get_user_test_result():
             "err_code": "20"
         }), 401
     
-    if not date:
-        mem_test_results = MemoryTestResult.query.filter_by(user_id=user.id).all()
-    else:
-        formatted_date = datetime.strptime(date, '%Y-%m-%d').date()
-        mem_test_results = MemoryTestResult.query.filter_by(user_id=user.id).filter(db.func.date(MemoryTestResult.date) == formatted_date).all()
+    query = MemoryTestResult.query.filter_by(user_id=user.id)
+    if start:
+        query = query.filter(MemoryTestResult.date >= start)
+    if end:
+        query = query.filter(MemoryTestResult.date < end)
+    mem_test_results = query.all()
         
     mem_test_correct_list = []
     mem_test_total_list = []
@@ -171,7 +458,7 @@ def get_user_test_result():
     for result in mem_test_results:
         mem_test_correct_list.append(result.correct)
         mem_test_total_list.append(result.total)
-        date_list.append(result.date.strftime("%Y-%m-%d"))
+        date_list.append(_local_date(result.date, tz))
 
     response_data = {
         "result": "success", 
@@ -193,3 +480,99 @@ def get_user_test_result():
     return response
     
 
+@user_log_routes.route("/get_user_chat_sessions", methods=["POST"])
+def get_user_chat_sessions():
+    """사용자 대화 세션 목록 불러오기 (최신순)
+    전체 대화 로그 대신 세션 목록을 먼저 보여주고, 세션을 고르면 /get_user_chat_log에 chat_group_id를 넘겨 해당 세션의 로그만 불러옴
+
+    ** 현재 아이디만 안다면 데이터를 확인할 수 있는 상태로, 수정이 필요
+
+    Params:
+        user_id `str`:
+            사용자 아이디
+        limit `int`:
+            불러올 세션 수 (옵션, 기본값 20, 최대 50)
+        before `int`:
+            이 대화 그룹 아이디보다 이전 세션만 불러오기 (옵션, 이전 응답의 next_before 사용)
+    
+    Returns:
+        result `str`:
+            응답 성공 여부 (success, error)
+        msg `str`:
+            응답 메시지
+        err_code `str`:
+            오류 코드 (API_GUIDE.md 참고)
+        sessions `list`:
+            대화 세션 리스트 (chat_group_id, start, end, message_count, summary)
+        next_before `int`:
+            다음 페이지 조회 시 before 값 (더 이상 없으면 null)
+    """
+    # Error: 데이터 형식이 JSON이 아님
+    if not request.is_json:
+        return jsonify({
+            "result": "error", 
+            "msg": "missing json in request", 
+            "err_code": "10"
+        }), 400
+    
+    # Error: 파라미터 값이 비어있거나 없음
+    required_fields = ["user_id"]
+    for field in required_fields:
+        if field not in request.json or not request.json[field]:
+            return jsonify({
+                "result": "error", 
+                "msg": f"missing {field} parameter", 
+                "err_code": "11"
+            }), 400
+
+    try:
+        limit = max(1, int(request.json.get("limit") or 20))
+        before = request.json.get("before")
+        before = int(before) if before is not None else None
+    except (TypeError, ValueError) as e:
+        # Error: 페이지 파라미터 형식이 잘못됨
+        return jsonify({
+            "result": "error", 
+            "msg": f"invalid page parameter: {e}", 
+            "err_code": "12"
+        }), 400
+
+    user_id = request.json["user_id"]
+    user = User.query.filter_by(user_id=user_id).first()
+    # Error: 유저가 존재하지 않음
+    if not user:
+        return jsonify({
+            "result": "error", 
+            "msg": "user does not exist", 
+            "err_code": "20"
+        }), 401
+
+    # 아직 저장되지 않은 대화 로그가 있으면 먼저 저장 (세션 정보가 함께 갱신됨)
+    chat_log_writer.flush(user.id)
+    chat_sessions = sessions.list_sessions(user.id, limit, before)
+
+    session_list = []
+    for session in chat_sessions:
+        session_list.append({
+            "chat_group_id": session.chat_group_id,
+            "start": session.started_at.strftime("%Y-%m-%d %H:%M:%S") if session.started_at else None,
+            "end": session.ended_at.strftime("%Y-%m-%d %H:%M:%S") if session.ended_at else None,
+            "message_count": session.message_count,
+            "summary": session.summary
+        })
+
+    response_data = {
+        "result": "success", 
+        "msg": "get chat sessions", 
+        "err_code": "00",
+        "sessions": session_list,
+        "next_before": chat_sessions[-1].chat_group_id if len(chat_sessions) == min(limit, sessions.MAX_LIST_SIZE) else None
+    }
+    # 직접 JSON으로 변환하여 유니코드 처리 변경
+    response_json = json.dumps(response_data, ensure_ascii=False).encode('utf8')
+
+    # make_response를 사용하여 Response 객체 생성
+    response = make_response(response_json)
+    response.headers['Content-Type'] = 'application/json; charset=utf-8'
+
+    return response
@@ -3,9 +3,11 @@ from app import db, bcrypt
 
 from app.models.user import User, MainNok
 from app.models.user import UserFavoriteFood, UserFavoriteMusic, UserFavoriteSeason, UserPastJob, UserPet
-from app.models.user import ChatLog, MemoryTestResult
+from app.models.user import ChatLog, ChatSummary, MemoryTestResult, ProfileFactCheckpoint, QuizSession
 from app.models.user import LevelTest
 
+from app.chatbot import memory, profile
+from app.chatbot.log_writer import chat_log_writer
 from config import Season
 
 user_modify_routes = Blueprint("user_modify", __name__)
@@ -105,10 +107,21 @@ def user_delete():
             user_pets = UserPet.query.filter_by(user_id=user.id).all()
             for user_pet in user_pets:
                 db.session.delete(user_pet)
-            # 사용자의 챗봇 대화 로그 테이블의 유저 데이터 모두 삭제
+            # 사용자의 챗봇 대화 로그 테이블의 유저 데이터 모두 삭제 (저장 대기 중인 로그 포함)
+            chat_log_writer.flush(user.id)
             chat_logs = ChatLog.query.filter_by(user_id=user.id).all()
             for chat_log in chat_logs:
                 db.session.delete(chat_log)
+            # 사용자의 대화 요약 테이블의 유저 데이터 모두 삭제
+            chat_summaries = ChatSummary.query.filter_by(user_id=user.id).all()
+            for chat_summary in chat_summaries:
+                db.session.delete(chat_summary)
+            # 사용자의 퀴즈 세션 테이블의 유저 데이터 모두 삭제
+            quiz_sessions = QuizSession.query.filter_by(user_id=user.id).all()
+            for quiz_session in quiz_sessions:
+                db.session.delete(quiz_session)
+            # 사용자의 프로필 정보 추출 체크포인트 삭제
+            ProfileFactCheckpoint.query.filter_by(user_id=user.id).delete()
             # 사용자의 기억력 테스트 테이블의 유저 데이터 모두 삭제
             memory_test_results = MemoryTestResult.query.filter_by(user_id=user.id).all()
             for memory_test_result in memory_test_results:
@@ -120,6 +133,8 @@ def user_delete():
             
             db.session.delete(user)
             db.session.commit()
+            profile.invalidate(user.id)
+            memory.delete(user.id)
         # 주 보호자에 대한 회원 탈퇴인 경우 주 보호자 데이터 제거
         if nok_id:
             db.session.delete(main_nok)
@@ -406,6 +421,7 @@ def modify_user_info():
             modify_data.append("details")
         
         db.session.commit()
+        profile.invalidate(user.id)
 
         print(
                 {
@@ -0,0 +1,215 @@
+"""ASGI 실행 모드
+
+챗봇 블루프린트(chatbot_routes)의 async 핸들러는 ASGI 서버의 이벤트 루프에서 코루틴으로 바로 실행하고,
+나머지 블루프린트(동기 핸들러)는 WSGI 어댑터(asgiref.wsgi.WsgiToAsgi)를 통해 스레드에서 실행함.
+
+WSGI 모드에서는 챗봇 요청 1건이 LLM 응답을 기다리는 동안 스레드 1개를 점유하지만,
+ASGI 모드에서는 LLM 응답을 기다리는 요청이 스레드를 점유하지 않음.
+DB 조회, 임베딩 요청 등 블로킹 작업은 핸들러에서 asyncio.to_thread로 기본 스레드 풀에 넘기고,
+스트리밍 응답(SSE) 조각은 전용 스레드 풀(STREAM_WORKERS)에서 꺼내므로 서로의 스레드를 빼앗지 않음.
+두 모드의 처리량 차이는 아직 측정하지 않았으므로, 배포 전에 bench/chat_throughput.py로 직접 측정해서 비교할 것.
+
+요청 처리 순서(ChatbotASGI._dispatch)는 Flask 3.0의 full_dispatch_request를 따라 만든 것이므로,
+Flask 버전을 올릴 때는 tests/test_asgi.py(WSGI 모드와 응답 비교)로 동작이 같은지 확인해야 함.
+
+사용법:
+    uvicorn asgi:create_application --factory --host 0.0.0.0 --port 5000 --ssl-keyfile key.pem --ssl-certfile cert.pem
+"""
+import asyncio
+import contextvars
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import unquote
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import Flask, request
+from werkzeug.exceptions import HTTPException
+from config import Chatbot
+
+from app import create_app
+from app.chatbot.gateway import gateway
+from app.chatbot.log_writer import chat_log_writer
+
+# 코루틴으로 바로 실행할 블루프린트
+ASYNC_BLUEPRINTS = ("chatbot",)
+# 스트리밍 응답 조각을 꺼내는 스레드 수 (동시에 진행할 수 있는 스트리밍 응답 수)
+STREAM_WORKERS = getattr(Chatbot, "ASGI_STREAM_WORKERS", 64)
+
+class ChatbotASGI:
+    """Flask 앱을 ASGI 앱으로 감싸는 어댑터
+    ASYNC_BLUEPRINTS에 속한 async 핸들러는 이벤트 루프에서 직접 실행하고, 나머지는 WSGI 어댑터로 넘김
+    """
+    def __init__(self, flask_app: Flask, blueprints: tuple = ASYNC_BLUEPRINTS):
+        self.app = flask_app
+        self.blueprints = blueprints
+        self.wsgi = WsgiToAsgi(flask_app)
+        # 스트리밍 응답 조각은 LLM 응답을 기다리며 스레드를 오래 점유하므로, 기본 스레드 풀(asyncio.to_thread)과 따로 둠
+        self._stream_executor = ThreadPoolExecutor(max_workers=STREAM_WORKERS, thread_name_prefix="asgi-stream")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] == "http":
+            environ = self._environ(scope, b"")
+            view = self._async_view(environ)
+            if view is not None:
+                body = await self._read_body(receive)
+                # 요청마다 별도의 Context에서 처리 (스트리밍 응답은 같은 Context를 스레드에서 이어서 사용)
+                context = contextvars.copy_context()
+                task = asyncio.get_running_loop().create_task(
+                    self._dispatch(self._environ(scope, body), send, context), context=context
+                )
+                return await task
+        return await self.wsgi(scope, receive, send)
+
+    def _async_view(self, environ: dict):
+        """요청을 처리할 async 핸들러 (코루틴으로 실행할 수 없는 요청이면 None)
+        """
+        adapter = self.app.url_map.bind_to_environ(environ)
+        try:
+            endpoint, _ = adapter.match()
+        except HTTPException:
+            return None
+        if endpoint.split(".", 1)[0] not in self.blueprints:
+            return None
+        view = self.app.view_functions[endpoint]
+        return view if asyncio.iscoroutinefunction(view) else None
+
+    async def _dispatch(self, environ: dict, send, context: contextvars.Context):
+        """Flask의 full_dispatch_request와 같은 순서로 요청을 처리하되, 핸들러는 await로 실행
+        """
+        ctx = self.app.request_context(environ)
+        error = None
+        try:
+            ctx.push()
+            try:
+                rv = self.app.preprocess_request()
+                if rv is None:
+                    view = self.app.view_functions[request.url_rule.endpoint]
+                    rv = await view(**request.view_args)
+            except Exception as e:
+                rv = self.app.handle_user_exception(e)
+            response = self.app.finalize_request(rv)
+        except Exception as e:
+            error = e
+            response = self.app.handle_exception(e)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            ctx.pop(error)
+
+        await send({
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": [(key.lower().encode("latin1"), value.encode("latin1")) for key, value in response.headers.items()]
+        })
+        if not response.is_streamed:
+            await send({"type": "http.response.body", "body": response.get_data()})
+            return
+
+        # 스트리밍 응답(SSE)은 조각을 만드는 제너레이터가 블로킹되므로 스레드에서 꺼냄
+        iterator = iter(response.response)
+        try:
+            while True:
+                chunk = await self._next_chunk(iterator, context)
+                if chunk is None:
+                    break
+                if isinstance(chunk, str):
+                    chunk = chunk.encode("utf-8")
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            response.close()
+
+    async def _next_chunk(self, iterator, context: contextvars.Context):
+        """스레드에서 스트리밍 응답의 다음 조각을 꺼냄 (끝나면 None)
+        stream_with_context가 핸들러 안에서 넣은 요청 컨텍스트는 핸들러를 실행한 Context에서만 꺼낼 수 있으므로,
+        이 코루틴이 대기 상태가 되어 Context를 빠져나온 뒤에 스레드에서 같은 Context로 실행함
+        """
+        loop = asyncio.get_running_loop()
+        suspended = threading.Event()
+
+        def step():
+            suspended.wait()
+            return context.run(next, iterator, None)
+
+        future = loop.run_in_executor(self._stream_executor, step)
+        loop.call_soon(suspended.set)
+        return await future
+
+    async def _read_body(self, receive) -> bytes:
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            body.extend(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        return bytes(body)
+
+    def _environ(self, scope: dict, body: bytes) -> dict:
+        """ASGI scope로 WSGI environ 생성
+        """
+        server = scope.get("server") or ("localhost", 80)
+        client = scope.get("client") or ("", 0)
+        script_name = scope.get("root_path", "").encode("utf8").decode("latin1")
+        path_info = unquote(scope["path"], errors="surrogateescape").encode("utf8", "surrogateescape").decode("latin1")
+        # path에는 root_path가 포함되어 있으므로 WSGI 어댑터(WsgiToAsgi)와 같이 떼어 냄
+        if path_info.startswith(script_name):
+            path_info = path_info[len(script_name):]
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": script_name,
+            "PATH_INFO": path_info,
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin1"),
+            "SERVER_NAME": server[0],
+            "SERVER_PORT": str(server[1] or 80),
+            "REMOTE_ADDR": client[0],
+            "REMOTE_PORT": str(client[1]),
+            "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": True,
+            "wsgi.run_once": False,
+        }
+        for raw_name, raw_value in scope.get("headers", []):
+            name = raw_name.decode("latin1").upper().replace("-", "_")
+            value = raw_value.decode("latin1")
+            if name == "CONTENT_LENGTH":
+                continue
+            if name != "CONTENT_TYPE":
+                name = f"HTTP_{name}"
+            if name in environ:
+                value = f"{environ[name]},{value}"
+            environ[name] = value
+        return environ
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                # 남은 대화 로그를 저장하고 LLM 연결 정리
+                await asyncio.to_thread(chat_log_writer.close)
+                await asyncio.to_thread(gateway.close)
+                self._stream_executor.shutdown(wait=False, cancel_futures=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+def create_application(config=None) -> ChatbotASGI:
+    """ASGI 앱 생성 함수 (uvicorn --factory로 실행)
+
+    Params:
+        config `object | dict`:
+            앱 설정 (create_app 참고)
+    """
+    return ChatbotASGI(create_app(config))
@@ -0,0 +1,89 @@
+"""챗봇 대화 처리량 측정 스크립트
+
+/chatbot_chat에 동시에 여러 요청을 보내고 처리량(요청/초)과 응답 시간 분포를 출력함.
+같은 조건에서 스레드(WSGI) 모드와 ASGI 모드를 번갈아 실행하여 비교함.
+
+측정 방법:
+    1. 스텁 LLM 서버 실행 (응답 시간 800ms, 실제 API 비용 없음)
+        python bench/stub_llm_server.py --port 8081 --latency 800 --tokens-per-sec 40
+       config.Chatbot.API_BASE = "http://127.0.0.1:8081/v1" 로 설정
+       (사용자별 동시 요청 제한에 걸리지 않도록 SCHEDULER_PER_USER_LIMIT를 충분히 크게 하거나 --users를 여러 명으로 지정)
+
+    2-a. 스레드 모드로 서버 실행
+        python run.py
+
+    2-b. ASGI 모드로 서버 실행
+        uvicorn asgi:create_application --factory --port 5000 --ssl-keyfile key.pem --ssl-certfile cert.pem
+
+    3. 측정 (동시 요청 수를 늘려 가며 두 모드에서 각각 실행)
+        python bench/chat_throughput.py --url https://127.0.0.1:5000 --users bench1,bench2,bench3,bench4 \\
+            --concurrency 50 --requests 500 --insecure
+
+비교할 값:
+    - throughput: 초당 처리한 요청 수. LLM 응답을 기다리는 시간이 대부분이므로, 이상적으로는
+      동시 요청 수 / LLM 응답 시간에 가까워야 함
+    - p50 / p95 / max: 요청 1건의 응답 시간. 스레드 모드에서 동시 요청 수가 스레드 수를 넘을 때 p95가 얼마나 늘어나는지,
+      ASGI 모드에서 LLM_MAX_CONCURRENCY까지 p95가 유지되는지 확인
+    - errors: 상태 코드별 실패 수 (503은 스케줄러 대기열 초과로 정상적인 거절)
+"""
+import argparse
+import asyncio
+import itertools
+import ssl
+import time
+from collections import Counter
+
+import aiohttp
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+async def run(options):
+    users = itertools.cycle(options.users.split(","))
+    counter = itertools.count()
+    durations = []
+    statuses = Counter()
+    ssl_context = False if options.insecure else ssl.create_default_context()
+
+    async def worker(session: aiohttp.ClientSession):
+        while next(counter) < options.requests:
+            body = {"user_id": next(users), "msg": options.msg}
+            started = time.monotonic()
+            try:
+                async with session.post(f"{options.url}/chatbot_chat", json=body, ssl=ssl_context) as response:
+                    await response.read()
+                    statuses[response.status] += 1
+            except aiohttp.ClientError as e:
+                statuses[type(e).__name__] += 1
+                continue
+            durations.append(time.monotonic() - started)
+
+    connector = aiohttp.TCPConnector(limit=options.concurrency)
+    timeout = aiohttp.ClientTimeout(total=options.timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        started = time.monotonic()
+        await asyncio.gather(*(worker(session) for _ in range(options.concurrency)))
+        elapsed = time.monotonic() - started
+
+    ok = statuses.get(200, 0)
+    print(f"concurrency={options.concurrency} requests={options.requests} elapsed={elapsed:.2f}s")
+    print(f"throughput={ok / elapsed:.1f} req/s "
+          f"p50={percentile(durations, 0.5):.3f}s p95={percentile(durations, 0.95):.3f}s max={max(durations, default=0):.3f}s")
+    print(f"errors={ {status: count for status, count in statuses.items() if status != 200} }")
+
+def main():
+    parser = argparse.ArgumentParser(description="챗봇 대화 처리량 측정")
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="서버 주소")
+    parser.add_argument("--users", required=True, help="요청에 사용할 사용자 아이디 (쉼표로 구분)")
+    parser.add_argument("--msg", default="오늘 날씨가 참 좋네", help="보낼 메시지")
+    parser.add_argument("--concurrency", type=int, default=50, help="동시 요청 수")
+    parser.add_argument("--requests", type=int, default=500, help="전체 요청 수")
+    parser.add_argument("--timeout", type=float, default=120, help="요청 1건의 제한 시간 (초)")
+    parser.add_argument("--insecure", action="store_true", help="TLS 인증서 검증 안 함 (자체 서명 인증서)")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""로컬 스텁 LLM 서버
+
+OpenAI Chat Completions API(/v1/chat/completions)와 같은 형식으로 응답하는 테스트용 서버.
+네트워크나 API 비용 없이 챗봇 API의 처리량을 측정할 때 사용함.
+
+사용법:
+    python bench/stub_llm_server.py --port 8081 --latency 800 --tokens-per-sec 40
+
+    config.Chatbot.API_BASE = "http://127.0.0.1:8081/v1" 로 설정하고,
+    OPENAI_API_KEY는 아무 값이나 넣으면 됨
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+from aiohttp import web
+
+REPLY = "네, 말씀 잘 들었어요. 오늘 하루는 어떻게 보내셨어요? 식사는 맛있게 하셨는지 궁금하네요."
+
+def completion_chunk(completion_id: str, model: str, delta: dict, finish_reason=None):
+    return {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+
+async def chat_completions(request: web.Request):
+    options = request.app["options"]
+    body = await request.json()
+    model = body.get("model", "stub")
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    # 첫 토큰까지의 지연 시간
+    latency = max(0.0, random.gauss(options.latency, options.jitter)) / 1000
+    await asyncio.sleep(latency)
+
+    pieces = [REPLY[i:i + 2] for i in range(0, len(REPLY), 2)][:options.reply_tokens]
+    token_delay = 1 / options.tokens_per_sec if options.tokens_per_sec > 0 else 0
+
+    if body.get("stream"):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        chunk = completion_chunk(completion_id, model, {"role": "assistant"})
+        await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        for piece in pieces:
+            await asyncio.sleep(token_delay)
+            chunk = completion_chunk(completion_id, model, {"content": piece})
+            await response.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode())
+        chunk = completion_chunk(completion_id, model, {}, "stop")
+        await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    await asyncio.sleep(token_delay * len(pieces))
+    return web.json_response({
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": "".join(pieces)},
+            "finish_reason": "stop"
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": len(pieces), "total_tokens": len(pieces)}
+    }, dumps=lambda data: json.dumps(data, ensure_ascii=False))
+
+def create_app(options):
+    app = web.Application()
+    app["options"] = options
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_post("/chat/completions", chat_completions)
+    return app
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 스텁 LLM 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=800, help="첫 토큰까지의 평균 지연 시간 (ms)")
+    parser.add_argument("--jitter", type=float, default=200, help="지연 시간 표준편차 (ms)")
+    parser.add_argument("--tokens-per-sec", type=float, default=40, help="초당 생성 토큰 수")
+    parser.add_argument("--reply-tokens", type=int, default=40, help="응답 토큰 수")
+    options = parser.parse_args()
+    web.run_app(create_app(options), host=options.host, port=options.port)
@@ -1,7 +1,10 @@
-import openai
+import asyncio
+
 from config import Chatbot
+from app.chatbot import history as chat_history, memory, profile, router
+from app.chatbot.gateway import gateway
 
-def chatbot_chat(uid: int, msg: str):
+async def chatbot_chat(uid: int, msg: str, chat_group_id: int = 0):
     """챗봇 대화 함수
 
     Params:
@@ -9,6 +12,8 @@ def chatbot_chat(uid: int, msg: str):
             사용자의 아이디
         msg `str`:
             사용자가 보낸 채팅 내용
+        chat_group_id `int`:
+            대화 그룹 아이디
     
     Returns:
         result `str`:
@@ -16,46 +21,84 @@ def chatbot_chat(uid: int, msg: str):
         msg `str`:
             응답 메시지
     """
-    messages = []
-    messages.append({"role":"system", "content":Chatbot.CHAT_PROMPT})
-    messages.append({"role":"user", "content":Chatbot.request_propmt(uid=uid)})
-    messages.extend(Chatbot.load_chat_log(uid=uid))     # 채팅 로그 불러오기
-    messages.append({"role":"user", "content":msg})     # 사용자 메시지 추가하기
-    chatbot = openai.ChatCompletion.create(
-        model = Chatbot.MODEL,
-        messages = messages
-    )
-    bot_msg = chatbot["choices"][0]["message"]["content"]
+    # DB 조회와 임베딩 요청은 블로킹 작업이므로 이벤트 루프 밖(스레드)에서 실행
+    messages, decision = await asyncio.to_thread(_chat_messages, uid, msg, chat_group_id)
+    with router.timed(decision):
+        bot_msg = await gateway.chat(messages, model=decision.model, user=uid, route="chat")
     return bot_msg
 
-def chatbot_quiz(uid: int, msg: str, history: list = []):
-    """챗봇 대화 함수
+def chatbot_chat_stream(uid: int, msg: str, chat_group_id: int = 0):
+    """챗봇 대화 스트리밍 함수
+    응답이 모두 생성될 때까지 기다리지 않고, 생성되는 대로 조각(토큰) 단위로 돌려줌
 
     Params:
         uid `int`:
             사용자의 아이디
         msg `str`:
             사용자가 보낸 채팅 내용
+        chat_group_id `int`:
+            대화 그룹 아이디
+    
+    Yields:
+        piece `str`:
+            응답 메시지 조각 (모두 이어 붙이면 전체 응답 메시지)
+    """
+    messages, decision = _chat_messages(uid, msg, chat_group_id)
+    with router.timed(decision):
+        yield from gateway.stream_sync(messages, model=decision.model, user=uid)
+
+def _chat_messages(uid: int, msg: str, chat_group_id: int):
+    """챗봇 대화 프롬프트(메시지 리스트) 생성 및 모델 선택 함수
+    전체 대화 로그 대신 최근 대화, 이전 대화 요약, 사용자 메시지와 관련된 예전 대화만 넣음
+    """
+    messages = profile.prefix_messages(Chatbot.CHAT_PROMPT, uid)      # 시스템 프롬프트 + 사용자 프로필 (고정 prefix)
+    history, history_start = chat_history.build_history(uid, chat_group_id)        # 최근 채팅 로그 + 이전 대화 요약 불러오기
+    memories = memory.retrieve(uid, msg, before_id=history_start)        # 사용자 메시지와 관련된 예전 대화 검색하기 (최근 대화는 제외)
+    messages.extend(memories)
+    messages.extend(history)
+    messages.append({"role":"user", "content":msg})     # 사용자 메시지 추가하기
+    # 메시지 길이와 대화 상태로 모델 선택
+    decision = router.choose(uid, "chat", msg, history=len(history), memory=bool(memories))
+    return messages, decision
+
+async def chatbot_quiz(uid: int, msg: str, history: list = None):
+    """챗봇 기억력 퀴즈 함수
+
+    Params:
+        uid `int`:
+            사용자의 아이디
+        msg `str`:
+            사용자가 보낸 채팅 내용 (퀴즈 시작 시 빈 문자열)
+        history `list`:
+            지금까지의 퀴즈 대화 기록 (퀴즈 시작 시 None)
     
     Returns:
-        result `str`:
-            응답 성공 여부 (success, error)
         msg `str`:
             응답 메시지
+        history `list`:
+            이번 대화까지 반영된 퀴즈 대화 기록
     """
-    messages = []
-    messages.append({"role":"system", "content":Chatbot.QUIZ_PROMPT})
-    messages.append({"role":"user", "content":Chatbot.request_propmt(uid=uid)})
-    messages.append({"role":"user", "content":Chatbot.load_quiz_log(uid=uid)})
+    history = list(history) if history else []
+    if msg:
+        history.append({"role":"user", "content":msg})
+
+    messages = await asyncio.to_thread(_quiz_messages, uid)
     messages.extend(history)
 
-    chatbot = openai.ChatCompletion.create(
-        model = Chatbot.MODEL,
-        messages = messages
-    )
-    bot_msg = chatbot["choices"][0]["message"]["content"]
+    # 같은 프롬프트(퀴즈 시작, 결과 등)는 캐시된 응답 재사용
+    decision = router.choose(uid, "quiz", msg, history=len(history))
+    with router.timed(decision):
+        bot_msg = await gateway.chat(messages, model=decision.model, user=uid, route="quiz", cache=True)
     history.append({"role":"assistant", "content":bot_msg})
+    # 퀴즈가 끝나면 결과("맞은 개수/전체 개수") 요청
     if "기억력 퀴즈는 여기까지 하도록 하겠습니다" in bot_msg:
-        bot_str, history = chatbot_quiz(1, "result", history)
+        _, history = await chatbot_quiz(uid, "result", history)
     
-    return bot_msg, history
\ No newline at end of file
+    return bot_msg, history
+
+def _quiz_messages(uid: int):
+    """퀴즈 프롬프트의 고정 앞부분(시스템 프롬프트 + 사용자 프로필 + 퀴즈 기록) 생성 함수
+    """
+    messages = profile.prefix_messages(Chatbot.QUIZ_PROMPT, uid)
+    messages.append({"role":"user", "content":Chatbot.load_quiz_log(uid=uid)})
+    return messages
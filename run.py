@@ -1,8 +1,9 @@
 import ssl
-from app import app
+from app import create_app
 from config import Server
 
 if __name__ == "__main__":
+    app = create_app()
     SSL_CONTEXT = ssl.SSLContext(ssl.PROTOCOL_TLS)
     print(Server.CERT_FILE)
     SSL_CONTEXT.load_cert_chain(
@@ -0,0 +1,144 @@
+"""운영 서버 실행 모듈 (gunicorn)
+
+run.py는 개발용 서버(단일 프로세스, 디버거/리로더 사용)이므로, 운영 환경에서는 이 모듈로 실행함.
+워커 프로세스 여러 개를 띄워 모든 CPU 코어를 사용하고, 설정은 config.Server에서 읽음.
+
+사용법:
+    python serve.py
+
+config.Server 설정 (모두 옵션):
+    WORKER_CLASS `str`:
+        워커 종류 (기본값 threaded)
+        sync: 워커 1개가 요청 1개씩 처리
+        threaded: 워커마다 THREADS개의 스레드로 처리 (챗봇처럼 LLM 응답을 기다리는 요청이 많을 때)
+        gevent / eventlet: 그린 스레드로 처리 (pip install gevent 또는 eventlet 필요)
+        asgi: ASGI 모드 (asgi.py, 챗봇 핸들러를 코루틴으로 실행. uvicorn 필요)
+    WORKERS `int`:
+        워커 프로세스 수 (기본값 CPU 코어 수 * 2 + 1, threaded/asgi는 CPU 코어 수)
+    THREADS `int`:
+        threaded 워커의 스레드 수 (기본값 8)
+    WORKER_CONNECTIONS `int`:
+        gevent/eventlet 워커 1개의 최대 동시 연결 수 (기본값 1000)
+    PRELOAD `bool`:
+        워커를 만들기 전에 앱을 미리 불러올지 여부 (기본값 True, gevent/eventlet은 몽키 패치 순서 문제로 False)
+        미리 불러오면 워커 생성이 빠르고 메모리를 공유함
+    MAX_REQUESTS `int`:
+        워커 1개가 이만큼 요청을 처리하면 새 워커로 교체 (메모리 누수 대비, 기본값 2000, 0이면 교체 안 함)
+    MAX_REQUESTS_JITTER `int`:
+        워커들이 한꺼번에 교체되지 않도록 MAX_REQUESTS에 더할 무작위 값의 최댓값 (기본값 200)
+    TIMEOUT `int`:
+        응답이 없는 워커를 재시작하기까지의 시간 (초, 기본값 120)
+    GRACEFUL_TIMEOUT `int`:
+        재시작/종료 시 처리 중인 요청을 기다리는 시간 (초, 기본값 60)
+    BEHIND_PROXY `bool`:
+        앞단의 리버스 프록시(nginx 등)에서 TLS를 처리하는지 여부 (기본값 False)
+        True면 서버는 HTTP로 받고 X-Forwarded-* 헤더로 원래 주소/스킴을 복원함
+    FORWARDED_ALLOW_IPS `str`:
+        X-Forwarded-* 헤더를 믿을 프록시 주소 (기본값 127.0.0.1)
+    CERT_FILE / KEY_FILE:
+        BEHIND_PROXY가 False일 때 서버에서 직접 TLS를 처리할 인증서/키 파일
+        (gunicorn은 암호가 걸린 키 파일을 읽을 수 없으므로, PASSWORD가 필요한 키는 프록시에서 처리해야 함)
+
+워커마다 메모리가 따로이므로, 워커를 여러 개 사용할 때는 퀴즈 세션을 DB에 저장해야 함 (Chatbot.QUIZ_SESSION_STORE = "db")
+
+무중단 재시작:
+    kill -HUP <master pid>
+    새 워커를 띄운 뒤 기존 워커는 처리 중인 요청을 마치고 종료됨 (PRELOAD가 True면 코드 변경은 반영되지 않으므로,
+    코드 변경 시에는 kill -USR2 <master pid>로 새 마스터를 띄운 뒤 기존 마스터에 kill -TERM)
+"""
+import multiprocessing
+
+from gunicorn.app.base import BaseApplication
+from config import Server
+
+WORKER_CLASSES = {
+    "sync": "sync",
+    "threaded": "gthread",
+    "gevent": "gevent",
+    "eventlet": "eventlet",
+    "asgi": "uvicorn.workers.UvicornWorker",
+}
+
+def _default_workers(worker_class: str) -> int:
+    cores = multiprocessing.cpu_count()
+    if worker_class in ("threaded", "asgi", "gevent", "eventlet"):
+        return cores
+    return cores * 2 + 1
+
+def options() -> dict:
+    """config.Server 설정으로 gunicorn 옵션 생성
+    """
+    worker_class = getattr(Server, "WORKER_CLASS", "threaded")
+    if worker_class not in WORKER_CLASSES:
+        raise ValueError(f"unknown worker class: {worker_class}")
+    behind_proxy = getattr(Server, "BEHIND_PROXY", False)
+
+    result = {
+        "bind": f"{Server.SERVER_DOMAIN}:{Server.SERVER_PORT}",
+        "worker_class": WORKER_CLASSES[worker_class],
+        "workers": getattr(Server, "WORKERS", None) or _default_workers(worker_class),
+        "threads": getattr(Server, "THREADS", 8) if worker_class == "threaded" else 1,
+        "worker_connections": getattr(Server, "WORKER_CONNECTIONS", 1000),
+        "preload_app": getattr(Server, "PRELOAD", worker_class not in ("gevent", "eventlet")),
+        "max_requests": getattr(Server, "MAX_REQUESTS", 2000),
+        "max_requests_jitter": getattr(Server, "MAX_REQUESTS_JITTER", 200),
+        "timeout": getattr(Server, "TIMEOUT", 120),
+        "graceful_timeout": getattr(Server, "GRACEFUL_TIMEOUT", 60),
+        "forwarded_allow_ips": getattr(Server, "FORWARDED_ALLOW_IPS", "127.0.0.1"),
+        "post_fork": post_fork,
+        "worker_exit": worker_exit,
+    }
+    if not behind_proxy and getattr(Server, "CERT_FILE", None):
+        result["certfile"] = Server.CERT_FILE
+        result["keyfile"] = Server.KEY_FILE
+    return result
+
+# load_app으로 만든 Flask 앱 (워커 훅에서 사용)
+flask_app = None
+
+def load_app(worker_class: str):
+    """워커 종류에 맞는 앱 만들기 (asgi 워커는 ASGI 앱, 나머지는 Flask 앱)
+    """
+    global flask_app
+    from app import create_app
+    app = flask_app = create_app()
+    if getattr(Server, "BEHIND_PROXY", False):
+        # 프록시가 넘겨준 원래 클라이언트 주소/스킴/호스트 사용
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1)
+    if worker_class == "asgi":
+        from asgi import ChatbotASGI
+        return ChatbotASGI(app)
+    return app
+
+def post_fork(server, worker):
+    """워커 생성 직후 호출 (PRELOAD 시 마스터에서 만든 DB 연결을 워커끼리 공유하지 않도록 버림)
+    """
+    if not server.cfg.preload_app or flask_app is None:
+        return
+    from app import db
+    with flask_app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+def worker_exit(server, worker):
+    """워커 종료 시 호출 (교체/재시작되는 워커의 남은 대화 로그 저장)
+    """
+    from app.chatbot.log_writer import chat_log_writer
+    chat_log_writer.close()
+
+class ProductionServer(BaseApplication):
+    def __init__(self, worker_class: str, options: dict):
+        self.worker_class = worker_class
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return load_app(self.worker_class)
+
+if __name__ == "__main__":
+    ProductionServer(getattr(Server, "WORKER_CLASS", "threaded"), options()).run()
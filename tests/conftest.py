@@ -0,0 +1,105 @@
+import sys
+import types
+from datetime import datetime
+
+import pytest
+
+try:
+    import config  # noqa: F401
+except ImportError:
+    # config.py는 배포 환경마다 따로 두는 파일이므로, 없으면 테스트용 설정으로 대신함
+    config = types.ModuleType("config")
+    config.BASE_DIR = "."
+
+    class Config:
+        JWT_SECRET_KEY = "test"
+
+    class Chatbot:
+        MODEL = "test"
+        API_KEY = "test"
+        CHAT_PROMPT = ""
+        QUIZ_PROMPT = ""
+        MAX_TOKENS = 100
+        LLM_BACKEND = "synthetic"
+
+        @staticmethod
+        def request_propmt(uid):
+            return ""
+
+        @staticmethod
+        def load_quiz_log(uid):
+            return ""
+
+    class Season:
+        season_data = {"봄": "SP", "여름": "SU", "가을": "AU", "겨울": "WI"}
+
+    class ChronicIllness:
+        illness_data = {}
+
+    class Server:
+        SERVER_DOMAIN = "127.0.0.1"
+        SERVER_PORT = 5000
+
+    config.Config = Config
+    config.Chatbot = Chatbot
+    config.Season = Season
+    config.ChronicIllness = ChronicIllness
+    config.Server = Server
+    sys.modules["config"] = config
+
+from app import create_app, db
+from app.models.user import MainNok, User
+from app.models.user import UserFavoriteFood, UserFavoriteMusic, UserFavoriteSeason, UserPastJob, UserPet
+
+
+@pytest.fixture
+def app():
+    app = create_app({"SQLITE": ":memory:", "JWT_SECRET_KEY": "test"})
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """선호 정보 없이 사용자를 만드는 함수 (make_user(user_id) -> 사용자 id)
+    """
+    def make(user_id: str) -> int:
+        nok = MainNok(nok_id=f"nok-{user_id}", nok_pw="pw", name="보호자", birthday=datetime(1970, 1, 1),
+                      gender="F", address="서울", tell="010-0000-0000")
+        db.session.add(nok)
+        db.session.flush()
+        user = User(main_nok_id=nok.id, user_id=user_id, user_pw="pw", name=user_id, gender="F",
+                    relation="딸", address="서울")
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+    return make
+
+
+@pytest.fixture
+def user(app):
+    nok = MainNok(nok_id="nok", nok_pw="pw", name="보호자", birthday=datetime(1970, 1, 1),
+                  gender="F", address="서울", tell="010-0000-0000")
+    db.session.add(nok)
+    db.session.flush()
+    user = User(main_nok_id=nok.id, user_id="alice", user_pw="pw", name="앨리스", gender="F",
+                relation="딸", address="서울", hometown="부산")
+    db.session.add(user)
+    db.session.flush()
+    db.session.add_all([
+        UserFavoriteFood(user_id=user.id, favorite_food="김치찌개"),
+        UserFavoriteFood(user_id=user.id, favorite_food="잡채"),
+        UserFavoriteMusic(user_id=user.id, favorite_music="동백 아가씨"),
+        UserFavoriteSeason(user_id=user.id, favorite_season="SP"),
+        UserPastJob(user_id=user.id, past_job="교사"),
+        UserPet(user_id=user.id, pet="강아지"),
+    ])
+    db.session.commit()
+    db.session.expunge_all()
+    return user
@@ -0,0 +1,40 @@
+from app import create_app
+from app.chatbot import idempotency, memory, profile, quiz_session
+from app.chatbot.response_cache import current_cache
+
+
+def make_app():
+    return create_app({"SQLITE": ":memory:", "JWT_SECRET_KEY": "test"})
+
+
+def test_stores_are_per_app():
+    first, second = make_app(), make_app()
+    with first.app_context():
+        profile._cache().get(1, lambda uid: "profile of Alice")
+        current_cache().set("key", "first")
+        quiz_session.current_store().set("session", 1, {"step": 1})
+        first_index = memory.index_for(1).directory
+    with second.app_context():
+        assert profile._cache().get(1, lambda uid: "profile of Bob") == "profile of Bob"
+        assert current_cache().get("key") is None
+        assert quiz_session.current_store().get("session", 1) is None
+        assert idempotency.current_store() is not None
+        assert memory.index_for(1).directory != first_index
+
+
+def test_store_is_shared_within_app():
+    app = make_app()
+    with app.app_context():
+        store = idempotency.current_store()
+    with app.app_context():
+        assert idempotency.current_store() is store
+
+
+def test_profile_cache_expires_after_ttl(monkeypatch):
+    cache = profile.ProfileCache(ttl=60)
+    now = [1000.0]
+    monkeypatch.setattr(profile.time, "monotonic", lambda: now[0])
+    assert cache.get(1, lambda uid: "old") == "old"
+    assert cache.get(1, lambda uid: "new") == "old"
+    now[0] += 61
+    assert cache.get(1, lambda uid: "new") == "new"
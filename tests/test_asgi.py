@@ -0,0 +1,134 @@
+import asyncio
+import json
+
+import pytest
+
+import chatbot_func
+from asgi import ChatbotASGI
+from app.chatbot.log_writer import chat_log_writer
+from app.models.user import ChatLog
+
+# ChatbotASGI._dispatch는 Flask의 full_dispatch_request를 따라 만든 것이므로,
+# 같은 요청을 WSGI(Flask 테스트 클라이언트)와 ASGI 어댑터로 보내 응답이 같은지 확인함
+
+
+def asgi_request(app, method: str, path: str, payload=None, content_type: str = "application/json"):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": [(b"content-type", content_type.encode())],
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(ChatbotASGI(app)(scope, receive, send))
+    headers = {key.decode("latin1"): value.decode("latin1") for key, value in sent[0]["headers"]}
+    return sent[0]["status"], headers, b"".join(message.get("body", b"") for message in sent[1:])
+
+
+def wsgi_request(client, method: str, path: str, payload=None, content_type: str = "application/json"):
+    data = json.dumps(payload) if payload is not None else None
+    response = client.open(path, method=method, data=data, content_type=content_type)
+    return response.status_code, response.headers, response.get_data()
+
+
+def assert_same_response(app, client, method: str, path: str, payload=None, content_type: str = "application/json"):
+    wsgi_status, wsgi_headers, wsgi_body = wsgi_request(client, method, path, payload, content_type)
+    asgi_status, asgi_headers, asgi_body = asgi_request(app, method, path, payload, content_type)
+
+    assert asgi_status == wsgi_status
+    assert asgi_headers["content-type"] == wsgi_headers["Content-Type"]
+    assert asgi_body == wsgi_body
+    return asgi_status, asgi_body
+
+
+@pytest.mark.parametrize("payload, content_type, status", [
+    ({"user_id": "alice", "msg": "안녕"}, "text/plain", 400),
+    ({"user_id": "alice"}, "application/json", 400),
+    ({"user_id": "nobody", "msg": "안녕"}, "application/json", 401),
+])
+def test_view_error_responses_match(app, client, user, payload, content_type, status):
+    assert assert_same_response(app, client, "POST", "/chatbot_chat", payload, content_type)[0] == status
+
+
+@pytest.mark.parametrize("method, path, status", [("POST", "/no_such_route", 404), ("GET", "/chatbot_chat", 405)])
+def test_routing_errors_match(app, client, method, path, status):
+    assert assert_same_response(app, client, method, path)[0] == status
+
+
+def test_root_path_is_dispatched_as_coroutine(app):
+    # 리버스 프록시 아래(uvicorn --root-path)에서도 async 핸들러를 코루틴으로 실행
+    application = ChatbotASGI(app)
+    environ = application._environ({"type": "http", "method": "POST", "path": "/api/chatbot_chat", "root_path": "/api"}, b"")
+
+    assert environ["SCRIPT_NAME"] == "/api"
+    assert environ["PATH_INFO"] == "/chatbot_chat"
+    assert application._async_view(environ) is not None
+
+
+def test_unhandled_exception_uses_error_handler(app, client, user, monkeypatch):
+    async def broken(uid, msg, chat_group_id=0):
+        raise LookupError("broken")
+    monkeypatch.setattr(chatbot_func, "chatbot_chat", broken)
+    app.register_error_handler(LookupError, lambda e: ({"result": "error", "msg": str(e)}, 500))
+
+    status, body = assert_same_response(app, client, "POST", "/chatbot_chat", {"user_id": "alice", "msg": "안녕"})
+
+    assert status == 500
+    assert json.loads(body)["msg"] == "broken"
+
+
+def test_unhandled_exception_without_handler_returns_500(app, client, user, monkeypatch):
+    async def broken(uid, msg, chat_group_id=0):
+        raise LookupError("broken")
+    monkeypatch.setattr(chatbot_func, "chatbot_chat", broken)
+
+    assert assert_same_response(app, client, "POST", "/chatbot_chat", {"user_id": "alice", "msg": "안녕"})[0] == 500
+
+
+def test_before_request_response_and_teardown(app, client, user):
+    calls = []
+    app.before_request(lambda: ({"result": "error", "msg": "maintenance"}, 503))
+    app.teardown_request(lambda error: calls.append(error))
+
+    status, _ = assert_same_response(app, client, "POST", "/chatbot_chat", {"user_id": "alice", "msg": "안녕"})
+
+    assert status == 503
+    assert calls == [None, None]
+
+
+def test_teardown_receives_unhandled_exception(app, user, monkeypatch):
+    errors = []
+    async def broken(uid, msg, chat_group_id=0):
+        raise LookupError("broken")
+    monkeypatch.setattr(chatbot_func, "chatbot_chat", broken)
+    app.teardown_request(lambda error: errors.append(error))
+
+    asgi_request(app, "POST", "/chatbot_chat", {"user_id": "alice", "msg": "안녕"})
+
+    assert len(errors) == 1
+    assert isinstance(errors[0], LookupError)
+
+
+def test_stream_responses_match(app, client, make_user, monkeypatch):
+    uid = make_user("mia")
+    monkeypatch.setattr(chatbot_func, "chatbot_chat_stream", lambda uid, msg, chat_group_id=0: iter(["안녕", "하세요"]))
+
+    status, body = assert_same_response(app, client, "POST", "/chatbot_chat", {"user_id": "mia", "msg": "안녕", "stream": True})
+
+    assert status == 200
+    events = [json.loads(line[len("data: "):]) for line in body.decode().split("\n\n") if line]
+    assert [event["result"] for event in events] == ["stream", "stream", "success"]
+    assert events[-1]["msg"] == "안녕하세요"
+    # 두 요청 모두 대화 로그를 저장함
+    chat_log_writer.flush(uid)
+    assert ChatLog.query.filter_by(user_id=uid).count() == 4
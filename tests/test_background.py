@@ -0,0 +1,80 @@
+import threading
+
+from app.chatbot.background import KeyedExecutor
+
+
+def blocking_task():
+    started = threading.Event()
+    release = threading.Event()
+
+    def task(calls, name):
+        calls.append(name)
+        started.set()
+        release.wait(5)
+    return task, started, release
+
+
+def test_same_key_is_not_queued_twice():
+    executor = KeyedExecutor(max_workers=1, thread_name_prefix="test")
+    task, started, release = blocking_task()
+    calls = []
+    # 작업 스레드를 막아 두고 대기열에 쌓기
+    assert executor.submit("busy", task, calls, "busy")
+    assert started.wait(5)
+
+    assert executor.submit("a", calls.append, "a")
+    assert not executor.submit("a", calls.append, "a again")
+    assert executor.submit("b", calls.append, "b")
+    release.set()
+    executor._executor.shutdown(wait=True)
+
+    assert calls == ["busy", "a", "b"]
+
+
+def test_key_is_released_when_task_starts():
+    executor = KeyedExecutor(max_workers=2, thread_name_prefix="test")
+    task, started, release = blocking_task()
+    calls = []
+    executor.submit("a", task, calls, "first")
+    assert started.wait(5)
+
+    # 실행 중에 들어온 변경은 다음 작업이 처리함
+    assert executor.submit("a", calls.append, "second")
+    release.set()
+    executor._executor.shutdown(wait=True)
+
+    assert calls == ["first", "second"]
+
+
+def test_hold_while_running_blocks_until_task_ends():
+    executor = KeyedExecutor(max_workers=2, thread_name_prefix="test", hold_while_running=True)
+    task, started, release = blocking_task()
+    calls = []
+    executor.submit("a", task, calls, "first")
+    assert started.wait(5)
+
+    assert not executor.submit("a", calls.append, "second")
+    release.set()
+    executor._executor.shutdown(wait=True)
+
+    assert not executor._pending
+
+
+def test_failed_task_releases_key(capsys):
+    executor = KeyedExecutor(max_workers=1, thread_name_prefix="test", hold_while_running=True)
+
+    def fail():
+        raise RuntimeError("boom")
+    executor.submit("a", fail)
+    executor._executor.shutdown(wait=True)
+
+    assert not executor._pending
+    assert "boom" in capsys.readouterr().out
+
+
+def test_submit_after_shutdown_is_ignored():
+    executor = KeyedExecutor(max_workers=1, thread_name_prefix="test")
+    executor._executor.shutdown()
+
+    assert not executor.submit("a", print, "never")
+    assert not executor._pending
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import chatbot_func
+from app.chatbot import idempotency
+from app.chatbot.idempotency import IdempotencyStore, run_once
+from app.chatbot.log_writer import chat_log_writer
+from app.models.user import ChatLog
+
+
+def test_concurrent_duplicates_call_llm_once(app, client, make_user, monkeypatch):
+    uid = make_user("dave")
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    async def slow_chat(uid, msg, chat_group_id=0):
+        calls.append(msg)
+        started.set()
+        await asyncio.to_thread(release.wait, 5)
+        return "안녕하세요"
+    monkeypatch.setattr(chatbot_func, "chatbot_chat", slow_chat)
+
+    responses = []
+    def send():
+        response = app.test_client().post("/chatbot_chat", json={"user_id": "dave", "msg": "안녕"},
+                                          headers={"Idempotency-Key": "retry-1"})
+        responses.append((response.status_code, response.get_json()))
+
+    first = threading.Thread(target=send)
+    first.start()
+    assert started.wait(5)
+    second = threading.Thread(target=send)
+    second.start()
+    # 두 번째 요청이 첫 요청의 결과를 기다리기 시작하면 응답 생성
+    entry, _ = idempotency.current_store().begin(f"chatbot_chat:{uid}:retry-1")
+    deadline = time.monotonic() + 5
+    while not entry.waiters and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert calls == ["안녕"]
+    assert [status for status, _ in responses] == [200, 200]
+    assert responses[0][1] == responses[1][1]
+    chat_log_writer.flush(uid)
+    assert ChatLog.query.filter_by(user_id=uid).count() == 2
+
+
+def test_failed_first_attempt_releases_key(app):
+    calls = []
+
+    async def failing():
+        calls.append("fail")
+        raise RuntimeError("llm down")
+
+    async def succeeding():
+        calls.append("ok")
+        return {"msg": "ok"}, 200
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run_once("key", failing))
+    assert asyncio.run(run_once("key", succeeding)) == ({"msg": "ok"}, 200)
+    assert asyncio.run(run_once("key", succeeding)) == ({"msg": "ok"}, 200)
+    assert calls == ["fail", "ok"]
+
+
+def test_error_response_is_not_stored(app):
+    responses = iter([({"err_code": "101"}, 504), ({"msg": "ok"}, 200)])
+
+    async def handler():
+        return next(responses)
+
+    assert asyncio.run(run_once("key", handler)) == ({"err_code": "101"}, 504)
+    assert asyncio.run(run_once("key", handler)) == ({"msg": "ok"}, 200)
+
+
+def test_waiter_timeout_returns_409(app, client, make_user, monkeypatch):
+    monkeypatch.setattr(idempotency, "WAIT_TIMEOUT", 0.05)
+    uid = make_user("erin")
+    # 같은 키의 요청이 아직 처리 중인 상태
+    idempotency.current_store().begin(f"chatbot_chat:{uid}:retry-1")
+
+    response = client.post("/chatbot_chat", json={"user_id": "erin", "msg": "안녕", "idempotency_key": "retry-1"})
+
+    assert response.status_code == 409
+    assert response.get_json()["err_code"] == "31"
+
+
+def test_result_expires_after_ttl():
+    store = IdempotencyStore(ttl=0.05)
+
+    entry, owner = store.begin("key")
+    store.complete("key", entry, ({"msg": "ok"}, 200))
+    assert store.begin("key") == (entry, False)
+
+    time.sleep(0.1)
+    new_entry, owner = store.begin("key")
+    assert owner
+    assert new_entry is not entry
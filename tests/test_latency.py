@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from app.chatbot import latency
+from app.chatbot.latency import MIN_SAMPLES, LatencyPolicy, LatencyTracker, run_with_policy
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    tracker = LatencyTracker()
+    monkeypatch.setattr(latency, "tracker", tracker)
+    return tracker
+
+
+class FakeAttempts:
+    """모델별로 정해 둔 (지연 시간, 결과) 순서대로 응답하는 가짜 LLM 요청
+    결과가 예외면 지연 시간 후 예외를 발생시킴
+    """
+    def __init__(self, plans: dict):
+        self.plans = {model: list(plan) for model, plan in plans.items()}
+        self.calls = []
+        self.cancelled = []
+
+    async def __call__(self, model: str):
+        delay, result = self.plans[model].pop(0)
+        self.calls.append(model)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def run_policy(attempts: FakeAttempts, policy: LatencyPolicy, model: str = "main"):
+    async def scenario():
+        try:
+            return await run_with_policy(attempts, model, policy)
+        finally:
+            # 취소된 요청이 CancelledError를 처리할 때까지 대기
+            await asyncio.sleep(0.01)
+    return asyncio.run(scenario())
+
+
+def record_samples(tracker: LatencyTracker, model: str, count: int, duration: float = 0.01):
+    for _ in range(count):
+        tracker.record(model, "primary", "ok", duration)
+
+
+def test_no_hedge_before_min_samples(tracker):
+    record_samples(tracker, "main", MIN_SAMPLES - 1)
+    attempts = FakeAttempts({"main": [(0.1, "primary")]})
+
+    result = run_policy(attempts, LatencyPolicy(deadline=1, hedge=True))
+
+    assert result == "primary"
+    assert attempts.calls == ["main"]
+
+
+def test_hedge_after_p95(tracker):
+    record_samples(tracker, "main", MIN_SAMPLES)
+    attempts = FakeAttempts({"main": [(1, "primary"), (0.01, "hedge")]})
+
+    result = run_policy(attempts, LatencyPolicy(deadline=2, hedge=True))
+
+    assert result == "hedge"
+    assert attempts.calls == ["main", "main"]
+
+
+def test_first_success_cancels_other_attempts(tracker):
+    record_samples(tracker, "main", MIN_SAMPLES)
+    attempts = FakeAttempts({"main": [(1, "primary"), (0.01, "hedge")]})
+
+    run_policy(attempts, LatencyPolicy(deadline=2, hedge=True))
+
+    assert attempts.cancelled == ["main"]
+    counts = tracker.snapshot()["main"]
+    assert counts["primary_cancelled"] == 1
+    assert counts["hedge_ok"] == 1
+
+
+def test_fallback_near_deadline(tracker):
+    attempts = FakeAttempts({"main": [(2, "primary")], "fast": [(0.01, "fallback")]})
+
+    result = run_policy(attempts, LatencyPolicy(deadline=0.3, fallback_model="fast", fallback_budget=0.2))
+
+    assert result == "fallback"
+    assert attempts.calls == ["main", "fast"]
+    assert attempts.cancelled == ["main"]
+
+
+def test_failed_attempts_fall_back_before_deadline(tracker):
+    attempts = FakeAttempts({"main": [(0, RuntimeError("down"))], "fast": [(0, "fallback")]})
+
+    async def scenario():
+        started = asyncio.get_running_loop().time()
+        result = await run_with_policy(attempts, "main", LatencyPolicy(deadline=5, fallback_model="fast", fallback_budget=1))
+        return result, asyncio.get_running_loop().time() - started
+    result, elapsed = asyncio.run(scenario())
+
+    assert result == "fallback"
+    # 대체 모델 예정 시각(4초)까지 기다리지 않음
+    assert elapsed < 1
+
+
+def test_all_attempts_failing_raises_last_error(tracker):
+    attempts = FakeAttempts({"main": [(0, RuntimeError("down"))], "fast": [(0, ValueError("also down"))]})
+
+    with pytest.raises(ValueError):
+        run_policy(attempts, LatencyPolicy(deadline=5, fallback_model="fast", fallback_budget=1))
+
+
+def test_deadline_without_fallback_times_out(tracker):
+    attempts = FakeAttempts({"main": [(2, "primary")]})
+
+    with pytest.raises(asyncio.TimeoutError):
+        run_policy(attempts, LatencyPolicy(deadline=0.1))
+
+    assert attempts.cancelled == ["main"]
@@ -0,0 +1,81 @@
+import threading
+
+from app.chatbot.log_writer import MAX_RETRIES, ChatLogWriter
+from app.models.user import ChatLog
+
+
+def make_writer():
+    # 테스트에서 직접 flush하도록 저장 주기를 길게 잡음
+    return ChatLogWriter(flush_interval=60)
+
+
+def test_failing_row_is_dropped_alone(app, make_user):
+    uid = make_user("ivy")
+    writer = make_writer()
+    saved = []
+    writer.add_listener(lambda app, rows: saved.extend(row["text"] for row in rows))
+    writer.add(uid, "user", 0, "첫 번째")
+    # text는 NOT NULL이므로 이 로그가 들어간 묶음은 저장에 실패함
+    writer.add(uid, "assistant", 0, None)
+    writer.add(uid, "user", 0, "세 번째")
+
+    for _ in range(MAX_RETRIES):
+        writer.flush()
+    writer.close()
+
+    assert [log.text for log in ChatLog.query.filter_by(user_id=uid).order_by(ChatLog.id)] == ["첫 번째", "세 번째"]
+    assert saved == ["첫 번째", "세 번째"]
+    assert not writer._unsaved
+
+
+def test_close_saves_pending_rows_and_can_be_called_again(app, make_user):
+    uid = make_user("jack")
+    writer = make_writer()
+    writer.add(uid, "user", 0, "안녕하세요")
+
+    writer.close()
+    writer.close()
+
+    assert not writer._thread.is_alive()
+    assert ChatLog.query.filter_by(user_id=uid).count() == 1
+
+
+def test_close_waits_for_flush_in_progress(app, make_user):
+    uid = make_user("kate")
+    writer = make_writer()
+    entered = threading.Event()
+    release = threading.Event()
+
+    def slow_listener(app, rows):
+        entered.set()
+        release.wait(5)
+    writer.add_listener(slow_listener)
+    writer.add(uid, "user", 0, "첫 번째")
+    flushing = threading.Thread(target=writer.flush)
+    flushing.start()
+    assert entered.wait(5)
+
+    writer.add(uid, "user", 0, "두 번째")
+    closing = threading.Thread(target=writer.close)
+    closing.start()
+    closing.join(0.1)
+    # 진행 중인 저장이 끝나기 전에는 종료하지 않음
+    assert closing.is_alive()
+    release.set()
+    closing.join(5)
+    flushing.join(5)
+
+    assert not closing.is_alive()
+    assert ChatLog.query.filter_by(user_id=uid).count() == 2
+
+
+def test_rows_added_after_close_are_saved(app, make_user):
+    uid = make_user("leo")
+    writer = make_writer()
+    writer.add(uid, "user", 0, "첫 번째")
+    writer.close()
+
+    writer.add(uid, "assistant", 0, "두 번째")
+
+    assert ChatLog.query.filter_by(user_id=uid).count() == 2
+    assert not writer._unsaved
@@ -0,0 +1,47 @@
+import gc
+import os
+
+import numpy as np
+
+from app import create_app, db
+from app.chatbot import memory
+from app.chatbot.history import build_history
+from app.chatbot.memory.vector_index import VectorIndex
+from app.models.user import ChatLog
+
+
+def test_memory_db_index_dir_is_removed_with_app():
+    app = create_app({"SQLITE": ":memory:", "JWT_SECRET_KEY": "test"})
+    with app.app_context():
+        index_dir = os.path.dirname(os.path.dirname(memory.index_for(1).directory))
+    assert os.path.isdir(index_dir)
+
+    del app
+    gc.collect()
+
+    assert not os.path.exists(index_dir)
+
+
+def test_search_skips_logs_from_before_id(tmp_path):
+    index = VectorIndex(str(tmp_path), 2)
+    with index.lock():
+        index.add([1, 3, 5], np.array([[1, 0], [1, 0], [1, 0]], dtype=np.float32), 5)
+
+    query = np.array([1, 0], dtype=np.float32)
+    assert sorted(log_id for log_id, _ in index.search(query, 10)) == [1, 3, 5]
+    assert sorted(log_id for log_id, _ in index.search(query, 10, before_id=4)) == [1, 3]
+    assert index.search(query, 10, before_id=1) == []
+
+
+def test_build_history_returns_first_included_log_id(app, make_user):
+    uid = make_user("henry")
+    logs = [ChatLog(user_id=uid, receiver=receiver, chat_group_id=0, text=f"대화 {i}")
+            for i, receiver in enumerate(["user", "assistant"] * 2)]
+    db.session.add_all(logs)
+    db.session.commit()
+
+    messages, first_id = build_history(uid, 0)
+
+    assert len(messages) == 4
+    assert first_id == logs[0].id
+    assert build_history(uid, 1) == ([], None)
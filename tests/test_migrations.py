@@ -0,0 +1,37 @@
+import sqlalchemy as sa
+
+from app import create_app, db, migrations
+from app.migrations.versions import MIGRATIONS
+
+
+def test_fresh_database_matches_models(app):
+    assert migrations.check() == []
+    assert migrations.upgrade() == []
+
+
+def test_migrations_can_run_again(app):
+    # 중간에 실패한 변경을 다시 실행해도 이미 있는 테이블/컬럼/인덱스는 건너뜀
+    with db.engine.connect() as conn:
+        for _, _, func in sorted(MIGRATIONS, key=lambda m: m[0]):
+            func(conn)
+        conn.commit()
+    assert migrations.check() == []
+
+
+def test_upgrade_from_version_1_schema(tmp_path):
+    path = tmp_path / "app.db"
+    engine = sa.create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        version, _, create_tables = MIGRATIONS[0]
+        assert version == 1
+        create_tables(conn)
+        columns = {column["name"] for column in sa.inspect(conn).get_columns("chat_summary")}
+        indexes = {index["name"] for index in sa.inspect(conn).get_indexes("chat_log")}
+    # 버전 1은 이후 버전에서 추가한 컬럼과 인덱스를 만들지 않음
+    assert "message_count" not in columns
+    assert "ix_chat_log_user_time" not in indexes
+    engine.dispose()
+
+    app = create_app({"SQLITE": str(path), "JWT_SECRET_KEY": "test"})
+    with app.app_context():
+        assert migrations.check() == []
@@ -0,0 +1,41 @@
+import time
+from datetime import datetime, timedelta
+
+from app import db
+from app.chatbot import prewarm
+from app.chatbot.gateway import DEFAULT_TIMEOUT
+from app.models.user import ChatSummary, User
+
+
+def test_generate_uses_current_session_group(app, make_user, monkeypatch):
+    uid = make_user("frank")
+    # 마지막 대화가 오래된 세션이면 새 대화 그룹에서 인사해야 함
+    db.session.add(ChatSummary(user_id=uid, chat_group_id=0, started_at=datetime.utcnow() - timedelta(days=1),
+                               ended_at=datetime.utcnow() - timedelta(days=1), message_count=2))
+    db.session.commit()
+    groups = []
+    monkeypatch.setattr(prewarm.chat_history, "build_history", lambda uid, chat_group_id: (groups.append(chat_group_id) or [], None))
+    monkeypatch.setattr(prewarm.gateway, "chat_sync", lambda messages, model=None, timeout=None, user=None: "안녕하세요")
+
+    assert prewarm.generate(uid) == "안녕하세요"
+    assert groups == [1]
+    assert db.session.get(User, uid).last_chat_group == 1
+
+
+def test_take_waits_for_pending_greeting(app, make_user, monkeypatch):
+    uid = make_user("grace")
+
+    def slow_generate(uid, chat_group_id=None):
+        time.sleep(0.1)
+        return "안녕하세요"
+    monkeypatch.setattr(prewarm, "generate", slow_generate)
+
+    prewarm.start(uid)
+
+    assert prewarm.take(uid) == "안녕하세요"
+    # 한 번 꺼낸 첫 인사는 다시 사용하지 않음
+    assert prewarm.take(uid) is None
+
+
+def test_wait_timeout_covers_generation_timeout():
+    assert prewarm.WAIT_TIMEOUT >= DEFAULT_TIMEOUT
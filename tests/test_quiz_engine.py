@@ -0,0 +1,104 @@
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.chatbot import quiz_engine
+from app.models.user import ChatLog, User
+
+
+def test_normalize():
+    assert quiz_engine.normalize(" 김치 찌개! ") == "김치찌개"
+    assert quiz_engine.normalize("ABC 가나") == "abc가나"
+
+
+@pytest.mark.parametrize("word, stem", [
+    ("학교에서", "학교"),
+    ("김치찌개를", "김치찌개"),
+    ("강아지예요", "강아지"),
+    ("부산이었어요", "부산"),
+    ("봄", "봄"),
+    ("가", "가"),
+])
+def test_strip_suffix(word, stem):
+    assert quiz_engine.strip_suffix(word) == stem
+
+
+def test_similarity():
+    assert quiz_engine.similarity("김치찌개", "김치찌개") == 1.0
+    assert quiz_engine.similarity("김치찌개", "김치찌개요") == 1.0
+    assert quiz_engine.similarity("김치찌개", "제가 좋아하는 건 김치찌개") == 1.0
+    assert quiz_engine.similarity("사과", "배") == 0.0
+    assert quiz_engine.similarity("", "아무거나") == 0.0
+
+
+@pytest.mark.parametrize("answers, response, expected", [
+    # 조사가 붙은 정답
+    (["학교에서", "학교"], "학교에서", True),
+    (["학교에서", "학교"], "학교요", True),
+    # 조사를 뗀 답변
+    (["학교에서", "학교"], "학교", True),
+    (["집에서", "집"], "집", True),
+    # 받침 하나 틀린 오타
+    (["김치찌개를", "김치찌개"], "김치찌게", True),
+    (["강아지"], "강아치", True),
+    # 틀린 답변
+    (["손자가", "손자"], "손녀", False),
+    (["집에서", "집"], "학교", False),
+])
+def test_is_correct(answers, response, expected):
+    assert quiz_engine.is_correct({"question": "", "answers": answers}, response) is expected
+
+
+def test_past_copula():
+    assert quiz_engine.past_copula("김치찌개를") == "이었어요"
+    assert quiz_engine.past_copula("날씨") == "였어요"
+    assert quiz_engine.past_copula("abc") == "였어요"
+
+
+def test_blank_candidates_skip_greetings_and_predicates():
+    assert quiz_engine._blank_candidates("안녕하세요 오늘 날씨가 좋네요") == [(1, "오늘"), (2, "날씨가")]
+    assert quiz_engine._blank_candidates("네 감사합니다 잘 지내요") == []
+
+
+def test_profile_questions(user):
+    uid = User.query.filter_by(user_id="alice").first().id
+    questions = quiz_engine._profile_questions(uid)
+
+    answers = [question["answers"] for question in questions]
+    assert ["김치찌개", "잡채"] in answers
+    assert ["봄"] in answers
+    assert ["부산"] in answers
+    assert len(questions) == 6
+
+
+def test_chat_questions(user):
+    uid = User.query.filter_by(user_id="alice").first().id
+    db.session.add_all([
+        # UTC 10월 17일 16시 = 사용자 시간(Asia/Seoul) 10월 18일 1시
+        ChatLog(user_id=uid, receiver="user", chat_group_id=0, text="어제 딸이랑 김치찌개를 먹었어요", time=datetime(2026, 10, 17, 16)),
+        ChatLog(user_id=uid, receiver="user", chat_group_id=0, text="안녕하세요", time=datetime(2026, 10, 17, 16)),
+        ChatLog(user_id=uid, receiver="assistant", chat_group_id=0, text="오늘 손자가 놀러 왔나요?", time=datetime(2026, 10, 17, 16)),
+    ])
+    db.session.commit()
+
+    questions = quiz_engine._chat_questions(uid)
+
+    assert len(questions) == 1
+    assert questions[0]["question"].startswith("10월 18일에")
+    assert '"어제 딸이랑 ____ 먹었어요"' in questions[0]["question"]
+    assert questions[0]["answers"] == ["김치찌개를", "김치찌개"]
+
+
+def test_build_questions_without_material(make_user):
+    uid = make_user("bob")
+
+    assert quiz_engine.build_questions(uid) == []
+
+
+def test_build_questions_limits_count(user):
+    uid = User.query.filter_by(user_id="alice").first().id
+
+    questions = quiz_engine.build_questions(uid, count=3)
+
+    assert len(questions) == 3
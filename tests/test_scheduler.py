@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+import chatbot_func
+from app.chatbot.scheduler import FairScheduler, SchedulerBusy
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_flooding_user_cannot_starve_another_user():
+    async def scenario():
+        scheduler = FairScheduler(max_in_flight=1, per_user_limit=1, queue_timeout=100)
+        order = []
+
+        async def request(user):
+            async with scheduler.slot(user):
+                order.append(user)
+
+        await scheduler.acquire("holder")
+        tasks = [asyncio.create_task(request("flood")) for _ in range(5)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(request("other")))
+        await asyncio.sleep(0)
+        scheduler.release("holder")
+        await asyncio.gather(*tasks)
+        return order
+
+    order = run(scenario())
+
+    assert order.count("flood") == 5
+    # 먼저 쌓인 요청 5개를 모두 기다리지 않고 두 번째 안에 처리됨
+    assert order.index("other") <= 1
+
+
+def test_scheduler_busy_when_estimated_wait_exceeds_timeout():
+    async def scenario():
+        scheduler = FairScheduler(max_in_flight=1, queue_timeout=0.5)
+        await scheduler.acquire("a")
+        with pytest.raises(SchedulerBusy) as busy:
+            await scheduler.acquire("b")
+        return scheduler, busy.value
+
+    scheduler, busy = run(scenario())
+
+    assert busy.retry_after >= 1
+    assert isinstance(busy.retry_after, int)
+    assert scheduler._waiters == []
+
+
+def test_scheduler_busy_after_queue_timeout():
+    async def scenario():
+        scheduler = FairScheduler(max_in_flight=10, per_user_limit=1, queue_timeout=0.05)
+        await scheduler.acquire("a")
+        with pytest.raises(SchedulerBusy) as busy:
+            await scheduler.acquire("a")
+        return scheduler, busy.value
+
+    scheduler, busy = run(scenario())
+
+    assert busy.retry_after >= 1
+    assert scheduler._waiters == []
+    assert scheduler._in_flight == 1
+
+
+def test_cancelled_waiter_frees_its_place():
+    async def scenario():
+        scheduler = FairScheduler(max_in_flight=1, queue_timeout=100)
+        await scheduler.acquire("a")
+        waiting = asyncio.create_task(scheduler.acquire("b"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        next_waiter = asyncio.create_task(scheduler.acquire("c"))
+        await asyncio.sleep(0)
+        scheduler.release("a")
+        await next_waiter
+        return scheduler
+
+    scheduler = run(scenario())
+
+    assert scheduler._waiters == []
+    assert dict(scheduler._user_in_flight) == {"c": 1}
+
+
+def test_chatbot_chat_returns_503_with_retry_after(client, user, monkeypatch):
+    async def busy(uid, msg, chat_group_id=0):
+        raise SchedulerBusy(7)
+    monkeypatch.setattr(chatbot_func, "chatbot_chat", busy)
+
+    response = client.post("/chatbot_chat", json={"user_id": "alice", "msg": "안녕"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+    assert response.get_json()["err_code"] == "102"
+    assert response.get_json()["retry_after"] == 7
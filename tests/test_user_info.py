@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models.user import UserFavoriteFood, UserFavoriteMusic, UserFavoriteSeason, UserPastJob, UserPet
+
+
+@pytest.fixture
+def statements(app):
+    """요청 중 실행된 SQL 문 기록
+    """
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def test_get_user_info_all_loads_preferences_in_one_query(client, user, statements):
+    response = client.post("/get_user_info_all", json={"user_id": "alice"})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["favorite_food"] == ["김치찌개", "잡채"]
+    assert body["favorite_music"] == ["동백 아가씨"]
+    assert body["favorite_season"] == ["SP"]
+    assert body["past_job"] == ["교사"]
+    assert body["pet"] == ["강아지"]
+    assert body["hometown"] == "부산"
+    assert len(statements) == 1
+
+
+def test_get_user_info_all_without_preferences(client, user, statements):
+    db.session.query(UserFavoriteFood).delete()
+    db.session.query(UserFavoriteMusic).delete()
+    db.session.query(UserFavoriteSeason).delete()
+    db.session.query(UserPastJob).delete()
+    db.session.query(UserPet).delete()
+    db.session.commit()
+    statements.clear()
+
+    response = client.post("/get_user_info_all", json={"user_id": "alice"})
+
+    body = response.get_json()
+    assert body["name"] == "앨리스"
+    assert body["favorite_food"] == []
+    assert len(statements) == 1
+
+
+def test_get_user_info_loads_main_nok_with_user(client, user, statements):
+    response = client.post("/get_user_info", json={"user_id": "alice"})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["main_nok_name"] == "보호자"
+    assert len(statements) == 1
+
+
+def test_get_user_info_all_unknown_user(client, user, statements):
+    response = client.post("/get_user_info_all", json={"user_id": "bob"})
+
+    assert response.status_code == 401
+    assert response.get_json()["err_code"] == "20"
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.models.user import ChatLog
+
+
+@pytest.mark.parametrize("chat_group_id", ["abc", [1], {"id": 1}, "1.5"])
+def test_get_user_chat_log_rejects_invalid_chat_group_id(client, user, chat_group_id):
+    response = client.post("/get_user_chat_log", json={"user_id": "alice", "chat_group_id": chat_group_id})
+
+    assert response.status_code == 400
+    assert response.get_json()["err_code"] == "12"
+
+
+@pytest.mark.parametrize("params", [{"limit": "ten"}, {"limit": [1]}, {"cursor": "not-a-cursor"}, {"order": "up"}])
+def test_get_user_chat_log_rejects_invalid_page_parameter(client, user, params):
+    response = client.post("/get_user_chat_log", json={"user_id": "alice", **params})
+
+    assert response.status_code == 400
+    assert response.get_json()["err_code"] == "12"
+
+
+def test_get_user_chat_log_filters_by_chat_group_id(client, user):
+    response = client.post("/get_user_chat_log", json={"user_id": "alice", "chat_group_id": "0"})
+
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("params", [{"limit": "ten"}, {"limit": [1]}, {"before": "abc"}, {"before": {"id": 1}}])
+def test_get_user_chat_sessions_rejects_invalid_page_parameter(client, user, params):
+    response = client.post("/get_user_chat_sessions", json={"user_id": "alice", **params})
+
+    assert response.status_code == 400
+    assert response.get_json()["err_code"] == "12"
+
+
+def test_get_user_chat_sessions(client, user):
+    response = client.post("/get_user_chat_sessions", json={"user_id": "alice", "limit": "5", "before": "3"})
+
+    assert response.status_code == 200
+    assert response.get_json()["sessions"] == []
+
+
+@pytest.mark.parametrize("route", ["/get_user_chat_log", "/export_user_chat_log", "/get_user_test_result"])
+@pytest.mark.parametrize("params", [{"date": 20261018}, {"from": ["2026-10-18"]}, {"timezone": 5}, {"timezone": "Not/AZone"}])
+def test_date_range_rejects_invalid_parameter(client, user, route, params):
+    response = client.post(route, json={"user_id": "alice", **params})
+
+    assert response.status_code == 400
+    assert response.get_json()["err_code"] == "12"
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_get_user_chat_log_pages_through_identical_timestamps(client, make_user, order):
+    # limit보다 많은 로그가 같은 시간을 가져도 (시간, 아이디) 커서로 빠짐없이 이어져야 함
+    uid = make_user("carol")
+    same_time = datetime(2026, 10, 18, 1, 0, 0)
+    times = [datetime(2026, 10, 18, 0, 59, 59, 500000)] + [same_time] * 7 + [datetime(2026, 10, 18, 1, 0, 1)]
+    db.session.add_all(
+        ChatLog(user_id=uid, receiver="user", chat_group_id=1, text=f"msg-{i}", time=at)
+        for i, at in enumerate(times)
+    )
+    db.session.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        response = client.post("/get_user_chat_log", json={"user_id": "carol", "limit": 3, "order": order, "cursor": cursor})
+        assert response.status_code == 200
+        body = response.get_json()
+        seen += [entry["user"] for entry in body["log"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+        assert len(body["log"]) == 3
+
+    expected = [f"msg-{i}" for i in range(len(times))]
+    assert seen == (expected if order == "asc" else expected[::-1])